@@ -1,18 +1,19 @@
 import signal
 import sys
 import time
+from contextlib import ExitStack
 from datetime import date
+from pathlib import Path
+from typing import Any
 
 import typer
 from loguru import logger
 from rich.console import Console
 
-from src.database import Database
-from src.services import ETLService
-from src.services.scheduler import SchedulerService
 from src.utils import setup_logger
 
-setup_logger()
+# Тяжёлые подсистемы (SQLAlchemy, APScheduler, сервисы) импортируются внутри команд,
+# чтобы --help и лёгкие команды стартовали быстро.
 
 app = typer.Typer(help="ETL скрипт для расчёта CPA и синхронизации данных")
 console = Console()
@@ -25,9 +26,12 @@ def signal_handler(signum: int, frame) -> None:  # type: ignore
     sys.exit(0)
 
 
-def run_scheduler() -> None:
+def run_scheduler(metrics_port: int | None = None) -> None:
     """Запуск планировщика c автоматическим обновлением данных"""
 
+    from src.database import Database
+    from src.services.scheduler import SchedulerService
+
     console.print("\n[bold blue]🚀 Запуск планировщика ETL процессов...[/bold blue]\n")
     logger.info("=" * 80)
     logger.info("🚀 Запуск планировщика ETL процессов")
@@ -41,7 +45,10 @@ def run_scheduler() -> None:
     logger.info("✅ База данных инициализирована")
     console.print("[green]✅ База данных инициализирована[/green]")
 
-    scheduler_service = SchedulerService(database=db)
+    if metrics_port is None:
+        scheduler_service = SchedulerService(database=db)
+    else:
+        scheduler_service = SchedulerService(database=db, metrics_port=metrics_port)
 
     try:
         scheduler_service.start()
@@ -66,8 +73,9 @@ def run_scheduler() -> None:
         console.print("[green]✅ Планировщик остановлен[/green]\n")
 
 
-@app.command()
+@app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     start_date: str | None = typer.Option(
         None,
         "--start-date",
@@ -84,6 +92,26 @@ def main(
         "-s",
         help="Запустить планировщик для автоматического обновления данных",
     ),
+    metrics_port: int | None = typer.Option(
+        None,
+        "--metrics-port",
+        help="Порт HTTP эндпоинта /metrics (Prometheus) для планировщика; 0 — выключен",
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        "--pipeline",
+        help="Конвейерный режим: стадии parse/merge/load работают параллельно по чанкам дат",
+    ),
+    profile: str | None = typer.Option(
+        None,
+        "--profile",
+        help="Профилирование: cpu (cProfile по стадиям), sampling (collapsed stacks), memory (tracemalloc) или all",
+    ),
+    profile_dir: str = typer.Option(
+        "profiles",
+        "--profile-dir",
+        help="Каталог для профилей (внутри создаётся подкаталог c меткой времени)",
+    ),
 ) -> None:
     """
     Запуск ETL процесса для расчёта CPA и загрузки данных в БД.
@@ -92,10 +120,20 @@ def main(
     - Без флагов: разовая загрузка всех данных
     - C --start-date/--end-date: загрузка за период
     - C --scheduler: запуск автоматического планировщика (работает постоянно)
+    - C --pipeline: конвейерная загрузка c отчётом по стадиям
+    - C --profile: профилирование запуска, результаты в --profile-dir
+    - worker / enqueue: очередь ETL задач в PostgreSQL (см. --help команд)
+    - export: выгрузка daily_stats в CSV / NDJSON / Parquet
+    - report-api: HTTP API отчётов по daily_stats
     """
 
+    setup_logger()
+
+    if ctx.invoked_subcommand is not None:
+        return
+
     if scheduler:
-        run_scheduler()
+        run_scheduler(metrics_port)
         return
 
     console.print("\n[bold blue]🚀 Запуск ETL процесса...[/bold blue]\n")
@@ -103,6 +141,16 @@ def main(
     parsed_start_date: date | None = None
     parsed_end_date: date | None = None
 
+    profile_modes: set[str] = set()
+    if profile:
+        from src.utils.profiling import parse_profile_modes
+
+        try:
+            profile_modes = parse_profile_modes(profile)
+        except ValueError as err:
+            console.print(f"[red]❌ Ошибка: {err}[/red]")
+            raise typer.Exit(code=1) from err
+
     if start_date:
         try:
             parsed_start_date = date.fromisoformat(start_date)
@@ -119,6 +167,9 @@ def main(
             console.print(f"[red]❌ Ошибка: неверный формат даты '{end_date}'. Используйте YYYY-MM-DD[/red]")
             raise typer.Exit(code=1) from err
 
+    from src.database import Database
+    from src.services.etl_service import ETLService
+
     try:
         logger.info("🔧 Инициализация базы данных...")
         console.print("\n[cyan]🔧 Инициализация базы данных...[/cyan]")
@@ -129,11 +180,35 @@ def main(
 
         logger.info("📊 Запуск ETL процесса...")
         console.print("\n[cyan]📊 Загрузка и обработка данных...[/cyan]")
-        etl_service = ETLService(database=db)
-        results = etl_service.run(
-            start_date=parsed_start_date,
-            end_date=parsed_end_date,
-        )
+        with ExitStack() as stack:
+            profile_session = None
+            if profile_modes:
+                from src.utils.profiling import ProfileSession
+
+                profile_session = stack.enter_context(ProfileSession(Path(profile_dir), profile_modes))
+
+            etl_service = ETLService(
+                database=db,
+                stage_hook=profile_session.stage if profile_session is not None else None,
+            )
+
+            if pipeline:
+                from src.services.pipeline import PipelinedETL
+
+                pipelined_etl = PipelinedETL(
+                    database=db,
+                    stage_hook=profile_session.stage if profile_session is not None else None,
+                )
+                results = pipelined_etl.run(start_date=parsed_start_date, end_date=parsed_end_date)
+                print_stage_stats(pipelined_etl.get_stats())
+            else:
+                results = etl_service.run(
+                    start_date=parsed_start_date,
+                    end_date=parsed_end_date,
+                )
+
+        if profile_session is not None:
+            console.print(f"🔬 Профили: [green]{profile_session.output_dir}[/green]")
 
         etl_service.print_summary(results)
 
@@ -150,5 +225,459 @@ def main(
         raise typer.Exit(code=1) from e
 
 
+def print_stage_stats(stages: list[dict[str, Any]]) -> None:
+    """Таблица пропускной способности стадий конвейера"""
+
+    from rich.table import Table
+
+    table = Table(title="Стадии конвейера")
+    for column in ("Стадия", "Чанков", "Строк на входе", "Строк на выходе", "Время, c", "Строк/c", "Макс. очередь"):
+        table.add_column(column)
+
+    for stage in stages:
+        table.add_row(
+            stage["stage"],
+            str(stage["chunks"]),
+            str(stage["rows_in"]),
+            str(stage["rows_out"]),
+            f"{stage['busy_seconds']:.3f}",
+            f"{stage['rows_per_second']:,.0f}",
+            str(stage["max_queue_depth"]),
+        )
+
+    console.print(table)
+
+
+def parse_date_option(value: str | None) -> date | None:
+    """Разбор даты из опции CLI"""
+
+    if value is None:
+        return None
+
+    try:
+        return date.fromisoformat(value)
+    except ValueError as err:
+        console.print(f"[red]❌ Ошибка: неверный формат даты '{value}'. Используйте YYYY-MM-DD[/red]")
+        raise typer.Exit(code=1) from err
+
+
+@app.command()
+def worker(
+    worker_id: str | None = typer.Option(None, "--worker-id", help="Идентификатор воркера (по умолчанию hostname-pid)"),
+    poll_interval: float | None = typer.Option(
+        None, "--poll-interval", help="Пауза между опросами пустой очереди, c (по умолчанию WORKER_POLL_SECONDS)"
+    ),
+) -> None:
+    """Запуск воркера очереди ETL задач (можно запускать в любом числе контейнеров)"""
+
+    from src.database import Database
+    from src.services.worker import QueueWorker
+
+    db = Database()
+    db.init_db()
+    queue_worker = QueueWorker(database=db, worker_id=worker_id, poll_interval=poll_interval)
+
+    def stop_worker(signum: int, frame) -> None:  # type: ignore
+        logger.info("\n🛑 Получен сигнал остановки, завершаем текущую задачу...")
+        queue_worker.stop()
+
+    signal.signal(signal.SIGINT, stop_worker)
+    signal.signal(signal.SIGTERM, stop_worker)
+
+    console.print(f"\n[bold blue]👷 Воркер {queue_worker.worker_id} запущен[/bold blue]\n")
+
+    try:
+        queue_worker.run_forever()
+    finally:
+        db.close()
+
+
+@app.command()
+def enqueue(
+    start_date: str | None = typer.Option(None, "--start-date", help="Начальная дата в формате ISO (YYYY-MM-DD)"),
+    end_date: str | None = typer.Option(None, "--end-date", help="Конечная дата в формате ISO (YYYY-MM-DD)"),
+    sources: str = typer.Option("all", "--sources", help="Источники через запятую"),
+    split_days: int = typer.Option(0, "--split-days", help="Разбить диапазон на задачи по N дней (0 — одна задача)"),
+) -> None:
+    """Поставить ETL задачи в очередь"""
+
+    from datetime import timedelta
+
+    from src.database import Database
+    from src.services.job_queue import JobQueue
+
+    parsed_start_date = parse_date_option(start_date)
+    parsed_end_date = parse_date_option(end_date)
+
+    ranges: list[tuple[date | None, date | None]] = [(parsed_start_date, parsed_end_date)]
+    if split_days > 0 and parsed_start_date and parsed_end_date:
+        ranges = []
+        chunk_start = parsed_start_date
+        while chunk_start <= parsed_end_date:
+            chunk_end = min(chunk_start + timedelta(days=split_days - 1), parsed_end_date)
+            ranges.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+    db = Database()
+    db.init_db()
+    job_queue = JobQueue(db)
+
+    try:
+        job_ids = [job_queue.enqueue(range_start, range_end, sources=sources) for range_start, range_end in ranges]
+        created = [job_id for job_id in job_ids if job_id is not None]
+        console.print(
+            f"[green]📬 Поставлено задач: {len(created)}, дубликатов пропущено: {len(ranges) - len(created)}[/green]"
+        )
+        console.print(f"[cyan]📊 Очередь: {job_queue.get_stats()}[/cyan]")
+    finally:
+        db.close()
+
+
+@app.command()
+def backfill(
+    start_date: str = typer.Option(..., "--start-date", help="Начальная дата в формате ISO (YYYY-MM-DD)"),
+    end_date: str = typer.Option(..., "--end-date", help="Конечная дата в формате ISO (YYYY-MM-DD)"),
+    chunk: str | None = typer.Option(
+        None, "--chunk", help="Размер чанка: week или month (по умолчанию BACKFILL_CHUNK)"
+    ),
+    workers: int | None = typer.Option(None, "--workers", help="Чанков параллельно (по умолчанию BACKFILL_WORKERS)"),
+    backfill_id: str | None = typer.Option(
+        None, "--id", help="Идентификатор для чекпоинтов (по умолчанию <start>_<end>_<chunk>)"
+    ),
+) -> None:
+    """Загрузка большого периода чанками c чекпоинтами в БД: повторный запуск продолжает c места остановки"""
+
+    from rich.progress import (
+        BarColumn,
+        MofNCompleteColumn,
+        Progress,
+        TextColumn,
+        TimeElapsedColumn,
+        TimeRemainingColumn,
+    )
+
+    from src.database import Database
+    from src.services.backfill import BackfillRunner, ChunkResult
+    from src.settings.etl import etl_config
+
+    parsed_start_date = parse_date_option(start_date)
+    parsed_end_date = parse_date_option(end_date)
+    assert parsed_start_date is not None and parsed_end_date is not None
+
+    db = Database()
+    db.init_db()
+
+    progress = Progress(
+        TextColumn("[bold blue]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("{task.fields[rows]:,} строк, {task.fields[rows_per_second]:,.0f} строк/c"),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    )
+    totals = {"rows": 0, "started": time.monotonic()}
+
+    def on_chunk_done(result: ChunkResult) -> None:
+        totals["rows"] += result.rows
+        elapsed = time.monotonic() - totals["started"]
+        progress.update(
+            task_id,
+            advance=1,
+            rows=int(totals["rows"]),
+            rows_per_second=totals["rows"] / elapsed if elapsed > 0 else 0.0,
+        )
+        if result.error is not None:
+            progress.console.print(f"[red]❌ {result.start_date} — {result.end_date}: {result.error}[/red]")
+
+    try:
+        runner = BackfillRunner(
+            database=db,
+            start_date=parsed_start_date,
+            end_date=parsed_end_date,
+            chunk=chunk or etl_config.BACKFILL_CHUNK,
+            workers=workers or etl_config.BACKFILL_WORKERS,
+            backfill_id=backfill_id,
+            on_chunk_done=on_chunk_done,
+        )
+    except ValueError as err:
+        db.close()
+        console.print(f"[red]❌ Ошибка: {err}[/red]")
+        raise typer.Exit(code=1) from err
+
+    try:
+        pending = runner.pending_chunks()
+        console.print(
+            f"\n[bold blue]🧱 Backfill {runner.backfill_id}: чанков {len(runner.chunks)}, "
+            f"осталось {len(pending)}, воркеров {runner.workers}[/bold blue]\n"
+        )
+        with progress:
+            task_id = progress.add_task("Backfill", total=len(pending), rows=0, rows_per_second=0.0)
+            result = runner.run()
+    finally:
+        db.close()
+
+    console.print(
+        f"[green]✅ Успешно: {result.succeeded}, пропущено (уже загружены): {result.skipped}, "
+        f"строк: {result.rows}, {result.rows_per_second:,.0f} строк/c за {result.seconds} c[/green]"
+    )
+
+    if result.failed:
+        console.print(f"[red]❌ Чанков c ошибкой: {result.failed}. Повторный запуск загрузит только их.[/red]")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def export(
+    start_date: str | None = typer.Option(None, "--start-date", help="Начальная дата в формате ISO (YYYY-MM-DD)"),
+    end_date: str | None = typer.Option(None, "--end-date", help="Конечная дата в формате ISO (YYYY-MM-DD)"),
+    fmt: str = typer.Option("csv", "--format", help="Формат: csv, ndjson или parquet (extra parquet)"),
+    output: str = typer.Option("-", "--output", "-o", help="Файл для выгрузки (- — stdout)"),
+    compression: str = typer.Option("none", "--compression", help="Сжатие: none или gzip"),
+) -> None:
+    """Потоковая выгрузка daily_stats за период через COPY TO STDOUT (память не зависит от периода)"""
+
+    from src.database import Database
+    from src.services.export import StatsExporter
+
+    # stdout занят данными: сообщения и логи — в stderr
+    status = Console(stderr=True)
+    if output == "-":
+        setup_logger(stream=sys.stderr)
+    db = Database()
+    db.init_db()
+
+    try:
+        exporter = StatsExporter(database=db)
+        stats = exporter.export_to_path(
+            None if output == "-" else Path(output),
+            fmt=fmt,
+            start_date=parse_date_option(start_date),
+            end_date=parse_date_option(end_date),
+            compression=compression,
+        )
+    except (ValueError, RuntimeError) as err:
+        status.print(f"[red]❌ Ошибка: {err}[/red]")
+        raise typer.Exit(code=1) from err
+    finally:
+        db.close()
+
+    status.print(
+        f"[green]📤 Выгружено строк: {stats.rows}, {stats.bytes_written:,} байт ({stats.format}, "
+        f"{compression}) за {stats.seconds} c[/green]"
+    )
+
+
+@app.command()
+def generate(
+    output_dir: str = typer.Option(
+        "data/synthetic", "--output-dir", help="Каталог для fb_spend.json и network_conv.json"
+    ),
+    rows: int = typer.Option(10_000, "--rows", help="Число ключей (date, campaign_id)"),
+    days: int = typer.Option(30, "--days", help="Число дней"),
+    overlap: float = typer.Option(0.8, "--overlap", help="Доля ключей, которые есть в обоих файлах"),
+    skew: float = typer.Option(1.1, "--skew", help="Показатель Zipf для объёма кампаний (0 — равномерно)"),
+    duplicates: float = typer.Option(0.0, "--duplicates", help="Доля повторяющихся строк"),
+    seed: int = typer.Option(42, "--seed", help="Seed генератора"),
+) -> None:
+    """Сгенерировать синтетические файлы расходов и конверсий"""
+
+    from src.utils.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+    config = SyntheticConfig(rows=rows, days=days, overlap=overlap, skew=skew, duplicates=duplicates, seed=seed)
+    files = SyntheticDataGenerator(config).generate(Path(output_dir))
+    console.print(
+        f"[green]✅ {files.spend_path}: {files.spend_rows} строк, "
+        f"{files.conversion_path}: {files.conversion_rows} строк ({files.start_date} — {files.end_date})[/green]"
+    )
+
+
+@app.command()
+def bench(
+    sizes: str = typer.Option("10000,100000", "--rows", help="Размеры через запятую, например 10000,1000000,10000000"),
+    repeat: int = typer.Option(3, "--repeat", help="Повторов на кейс (берётся лучшее время)"),
+    with_db: bool = typer.Option(True, "--db/--no-db", help="Измерять upsert в PostgreSQL"),
+    output: str = typer.Option("benchmarks/results.json", "--output", help="Куда сохранить результаты"),
+    baseline: str | None = typer.Option(None, "--baseline", help="JSON c baseline для сравнения"),
+    threshold: float = typer.Option(0.2, "--threshold", help="Допустимое замедление относительно baseline"),
+) -> None:
+    """Бенчмарк load / merge / filter / upsert на синтетических данных"""
+
+    from rich.table import Table
+
+    from src.database import Database
+    from src.utils.benchmark import BenchmarkRunner, compare_reports, load_report, save_report
+
+    db: Database | None = None
+    if with_db:
+        db = Database()
+        db.init_db()
+
+    try:
+        report = BenchmarkRunner([int(size) for size in sizes.split(",")], repeat=repeat, database=db).run()
+    finally:
+        if db is not None:
+            db.close()
+
+    save_report(report, Path(output))
+
+    table = Table(title="Бенчмарк ETL")
+    for column in ("Кейс", "Размер", "Строк", "Время, c", "Строк/c"):
+        table.add_column(column)
+    for result in report["results"]:
+        table.add_row(
+            result["case"],
+            str(result["size"]),
+            str(result["rows"]),
+            f"{result['seconds']:.4f}",
+            f"{result['rows_per_second']:,.0f}",
+        )
+    console.print(table)
+    console.print(f"💾 Результаты: [green]{output}[/green]")
+
+    if baseline is None:
+        return
+
+    regressions = compare_reports(report, load_report(Path(baseline)), threshold)
+    if not regressions:
+        console.print(f"[green]✅ Регрессий относительно {baseline} нет (порог {threshold:.0%})[/green]")
+        return
+
+    for regression in regressions:
+        console.print(
+            f"[red]❌ {regression['case']} @ {regression['size']}: {regression['baseline_seconds']:.4f} c → "
+            f"{regression['seconds']:.4f} c (x{regression['ratio']})[/red]"
+        )
+    raise typer.Exit(code=1)
+
+
+@app.command()
+def simulate(
+    days: int = typer.Option(14, "--days", help="Сколько суток симулировать"),
+    adaptive: bool | None = typer.Option(
+        None, "--adaptive/--fixed", help="Адаптивный пейсинг или фиксированный интервал (по умолчанию — из .env)"
+    ),
+    max_requests: int | None = typer.Option(None, "--max-requests", help="Квота API в сутки"),
+    failure_rate: float = typer.Option(0.0, "--failure-rate", help="Доля запусков ETL, падающих c ошибкой"),
+    change_interval: int = typer.Option(60, "--change-interval", help="Как часто меняются данные даты, мин"),
+    settle_hours: int = typer.Option(48, "--settle-hours", help="Сколько часов после конца суток данные ещё меняются"),
+    seed: int = typer.Option(42, "--seed", help="Seed ошибок и джиттера"),
+    output: str | None = typer.Option(None, "--output", help="Сохранить отчёт в JSON"),
+) -> None:
+    """Симуляция планировщика на виртуальных часах: квота, число запусков и отставание данных"""
+
+    import json
+
+    from rich.table import Table
+
+    from src.services.simulation import SchedulerSimulator
+    from src.settings.scheduler import scheduler_config
+
+    simulator = SchedulerSimulator(
+        days=days,
+        adaptive=scheduler_config.ADAPTIVE_SCHEDULING if adaptive is None else adaptive,
+        max_requests=max_requests,
+        failure_rate=failure_rate,
+        change_interval_minutes=change_interval,
+        settle_hours=settle_hours,
+        seed=seed,
+    )
+    report = simulator.run().to_dict()
+
+    console.print(
+        f"\n[bold blue]⏩ {report['days']} сут. за {report['wall_seconds']} c, "
+        f"{'адаптивный' if report['adaptive'] else 'фиксированный'} интервал[/bold blue]"
+    )
+    console.print(
+        f"🔁 Запусков задачи: {report['ticks']}, повторов: {report['retries_run']}, "
+        f"диапазонов: успешно {report['ranges']['succeeded']}, ошибок {report['ranges']['failed']}, "
+        f"пропущено {report['ranges']['skipped']}; упёрлись в квоту: {report['quota_blocked_ticks']}"
+    )
+    quota = report["quota"]
+    console.print(
+        f"📊 Квота: {quota['avg_used']} в среднем, максимум {quota['max_used']} из {quota['per_day']} в сутки"
+    )
+
+    table = Table(title="Отставание данных")
+    for column in ("Даты", "Среднее, мин", "Максимум, мин", "Доля времени устаревшими"):
+        table.add_column(column)
+    for bucket, lag in report["freshness"].items():
+        table.add_row(bucket, f"{lag['avg_minutes']:.1f}", f"{lag['max_minutes']:.1f}", f"{lag['stale_share']:.1%}")
+    console.print(table)
+
+    if output is not None:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        Path(output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        console.print(f"💾 Отчёт: [green]{output}[/green]")
+
+
+@app.command("mock-api")
+def mock_api(
+    data_dir: str = typer.Option("data", "--data-dir", help="Каталог c fb_spend.json и network_conv.json"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Адрес"),
+    port: int = typer.Option(8081, "--port", help="Порт"),
+    latency_ms: float = typer.Option(0.0, "--latency-ms", help="Задержка перед каждым ответом, мс"),
+    page_size: int = typer.Option(1_000, "--page-size", help="Максимальный размер страницы"),
+    max_rps: int = typer.Option(0, "--max-rps", help="Больше запросов в секунду — ответ 429 (0 — без лимита)"),
+) -> None:
+    """Локальный HTTP API c данными fb_spend / network_conv для API_SOURCE=http"""
+
+    from src.settings.api import api_config
+    from src.utils.mock_api import MockAPIServer
+
+    server = MockAPIServer.from_files(
+        Path(data_dir) / api_config.FB_SPEND_FILE,
+        Path(data_dir) / api_config.NETWORK_CONV_FILE,
+        host=host,
+        port=port,
+        latency_ms=latency_ms,
+        max_page_size=page_size,
+        max_rps=max_rps,
+    )
+    server.start()
+    console.print(f"[green]🧪 Mock API: {server.base_url} (Ctrl+C для остановки)[/green]")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        stats = server.stats
+        console.print(f"📊 Запросов: {stats.requests}, 429: {stats.throttled}, соединений: {stats.connections}")
+
+
+@app.command("report-api")
+def report_api(
+    host: str | None = typer.Option(None, "--host", help="Адрес (по умолчанию REPORT_HOST)"),
+    port: int | None = typer.Option(None, "--port", help="Порт (по умолчанию REPORT_PORT)"),
+) -> None:
+    """Read-only HTTP API отчётов по daily_stats: /stats, /campaigns, /top (ETag и кэш ответов)"""
+
+    from src.database import Database
+    from src.services.reporting import ReportingServer
+
+    db = Database()
+    db.init_db()
+    server = ReportingServer(database=db, host=host, port=port)
+    server.start()
+    console.print(f"[green]📑 API отчётов: {server.base_url}/campaigns (Ctrl+C для остановки)[/green]")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        db.close()
+        stats = server.stats
+        console.print(
+            f"📊 Запросов: {stats.requests}, 304: {stats.not_modified}, из кэша: {stats.cache_hits}, "
+            f"потоковых: {stats.streamed}, ошибок: {stats.errors}"
+        )
+
+
 if __name__ == "__main__":
     app()
@@ -1,7 +1,12 @@
 from .db import Database
-from .models import DailyStats
+from .models import ApiRequestLog, BackfillChunk, DailyStats, DateClaim, EtlJob, LoadWatermark
 
 __all__ = [
+    "ApiRequestLog",
+    "BackfillChunk",
     "DailyStats",
     "Database",
+    "DateClaim",
+    "EtlJob",
+    "LoadWatermark",
 ]
@@ -1,17 +1,21 @@
 from collections.abc import Generator
 from contextlib import contextmanager
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import Select, create_engine, func, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from src.database.models import Base, DailyStats
+from src.database.models import Base, DailyStats, LoadWatermark
 from src.settings.database import db_config
 
+if TYPE_CHECKING:
+    from _typeshed import SupportsWrite
+
 
 class Database:
     """Класс для работы c базой данных"""
@@ -119,6 +123,136 @@ class Database:
             result = session.execute(query)
             return list(result.scalars().all())  # type: ignore[no-untyped-call]
 
+    def copy_to(self, query: Select[Any], file: "SupportsWrite[bytes]", options: str = "FORMAT csv") -> int:
+        """
+        Выгрузить результат запроса через COPY ... TO STDOUT в `file`.
+
+        Строки пишутся в `file` по мере чтения из сокета и не собираются в памяти.
+        Возвращает число выгруженных строк.
+        """
+
+        sql = query.compile(dialect=self.engine.dialect, compile_kwargs={"literal_binds": True})
+        connection = self.engine.raw_connection()
+        try:
+            # copy_expert — метод psycopg2, DB-API такого не описывает
+            cursor: Any = connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH ({options})", file)
+                rowcount: int = cursor.rowcount
+            finally:
+                cursor.close()
+            connection.rollback()
+        finally:
+            connection.close()
+        return rowcount
+
+    def get_campaign_totals(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        order_by_cpa: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Итоги по кампаниям за период: spend, conversions и число дней.
+
+        C `order_by_cpa` ("asc" | "desc") — только кампании c конверсиями,
+        по возрастанию или убыванию CPA; иначе по campaign_id.
+        """
+
+        spend = func.sum(DailyStats.spend)
+        conversions = func.sum(DailyStats.conversions)
+        query = select(
+            DailyStats.campaign_id,
+            spend.label("spend"),
+            conversions.label("conversions"),
+            func.count().label("days"),
+        )
+
+        if start_date is not None:
+            query = query.where(DailyStats.date >= start_date)
+        if end_date is not None:
+            query = query.where(DailyStats.date <= end_date)
+
+        query = query.group_by(DailyStats.campaign_id)
+        if order_by_cpa is None:
+            query = query.order_by(DailyStats.campaign_id)
+        else:
+            cpa = spend / conversions
+            query = query.having(conversions > 0).order_by(
+                cpa.desc() if order_by_cpa == "desc" else cpa.asc(), DailyStats.campaign_id
+            )
+        if limit is not None:
+            query = query.limit(limit)
+
+        with self.get_session() as session:
+            return [dict(row._mapping) for row in session.execute(query)]
+
+    def get_watermark_version(self, start_date: date | None, end_date: date | None) -> tuple[int, datetime | None]:
+        """
+        Число watermarks и время последнего изменения данных за период (для ETag).
+        """
+
+        query = select(func.count(), func.max(LoadWatermark.changed_at))
+        if start_date is not None:
+            query = query.where(LoadWatermark.date >= start_date)
+        if end_date is not None:
+            query = query.where(LoadWatermark.date <= end_date)
+
+        with self.get_session() as session:
+            count, changed_at = session.execute(query).one()
+            return int(count), changed_at
+
+    def get_watermarks(self, start_date: date, end_date: date) -> list[LoadWatermark]:
+        """
+        Получить watermarks загрузки за период (один запрос по первичному ключу).
+        """
+
+        with self.get_session() as session:
+            query = select(LoadWatermark).where(LoadWatermark.date >= start_date).where(LoadWatermark.date <= end_date)
+            watermarks = list(session.execute(query).scalars().all())
+            session.expunge_all()
+            return watermarks
+
+    def upsert_watermarks(self, watermarks: list[dict[str, Any]]) -> None:
+        """
+        Массовый upsert watermarks загрузки.
+        """
+
+        if not watermarks:
+            return
+
+        with self.get_session() as session:
+            stmt = pg_insert(LoadWatermark).values(watermarks)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["date", "source"],
+                set_={
+                    "loaded_at": stmt.excluded.loaded_at,
+                    "changed_at": stmt.excluded.changed_at,
+                    "row_count": stmt.excluded.row_count,
+                    "fingerprint": stmt.excluded.fingerprint,
+                },
+            )
+            session.execute(stmt)
+
+    def get_pool_stats(self) -> dict[str, int]:
+        """
+        Состояние пула соединений (для метрик).
+        """
+
+        pool = self.engine.pool
+        stats = {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
+
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+            )
+
+        return stats
+
     def close(self) -> None:
         """Закрытие подключения к БД"""
 
@@ -1,7 +1,7 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Date, Numeric, String
+from sqlalchemy import Date, DateTime, Float, Index, Numeric, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column  # type: ignore[attr-defined]
 
 
@@ -24,3 +24,93 @@ class DailyStats(Base):
             f"DailyStats(date={self.date}, campaign_id={self.campaign_id}, "
             f"spend={self.spend}, conversions={self.conversions}, cpa={self.cpa})"
         )
+
+
+class ApiRequestLog(Base):
+    __tablename__ = "api_request_log"
+    __table_args__ = (Index("ix_api_request_log_scope_requested_at", "scope", "requested_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    scope: Mapped[str] = mapped_column(String(50), nullable=False)
+    requested_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"ApiRequestLog(scope={self.scope}, requested_at={self.requested_at})"
+
+
+class LoadWatermark(Base):
+    __tablename__ = "load_watermarks"
+
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+
+    loaded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    row_count: Mapped[int] = mapped_column(nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"LoadWatermark(date={self.date}, source={self.source}, loaded_at={self.loaded_at}, "
+            f"row_count={self.row_count}, fingerprint={self.fingerprint[:12]})"
+        )
+
+
+class DateClaim(Base):
+    __tablename__ = "date_claims"
+
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    worker_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"DateClaim(date={self.date}, worker_id={self.worker_id}, lease_expires_at={self.lease_expires_at})"
+
+
+class EtlJob(Base):
+    __tablename__ = "etl_jobs"
+    __table_args__ = (Index("ix_etl_jobs_status_id", "status", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    start_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    end_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    sources: Mapped[str] = mapped_column(String(200), nullable=False, default="all")
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    worker_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rows: Mapped[int | None] = mapped_column(nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"EtlJob(id={self.id}, start_date={self.start_date}, end_date={self.end_date}, "
+            f"status={self.status}, attempts={self.attempts})"
+        )
+
+
+class BackfillChunk(Base):
+    __tablename__ = "backfill_chunks"
+
+    backfill_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    start_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    end_date: Mapped[date] = mapped_column(Date, nullable=False)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    rows: Mapped[int | None] = mapped_column(nullable=True)
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"BackfillChunk(backfill_id={self.backfill_id}, start_date={self.start_date}, "
+            f"end_date={self.end_date}, status={self.status})"
+        )
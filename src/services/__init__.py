@@ -1,8 +1,12 @@
-from .calculator import CPACalculator
-from .data_loader import DataLoader
-from .etl_service import ETLService
-from .rate_limiter import RateLimiter
-from .scheduler import SchedulerService
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .calculator import CPACalculator
+    from .data_loader import DataLoader
+    from .etl_service import ETLService
+    from .rate_limiter import RateLimiter
+    from .scheduler import SchedulerService
 
 __all__ = [
     "CPACalculator",
@@ -11,3 +15,26 @@ __all__ = [
     "RateLimiter",
     "SchedulerService",
 ]
+
+# Подмодули импортируются при первом обращении: разовый ETL не тянет APScheduler и т.п.
+_LAZY_IMPORTS = {
+    "CPACalculator": ".calculator",
+    "DataLoader": ".data_loader",
+    "ETLService": ".etl_service",
+    "RateLimiter": ".rate_limiter",
+    "SchedulerService": ".scheduler",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,123 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from src.schemas import ConversionRecord, SpendRecord
+from src.settings.etl import etl_config
+
+SUM_POLICY = "sum"
+LAST_POLICY = "last"
+DUPLICATE_POLICIES = (SUM_POLICY, LAST_POLICY)
+
+_SPEND, _SPEND_BATCH, _SPEND_IN_BATCH, _CONVERSIONS, _CONVERSIONS_BATCH, _CONVERSIONS_IN_BATCH = range(6)
+
+
+@dataclass
+class AggregateStats:
+    """Счётчики агрегации: входные строки и повторы ключа внутри одного источника"""
+
+    spend_rows: int = 0
+    conversion_rows: int = 0
+    spend_duplicates: int = 0
+    conversion_duplicates: int = 0
+    keys: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.spend_duplicates + self.conversion_duplicates
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class HashAggregator:
+    """
+    Hash-агрегация расходов и конверсий по (date, campaign_id) за один проход.
+
+    Записи читаются из любых итераторов (генераторы не материализуются); в памяти —
+    одна строка таблицы на ключ, поэтому объём ограничен числом ключей, не строк.
+    Каждый вызов add_spend / add_conversions — отдельный источник (batch):
+    - значения разных источников по одному ключу складываются
+    - повтор ключа внутри источника считается в stats и обрабатывается по `policy`:
+      sum — складывается (почасовые разбивки, группы объявлений), last — последняя строка
+      заменяет предыдущие
+    """
+
+    def __init__(self, policy: str | None = None, stats: AggregateStats | None = None) -> None:
+        self.policy = policy or etl_config.MERGE_DUPLICATES
+        if self.policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"Неизвестная политика повторов: {self.policy}")
+
+        self.stats = stats if stats is not None else AggregateStats()
+        # key -> [spend, batch, spend в batch, conversions, batch, conversions в batch]
+        self._table: dict[tuple[date, str], list[Any]] = {}
+        self._batches = 0
+
+    def add_spend(self, records: Iterable[SpendRecord]) -> None:
+        """Добавить расходы одного источника"""
+
+        self._batches += 1
+        rows, duplicates = self._add(
+            ((r.date, r.campaign_id, r.spend) for r in records),
+            _SPEND,
+            _SPEND_BATCH,
+            _SPEND_IN_BATCH,
+        )
+        self.stats.spend_rows += rows
+        self.stats.spend_duplicates += duplicates
+
+    def add_conversions(self, records: Iterable[ConversionRecord]) -> None:
+        """Добавить конверсии одного источника"""
+
+        self._batches += 1
+        rows, duplicates = self._add(
+            ((r.date, r.campaign_id, r.conversions) for r in records),
+            _CONVERSIONS,
+            _CONVERSIONS_BATCH,
+            _CONVERSIONS_IN_BATCH,
+        )
+        self.stats.conversion_rows += rows
+        self.stats.conversion_duplicates += duplicates
+
+    def totals(self) -> Iterator[tuple[date, str, Decimal, int]]:
+        """(date, campaign_id, spend, conversions) по возрастанию ключа"""
+
+        self.stats.keys = len(self._table)
+        for (record_date, campaign_id), row in sorted(self._table.items()):
+            yield record_date, campaign_id, row[_SPEND], row[_CONVERSIONS]
+
+    def _add(
+        self,
+        rows: Iterable[tuple[date, str, Decimal | int]],
+        total: int,
+        batch: int,
+        in_batch: int,
+    ) -> tuple[int, int]:
+        table = self._table
+        current = self._batches
+        last = self.policy == LAST_POLICY
+        count = duplicates = 0
+
+        for record_date, campaign_id, value in rows:
+            count += 1
+            row = table.get((record_date, campaign_id))
+            if row is None:
+                row = table[(record_date, campaign_id)] = [Decimal("0"), 0, Decimal("0"), 0, 0, 0]
+
+            if row[batch] != current:
+                row[batch] = current
+                row[in_batch] = value
+                row[total] += value
+                continue
+
+            duplicates += 1
+            if last:
+                row[total] += value - row[in_batch]
+                row[in_batch] = value
+            else:
+                row[in_batch] += value
+                row[total] += value
+
+        return count, duplicates
@@ -0,0 +1,271 @@
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.database.db import Database
+from src.database.models import BackfillChunk
+from src.services.etl_service import ETLService
+from src.services.instrumentation import ETLResult
+from src.services.rate_limiter import RateLimiter
+from src.settings.etl import etl_config
+
+BACKFILL_CHUNKS = ("week", "month")
+CHUNK_STATUSES = ("pending", "running", "done", "failed")
+
+DateRange = tuple[date, date]
+
+
+def split_range(start_date: date, end_date: date, chunk: str) -> list[DateRange]:
+    """
+    Разбить период на чанки по календарным неделям (пн-вс) или месяцам.
+    Первый и последний чанки обрезаются границами периода.
+    """
+
+    if chunk not in BACKFILL_CHUNKS:
+        raise ValueError(f"Неизвестный размер чанка: {chunk}")
+    if start_date > end_date:
+        raise ValueError("Начальная дата позже конечной")
+
+    chunks: list[DateRange] = []
+    current = start_date
+
+    while current <= end_date:
+        if chunk == "week":
+            chunk_end = current + timedelta(days=6 - current.weekday())
+        else:
+            next_month = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+            chunk_end = next_month - timedelta(days=1)
+
+        chunk_end = min(chunk_end, end_date)
+        chunks.append((current, chunk_end))
+        current = chunk_end + timedelta(days=1)
+
+    return chunks
+
+
+class BackfillCheckpoints:
+    """
+    Чекпоинты backfill в таблице backfill_chunks: статус каждого чанка.
+
+    Повторный запуск c тем же backfill_id пропускает чанки в статусе done,
+    поэтому после падения процесса загрузка продолжается c места остановки.
+    """
+
+    def __init__(self, database: Database, backfill_id: str) -> None:
+        self.database = database
+        self.backfill_id = backfill_id
+
+    def register(self, chunks: list[DateRange]) -> None:
+        """Завести чанки (уже существующие не трогаются)"""
+
+        if not chunks:
+            return
+
+        with self.database.get_session() as session:
+            stmt = pg_insert(BackfillChunk).values(
+                [
+                    {"backfill_id": self.backfill_id, "start_date": start, "end_date": end, "status": "pending"}
+                    for start, end in chunks
+                ]
+            )
+            session.execute(stmt.on_conflict_do_nothing(index_elements=["backfill_id", "start_date"]))
+
+    def done_chunks(self) -> set[DateRange]:
+        """Завершённые чанки"""
+
+        with self.database.get_session() as session:
+            rows = session.execute(
+                select(BackfillChunk.start_date, BackfillChunk.end_date)
+                .where(BackfillChunk.backfill_id == self.backfill_id)
+                .where(BackfillChunk.status == "done")
+            ).all()
+
+        return {(start, end) for start, end in rows}
+
+    def mark_running(self, chunk: DateRange) -> None:
+        self._update(chunk, status="running", attempts=BackfillChunk.attempts + 1, error=None)
+
+    def mark_done(self, chunk: DateRange, rows: int, duration_seconds: float) -> None:
+        self._update(
+            chunk,
+            status="done",
+            rows=rows,
+            duration_seconds=round(duration_seconds, 3),
+            finished_at=func.clock_timestamp(),
+            error=None,
+        )
+
+    def mark_failed(self, chunk: DateRange, error: str, duration_seconds: float) -> None:
+        self._update(
+            chunk,
+            status="failed",
+            duration_seconds=round(duration_seconds, 3),
+            finished_at=func.clock_timestamp(),
+            error=error[:2000],
+        )
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Количество чанков по статусам.
+        """
+
+        with self.database.get_session() as session:
+            rows = session.execute(
+                select(BackfillChunk.status, func.count())
+                .where(BackfillChunk.backfill_id == self.backfill_id)
+                .group_by(BackfillChunk.status)
+            ).all()
+
+        stats = dict.fromkeys(CHUNK_STATUSES, 0)
+        stats.update({status: int(count) for status, count in rows})
+        return stats
+
+    def _update(self, chunk: DateRange, **values: object) -> None:
+        with self.database.get_session() as session:
+            session.execute(
+                update(BackfillChunk)
+                .where(BackfillChunk.backfill_id == self.backfill_id)
+                .where(BackfillChunk.start_date == chunk[0])
+                .values(**values)
+            )
+
+
+@dataclass
+class ChunkResult:
+    """Итог одного чанка"""
+
+    start_date: date
+    end_date: date
+    rows: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class BackfillResult:
+    """Итог backfill: сколько чанков выполнено в этом запуске и сколько пропущено по чекпоинту"""
+
+    backfill_id: str
+    chunks_total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    failed_chunks: list[ChunkResult] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows / self.seconds, 1) if self.seconds > 0 else 0.0
+
+
+class BackfillRunner:
+    """
+    Загрузка большого периода чанками c чекпоинтами.
+
+    Каждый чанк — отдельный ETLService.run: в памяти только данные чанка,
+    упавший чанк не откатывает остальные. Чанки выполняются на пуле из `workers`
+    потоков; после каждого вызывается `on_chunk_done` (прогресс в CLI).
+    Источники списывают общую квоту `rate_limiter` (по слоту на чтение файла
+    или HTTP запрос); чанк, не уложившийся в квоту, помечается failed и
+    догружается повторным запуском.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        start_date: date,
+        end_date: date,
+        chunk: str = etl_config.BACKFILL_CHUNK,
+        workers: int = etl_config.BACKFILL_WORKERS,
+        backfill_id: str | None = None,
+        etl_service: ETLService | None = None,
+        checkpoints: BackfillCheckpoints | None = None,
+        on_chunk_done: Callable[[ChunkResult], None] | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.chunks = split_range(start_date, end_date, chunk)
+        self.workers = max(workers, 1)
+        self.backfill_id = backfill_id or f"{start_date}_{end_date}_{chunk}"
+        self.rate_limiter = rate_limiter or RateLimiter(database=database)
+        self.etl_service = etl_service or ETLService(database=database, rate_limiter=self.rate_limiter)
+        self.checkpoints = checkpoints or BackfillCheckpoints(database, self.backfill_id)
+        self.on_chunk_done = on_chunk_done
+
+    def pending_chunks(self) -> list[DateRange]:
+        """Чанки, которые ещё не завершены (c учётом прошлых запусков)"""
+
+        self.checkpoints.register(self.chunks)
+        done = self.checkpoints.done_chunks()
+        return [chunk for chunk in self.chunks if chunk not in done]
+
+    def run(self) -> BackfillResult:
+        """
+        Выполнить незавершённые чанки.
+        """
+
+        pending = self.pending_chunks()
+        result = BackfillResult(
+            backfill_id=self.backfill_id,
+            chunks_total=len(self.chunks),
+            skipped=len(self.chunks) - len(pending),
+        )
+
+        if result.skipped:
+            logger.info(f"⏭️ Backfill {self.backfill_id}: чанков уже загружено: {result.skipped}/{len(self.chunks)}")
+
+        started_at = time.monotonic()
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill")
+        futures = [executor.submit(self._run_chunk, chunk) for chunk in pending]
+
+        try:
+            for future in as_completed(futures):
+                chunk_result = future.result()
+
+                if chunk_result.error is None:
+                    result.succeeded += 1
+                    result.rows += chunk_result.rows
+                else:
+                    result.failed += 1
+                    result.failed_chunks.append(chunk_result)
+
+                if self.on_chunk_done is not None:
+                    self.on_chunk_done(chunk_result)
+        finally:
+            # Ctrl+C: начатые чанки дописываются, остальные остаются pending до следующего запуска
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        result.seconds = round(time.monotonic() - started_at, 3)
+        logger.info(
+            f"🏁 Backfill {self.backfill_id}: успешно {result.succeeded}, ошибок {result.failed}, "
+            f"пропущено {result.skipped}, строк {result.rows}, {result.rows_per_second} строк/c"
+        )
+        return result
+
+    def _run_chunk(self, chunk: DateRange) -> ChunkResult:
+        start, end = chunk
+        self.checkpoints.mark_running(chunk)
+        started_at = time.monotonic()
+
+        try:
+            records = self.etl_service.run(start_date=start, end_date=end)
+        except Exception as e:
+            seconds = time.monotonic() - started_at
+            self.checkpoints.mark_failed(chunk, str(e), seconds)
+            logger.error(f"❌ Backfill {start} — {end}: {e}")
+            return ChunkResult(start, end, seconds=seconds, error=str(e))
+
+        seconds = time.monotonic() - started_at
+        rows = len(records)
+        if isinstance(records, ETLResult):
+            rows = records.rows_written
+            logger.bind(etl_report=True).debug(records.report.to_json())
+        self.checkpoints.mark_done(chunk, rows, seconds)
+        return ChunkResult(start, end, rows=rows, seconds=seconds)
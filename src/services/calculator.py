@@ -1,7 +1,9 @@
+from collections.abc import Iterable
 from datetime import date
 from decimal import Decimal
 
 from src.schemas import ConversionRecord, MergedRecord, SpendRecord
+from src.services.aggregation import AggregateStats, HashAggregator
 
 
 class CPACalculator:
@@ -21,43 +23,48 @@ class CPACalculator:
 
     @staticmethod
     def merge_data(
-        spend_records: list[SpendRecord],
-        conversion_records: list[ConversionRecord],
+        spend_records: Iterable[SpendRecord],
+        conversion_records: Iterable[ConversionRecord],
+        policy: str | None = None,
+        stats: AggregateStats | None = None,
     ) -> list[MergedRecord]:
         """
         Объединение данных по date + campaign_id и расчёт CPA.
-        """
-
-        spend_dict: dict[tuple[date, str], Decimal] = {
-            (record.date, record.campaign_id): record.spend for record in spend_records
-        }
-
-        conversion_dict: dict[tuple[date, str], int] = {
-            (record.date, record.campaign_id): record.conversions for record in conversion_records
-        }
 
-        all_keys = set(spend_dict.keys()) | set(conversion_dict.keys())
-
-        merged_records: list[MergedRecord] = []
+        Повторы ключа суммируются или заменяются по `policy` (MERGE_DUPLICATES),
+        их число попадает в `stats`.
+        """
 
-        for key in all_keys:
-            record_date, campaign_id = key
-            spend = spend_dict.get(key, Decimal("0"))
-            conversions = conversion_dict.get(key, 0)
+        return CPACalculator.merge_sources([spend_records], [conversion_records], policy, stats)
 
-            cpa = CPACalculator.calculate_cpa(spend, conversions)
+    @staticmethod
+    def merge_sources(
+        spend_sources: Iterable[Iterable[SpendRecord]],
+        conversion_sources: Iterable[Iterable[ConversionRecord]],
+        policy: str | None = None,
+        stats: AggregateStats | None = None,
+    ) -> list[MergedRecord]:
+        """
+        Объединение нескольких источников за один проход (см. HashAggregator):
+        значения разных источников по одному ключу складываются.
+        """
 
-            merged_records.append(
-                MergedRecord(
-                    date=record_date,
-                    campaign_id=campaign_id,
-                    spend=spend,
-                    conversions=conversions,
-                    cpa=cpa,
-                )
+        aggregator = HashAggregator(policy, stats)
+        for spend_records in spend_sources:
+            aggregator.add_spend(spend_records)
+        for conversion_records in conversion_sources:
+            aggregator.add_conversions(conversion_records)
+
+        return [
+            MergedRecord(
+                date=record_date,
+                campaign_id=campaign_id,
+                spend=spend,
+                conversions=conversions,
+                cpa=CPACalculator.calculate_cpa(spend, conversions),
             )
-
-        return sorted(merged_records, key=lambda x: (x.date, x.campaign_id))
+            for record_date, campaign_id, spend, conversions in aggregator.totals()
+        ]
 
     @staticmethod
     def filter_by_date_range(
@@ -0,0 +1,162 @@
+import contextlib
+import os
+import socket
+from datetime import date, timedelta
+
+from loguru import logger
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+
+from src.database.db import Database
+from src.database.models import DateClaim
+from src.settings.scheduler import scheduler_config
+
+COORDINATION_MODES = ("none", "leader", "shard")
+
+# Advisory lock c ключом bigint: старшие 32 бита в classid, младшие в objid, objsubid = 1
+_LOCK_HELD = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted "
+    "AND pid = pg_backend_pid() AND classid::bigint = :classid AND objid::bigint = :objid AND objsubid = 1)"
+)
+
+
+class DatesClaimedError(Exception):
+    """Даты диапазона забраны другой репликой"""
+
+
+def default_worker_id() -> str:
+    """Идентификатор воркера: WORKER_ID из настроек или hostname-pid"""
+
+    return scheduler_config.WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaderElector:
+    """
+    Выбор лидера через session-level advisory lock PostgreSQL.
+
+    Лок держится на отдельном autocommit соединении (сессия не висит в транзакции),
+    пока процесс жив; при падении процесса PostgreSQL снимает лок сам и лидером
+    становится другая реплика. Каждый запуск лидер проверяет по pg_locks, что лок
+    всё ещё принадлежит этой сессии.
+    """
+
+    def __init__(self, database: Database, lock_key: int = scheduler_config.LEADER_LOCK_KEY) -> None:
+        self.database = database
+        self.lock_key = lock_key
+        self._connection: Connection | None = None
+        self.is_leader = False
+
+    def try_acquire(self) -> bool:
+        """
+        Попытаться стать лидером (или подтвердить лидерство).
+        """
+
+        try:
+            if self._connection is None:
+                self._connection = self.database.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+            if self.is_leader:
+                if self._holds_lock(self._connection):
+                    return True
+                logger.warning(f"⚠️ Процесс {default_worker_id()} потерял advisory lock лидера")
+                self.is_leader = False
+
+            acquired = bool(self._connection.execute(select(func.pg_try_advisory_lock(self.lock_key))).scalar_one())
+        except Exception as e:
+            logger.warning(f"⚠️ Потеряно соединение лидера: {e}")
+            self._reset()
+            return False
+
+        if acquired and not self.is_leader:
+            logger.info(f"👑 Процесс {default_worker_id()} стал лидером")
+
+        self.is_leader = acquired
+        return acquired
+
+    def release(self) -> None:
+        """Отказаться от лидерства"""
+
+        if self._connection is not None and self.is_leader:
+            try:
+                self._connection.execute(select(func.pg_advisory_unlock(self.lock_key)))
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка снятия advisory lock: {e}")
+
+        self._reset()
+
+    def _holds_lock(self, connection: Connection) -> bool:
+        params = {"classid": (self.lock_key >> 32) & 0xFFFFFFFF, "objid": self.lock_key & 0xFFFFFFFF}
+        return bool(connection.execute(_LOCK_HELD, params).scalar_one())
+
+    def _reset(self) -> None:
+        if self._connection is not None:
+            with contextlib.suppress(Exception):
+                self._connection.close()
+        self._connection = None
+        self.is_leader = False
+
+
+class DateClaimer:
+    """
+    Распределение дат между репликами через таблицу date_claims.
+
+    Каждая реплика забирает свободные даты (или даты c истёкшей арендой)
+    через SELECT ... FOR UPDATE SKIP LOCKED, поэтому две реплики
+    никогда не получают одну и ту же дату одновременно.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        worker_id: str | None = None,
+        lease_seconds: int = scheduler_config.CLAIM_LEASE_SECONDS,
+    ) -> None:
+        self.database = database
+        self.worker_id = worker_id or default_worker_id()
+        self.lease = timedelta(seconds=lease_seconds)
+
+    def claim(self, dates: list[date]) -> list[date]:
+        """
+        Забрать в аренду свободные даты из списка. Возвращает полученные даты.
+        """
+
+        if not dates:
+            return []
+
+        with self.database.get_session() as session:
+            session.execute(pg_insert(DateClaim).values([{"date": d} for d in dates]).on_conflict_do_nothing())
+
+            now = func.clock_timestamp()
+            free = (
+                select(DateClaim.date)
+                .where(DateClaim.date.in_(dates))
+                .where(
+                    (DateClaim.lease_expires_at.is_(None))
+                    | (DateClaim.lease_expires_at < now)
+                    | (DateClaim.worker_id == self.worker_id)
+                )
+                .order_by(DateClaim.date)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = list(session.execute(free).scalars())
+
+            if claimed:
+                session.execute(
+                    update(DateClaim)
+                    .where(DateClaim.date.in_(claimed))
+                    .values(worker_id=self.worker_id, claimed_at=now, lease_expires_at=now + self.lease)
+                )
+
+        return claimed
+
+    def release(self, dates: list[date] | None = None) -> None:
+        """
+        Освободить аренду своих дат (всех, если dates не указан).
+        """
+
+        with self.database.get_session() as session:
+            stmt = update(DateClaim).where(DateClaim.worker_id == self.worker_id)
+            if dates is not None:
+                stmt = stmt.where(DateClaim.date.in_(dates))
+            session.execute(stmt.values(lease_expires_at=None))
@@ -1,5 +1,7 @@
 import json
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
 from src.schemas import ConversionRecord, SpendRecord
 
@@ -18,6 +20,54 @@ class DataLoader:
 
         return [SpendRecord(**record) for record in data]
 
+    @staticmethod
+    def iter_rows(file_path: Path, batch_rows: int, read_size: int = 64 * 1024) -> Iterator[list[dict[str, Any]]]:
+        """
+        Строки JSON массива порциями по `batch_rows` (без валидации).
+        Файл читается блоками по `read_size` символов и целиком в памяти не держится.
+        """
+
+        decoder = json.JSONDecoder()
+        batch: list[dict[str, Any]] = []
+        buffer, pos = "", 0
+        eof = opened = False
+
+        with open(file_path, encoding="utf-8") as f:
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+
+                if pos < len(buffer) and not opened:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{file_path}: ожидался JSON массив")
+                    opened = True
+                    pos += 1
+                    continue
+
+                if pos < len(buffer) and buffer[pos] == "]":
+                    break
+
+                try:
+                    if pos == len(buffer):
+                        raise json.JSONDecodeError("пустой буфер", buffer, pos)
+                    row, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Строка не поместилась в прочитанный блок — дочитываем
+                    if eof:
+                        raise
+                    chunk = f.read(read_size)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+
+                batch.append(row)
+                if len(batch) >= batch_rows:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
+
     @staticmethod
     def load_conversion_data(file_path: Path) -> list[ConversionRecord]:
         """
@@ -0,0 +1,219 @@
+import threading
+import time
+from datetime import date
+from typing import Any
+
+from loguru import logger
+
+from src.database.db import Database
+from src.settings.etl import etl_config
+
+
+class BufferedWriter:
+    """
+    Фоновая запись статистики в БД (write-behind).
+
+    Строки накапливаются в ограниченном буфере, повторные ключи (date, campaign_id)
+    схлопываются — остаётся последнее значение. Буфер сбрасывается по размеру
+    или по таймеру; при заполнении буфера `submit` блокируется (backpressure).
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        queue_size: int = etl_config.WRITER_QUEUE_SIZE,
+        flush_rows: int = etl_config.WRITER_FLUSH_ROWS,
+        flush_interval: float = etl_config.WRITER_FLUSH_INTERVAL_SECONDS,
+        put_timeout: float = etl_config.WRITER_PUT_TIMEOUT_SECONDS,
+    ) -> None:
+        """
+        Инициализация фонового писателя.
+        """
+
+        self.database = database
+        self.queue_size = queue_size
+        self.flush_rows = min(flush_rows, queue_size)
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._pending: dict[tuple[date, str], dict[str, Any]] = {}
+        self._pending_watermarks: dict[tuple[date, str], dict[str, Any]] = {}
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread: threading.Thread | None = None
+
+        self.rows_submitted = 0
+        self.rows_coalesced = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запуск фонового потока записи"""
+
+        if self.is_running:
+            return
+
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, stats_list: list[dict[str, Any]], watermarks: list[dict[str, Any]] | None = None) -> None:
+        """
+        Поставить строки в очередь на запись.
+
+        Блокируется, пока в буфере нет места: полный буфер сразу будит поток записи.
+        Если место не освободилось за `put_timeout` секунд (на весь вызов) — TimeoutError.
+        Watermarks записываются в той же пачке, что и последние строки этого вызова, после них.
+        """
+
+        if not self.is_running:
+            raise RuntimeError("BufferedWriter не запущен")
+
+        deadline = time.monotonic() + self.put_timeout
+
+        with self._cond:
+            for row in stats_list:
+                key = (row["date"], row["campaign_id"])
+
+                if key not in self._pending:
+                    while len(self._pending) + self._inflight >= self.queue_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("Буфер записи переполнен")
+                        self._cond.notify_all()
+                        self._cond.wait(remaining)
+                else:
+                    self.rows_coalesced += 1
+
+                self._pending[key] = row
+                self.rows_submitted += 1
+
+            for watermark in watermarks or []:
+                self._pending_watermarks[(watermark["date"], watermark["source"])] = watermark
+
+            if len(self._pending) >= self.flush_rows:
+                self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Дождаться записи всех накопленных строк.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._pending_watermarks or self._inflight:
+                if not self.is_running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else self.flush_interval)
+
+        return True
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Остановка c гарантированным сбросом буфера.
+        """
+
+        if self._thread is None:
+            return
+
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+        self._thread = None
+
+        if self._pending or self._pending_watermarks:
+            logger.error(f"❌ BufferedWriter остановлен, не записано строк: {len(self._pending)}")
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Получить статистику работы писателя.
+        """
+
+        with self._cond:
+            pending = len(self._pending) + self._inflight
+
+        return {
+            "submitted": self.rows_submitted,
+            "coalesced": self.rows_coalesced,
+            "written": self.rows_written,
+            "pending": pending,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def _run(self) -> None:
+        """Цикл фонового потока: ждём порог размера/времени и пишем пачку"""
+
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closing and len(self._pending) < self.flush_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if not self._pending and not self._pending_watermarks:
+                    if self._closing:
+                        return
+                    continue
+
+                batch = self._pending
+                batch_watermarks = self._pending_watermarks
+                self._pending = {}
+                self._pending_watermarks = {}
+                self._inflight = len(batch) + len(batch_watermarks)
+                closing = self._closing
+                self._cond.notify_all()
+
+            success = self._write(batch, batch_watermarks)
+
+            with self._cond:
+                self._inflight = 0
+                if not success:
+                    for key, row in batch.items():
+                        self._pending.setdefault(key, row)
+                    for key, watermark in batch_watermarks.items():
+                        self._pending_watermarks.setdefault(key, watermark)
+                self._cond.notify_all()
+
+            if not success:
+                if closing:
+                    return
+                with self._cond:
+                    if not self._closing:
+                        self._cond.wait(self.flush_interval)
+
+    def _write(
+        self,
+        batch: dict[tuple[date, str], dict[str, Any]],
+        watermarks: dict[tuple[date, str], dict[str, Any]],
+    ) -> bool:
+        """Запись пачки в БД. При ошибке строки возвращаются в буфер"""
+
+        try:
+            if batch:
+                self.database.bulk_upsert_stats(list(batch.values()))
+            if watermarks:
+                self.database.upsert_watermarks(list(watermarks.values()))
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.error(f"❌ Ошибка фоновой записи {len(batch)} строк: {e}")
+            return False
+
+        self.flushes += 1
+        self.rows_written += len(batch)
+        return True
@@ -1,51 +1,200 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager
 from datetime import date
+from typing import Any, cast
+
+from loguru import logger
 
 from src.database.db import Database
-from src.schemas import MergedRecord
+from src.schemas import ConversionRecord, MergedRecord, SpendRecord
+from src.services.aggregation import AggregateStats
 from src.services.calculator import CPACalculator
-from src.services.data_loader import DataLoader
+from src.services.db_writer import BufferedWriter
+from src.services.http_extractor import HTTPExtractor
+from src.services.instrumentation import ETLResult, RunReport, StageMetrics
+from src.services.rate_limiter import RateLimiter
+from src.services.sources import (
+    CONVERSION_KIND,
+    SPEND_KIND,
+    SourceRegistry,
+    SourceResult,
+)
+from src.services.watermarks import WatermarkTracker
 from src.settings.api import api_config
+from src.settings.etl import etl_config
+
+API_SOURCES = ("file", "http")
 
 
 class ETLService:
     """Сервис для ETL процесса: Extract, Transform, Load"""
 
-    def __init__(self, database: Database) -> None:
+    def __init__(
+        self,
+        database: Database,
+        writer: BufferedWriter | None = None,
+        stage_hook: Callable[[str], AbstractContextManager[Any]] | None = None,
+        extractor: HTTPExtractor | None = None,
+        registry: SourceRegistry | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
         """
         Инициализация ETL сервиса.
+
+        Если передан `writer`, запись в БД идёт в фоне и `run` не ждёт коммита.
+        `stage_hook` оборачивает каждую стадию (см. RunReport.stage), например профайлером.
+        `registry` — источники расходов и конверсий (по умолчанию из настроек, см. SourceRegistry);
+        `extractor` (или API_SOURCE=http) — загрузка из HTTP API вместо файлов data/;
+        `rate_limiter` — квота API, которую источники реестра расходуют: файл — на чтение, HTTP — на запрос.
         """
 
+        if api_config.API_SOURCE not in API_SOURCES:
+            raise ValueError(f"Неизвестный источник данных: {api_config.API_SOURCE}")
+
         self.database = database
-        self.data_loader = DataLoader()
+        self.writer = writer
+        self.stage_hook = stage_hook
+        self.rate_limiter = rate_limiter
+        self.registry = registry or SourceRegistry.from_config(
+            database=database, extractor=extractor, rate_limiter=rate_limiter
+        )
         self.calculator = CPACalculator()
 
     def run(
         self,
         start_date: date | None = None,
         end_date: date | None = None,
-    ) -> list[MergedRecord]:
+        skip_unchanged: bool = False,
+    ) -> ETLResult:
         """
         Запуск полного ETL процесса.
+
+        Возвращает список записей c отчётом по стадиям в `.report`
+        (wall/CPU время, строки на входе и выходе, прочитанные байты, пиковый RSS)
+        и числом записанных строк в `.rows_written`.
+
+        По умолчанию пишутся все записи периода. `skip_unchanged` (инкрементальный запуск
+        планировщика) пропускает даты, отпечаток входных данных которых не изменился;
+        watermarks обновляются в обоих случаях.
         """
 
-        spend_records = self.data_loader.load_spend_data(api_config.fb_spend_path)
-        conversion_records = self.data_loader.load_conversion_data(api_config.network_conv_path)
+        report = RunReport(
+            start_date=start_date.isoformat() if start_date else None,
+            end_date=end_date.isoformat() if end_date else None,
+            stage_hook=self.stage_hook,
+        )
+
+        source_results = self._extract(report, start_date, end_date)
 
-        merged_records = self.calculator.merge_data(spend_records, conversion_records)
+        with report.stage("merge", rows_in=sum(len(r.records) for r in source_results)) as stage:
+            aggregate_stats = AggregateStats()
+            merged_records = self.calculator.merge_sources(
+                (cast(list[SpendRecord], r.records) for r in source_results if r.kind == SPEND_KIND),
+                (cast(list[ConversionRecord], r.records) for r in source_results if r.kind == CONVERSION_KIND),
+                stats=aggregate_stats,
+            )
+            stage.rows_out = len(merged_records)
+            stage.duplicates = aggregate_stats.duplicates
+
+        if aggregate_stats.duplicates:
+            logger.info(
+                f"🔁 Повторы ключей (date, campaign_id): расходы {aggregate_stats.spend_duplicates}, "
+                f"конверсии {aggregate_stats.conversion_duplicates} (MERGE_DUPLICATES={etl_config.MERGE_DUPLICATES})"
+            )
 
         if start_date or end_date:
-            merged_records = self.calculator.filter_by_date_range(merged_records, start_date, end_date)
+            with report.stage("filter", rows_in=len(merged_records)) as stage:
+                merged_records = self.calculator.filter_by_date_range(merged_records, start_date, end_date)
+                stage.rows_out = len(merged_records)
+
+        with report.stage("watermarks", rows_in=len(merged_records)) as stage:
+            fingerprints = WatermarkTracker.fingerprint_sources(
+                {result.source: result.records for result in source_results},
+                start_date,
+                end_date,
+            )
+            all_dates = {d for by_date in fingerprints.values() for d in by_date}
+            existing = self.database.get_watermarks(min(all_dates), max(all_dates)) if all_dates else []
+            changed_dates, watermarks = WatermarkTracker.build(fingerprints, existing)
+            records_to_write = (
+                [r for r in merged_records if r.date in changed_dates] if skip_unchanged else merged_records
+            )
+            stage.rows_out = len(records_to_write)
+
+        with report.stage("upsert", rows_in=len(records_to_write)) as stage:
+            self._save_to_database(records_to_write, watermarks)
+            stage.rows_out = len(records_to_write)
+
+        return ETLResult(merged_records, report, rows_written=len(records_to_write))
 
-        self._save_to_database(merged_records)
+    def is_cached(self, start_date: date | None = None, end_date: date | None = None) -> bool:
+        """
+        Данные за период целиком в кэше ответов API: запуск не расходует квоту RateLimiter.
+        """
+
+        return self.registry.is_cached(start_date, end_date)
+
+    def _extract(
+        self,
+        report: RunReport,
+        start_date: date | None,
+        end_date: date | None,
+    ) -> list[SourceResult]:
+        """
+        Загрузка всех источников реестра.
+
+        Источники запускаются одновременно, поэтому общее время — время самого медленного;
+        стадии load_spend / load_conversions ждут свои источники; записи сводятся в merge.
+        При `stage_hook` (профилирование) источники читаются по очереди внутри стадий,
+        иначе профайлер не увидит работу потоков.
+        """
+
+        sources = self.registry.sources
+        executor = None
+        futures: dict[str, Future[SourceResult]] = {}
+        if self.stage_hook is None and len(sources) > 1:
+            executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="extract")
+            futures = {s.name: executor.submit(s.extract, start_date, end_date) for s in sources}
 
-        return merged_records
+        def collect(kind: str) -> list[SourceResult]:
+            return [
+                futures[s.name].result() if s.name in futures else s.extract(start_date, end_date)
+                for s in self.registry.by_kind(kind)
+            ]
 
-    def _save_to_database(self, records: list[MergedRecord]) -> None:
+        try:
+            with report.stage("load_spend") as stage:
+                spend_results = collect(SPEND_KIND)
+                self._fill_load_stage(stage, spend_results)
+
+            with report.stage("load_conversions") as stage:
+                conversion_results = collect(CONVERSION_KIND)
+                self._fill_load_stage(stage, conversion_results)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        for result in spend_results + conversion_results:
+            logger.debug(f"🔌 {result.source}: {len(result.records)} строк за {result.seconds:.3f} c")
+
+        return spend_results + conversion_results
+
+    @staticmethod
+    def _fill_load_stage(stage: StageMetrics, results: list[SourceResult]) -> None:
+        stage.rows_in = stage.rows_out = sum(len(r.records) for r in results)
+        stage.bytes_read = sum(r.bytes_read for r in results)
+        stage.requests = sum(r.requests for r in results)
+
+    def _save_to_database(self, records: list[MergedRecord], watermarks: list[dict[str, Any]] | None = None) -> None:
         """
         Сохранение записей в базу данных (bulk upsert).
+
+        Watermarks пишутся после статистики, чтобы дата не считалась
+        загруженной раньше, чем записаны её строки.
         """
 
-        if not records:
+        if not records and not watermarks:
             return
 
         stats_list = [
@@ -59,7 +208,14 @@ class ETLService:
             for record in records
         ]
 
-        self.database.bulk_upsert_stats(stats_list)
+        if self.writer is not None and self.writer.is_running:
+            self.writer.submit(stats_list, watermarks)
+            return
+
+        if stats_list:
+            self.database.bulk_upsert_stats(stats_list)
+        if watermarks:
+            self.database.upsert_watermarks(watermarks)
 
     def print_summary(self, records: list[MergedRecord]) -> None:
         """
@@ -0,0 +1,226 @@
+import gzip
+import io
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+from typing import IO, Any
+
+from sqlalchemy import Select, literal_column, select
+
+from src.database.db import Database
+from src.database.models import DailyStats
+from src.settings.etl import etl_config
+
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
+PARQUET_FORMAT = "parquet"
+EXPORT_FORMATS = (CSV_FORMAT, NDJSON_FORMAT, PARQUET_FORMAT)
+COMPRESSIONS = ("none", "gzip")
+EXPORT_COLUMNS = ("date", "campaign_id", "spend", "conversions", "cpa")
+
+CSV_COPY_OPTIONS = "FORMAT csv, HEADER true"
+# Управляющие символы вместо кавычки и разделителя: строка JSON выходит из COPY как есть
+NDJSON_COPY_OPTIONS = "FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02'"
+
+
+@dataclass
+class ExportStats:
+    """Итог выгрузки"""
+
+    format: str
+    rows: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class StatsExporter:
+    """
+    Потоковая выгрузка daily_stats за период через COPY ... TO STDOUT.
+
+    - csv и ndjson формирует Postgres, строки идут из сокета в файл без Python объектов
+    - parquet (нужен pyarrow) собирается из CSV потока группами по `row_group_rows` строк
+    - gzip сжимает поток на лету (для parquet — кодек колонок)
+
+    Память не зависит от длины периода: в ней только текущий блок COPY
+    (для parquet — текущая группа строк).
+    """
+
+    def __init__(self, database: Database, row_group_rows: int | None = None) -> None:
+        self.database = database
+        self.row_group_rows = row_group_rows or etl_config.EXPORT_PARQUET_ROW_GROUP_ROWS
+
+    def export(
+        self,
+        output: IO[bytes],
+        fmt: str = CSV_FORMAT,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        compression: str = "none",
+    ) -> ExportStats:
+        """
+        Записать статистику за период в `output` (файл или sys.stdout.buffer).
+        """
+
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Неизвестное сжатие: {compression}")
+
+        stats = ExportStats(format=fmt)
+        started_at = time.perf_counter()
+        sink = _CountingWriter(output)
+        query = self.query(start_date, end_date)
+
+        if fmt == PARQUET_FORMAT:
+            parquet = _ParquetSink(sink, self.row_group_rows, compression)
+            try:
+                stats.rows = self.database.copy_to(query, parquet, "FORMAT csv")
+            finally:
+                parquet.close()
+        else:
+            target: _CountingWriter | gzip.GzipFile = sink
+            if compression == "gzip":
+                # mtime=0: одинаковые данные — одинаковый архив
+                target = gzip.GzipFile(fileobj=sink, mode="wb", mtime=0)
+            try:
+                if fmt == CSV_FORMAT:
+                    stats.rows = self.database.copy_to(query, target, CSV_COPY_OPTIONS)
+                else:
+                    stats.rows = self.database.copy_to(self.ndjson_query(query), target, NDJSON_COPY_OPTIONS)
+            finally:
+                if target is not sink:
+                    target.close()
+
+        output.flush()
+        stats.bytes_written = sink.bytes_written
+        stats.seconds = round(time.perf_counter() - started_at, 6)
+        return stats
+
+    def export_to_path(
+        self,
+        path: Path | None,
+        fmt: str = CSV_FORMAT,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        compression: str = "none",
+    ) -> ExportStats:
+        """
+        Выгрузка в файл (None — в stdout). Файл пишется во временный и переименовывается
+        по завершении: прерванная выгрузка не оставляет обрезанный файл.
+        """
+
+        if path is None:
+            return self.export(sys.stdout.buffer, fmt, start_date, end_date, compression)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                stats = self.export(f, fmt, start_date, end_date, compression)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return stats
+
+    @staticmethod
+    def query(
+        start_date: date | None = None,
+        end_date: date | None = None,
+        campaign_id: str | None = None,
+    ) -> Select[Any]:
+        """SELECT колонок EXPORT_COLUMNS за период в порядке (date, campaign_id)"""
+
+        query = select(*(getattr(DailyStats, column) for column in EXPORT_COLUMNS))
+        if start_date is not None:
+            query = query.where(DailyStats.date >= start_date)
+        if end_date is not None:
+            query = query.where(DailyStats.date <= end_date)
+        if campaign_id is not None:
+            query = query.where(DailyStats.campaign_id == campaign_id)
+        return query.order_by(DailyStats.date, DailyStats.campaign_id)
+
+    @staticmethod
+    def ndjson_query(query: Select[Any]) -> Select[Any]:
+        rows = query.subquery("export_rows")
+        return select(literal_column("row_to_json(export_rows)")).select_from(rows)
+
+
+class _CountingWriter(io.RawIOBase):
+    """Обёртка над выходным файлом: считает записанные байты"""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        super().__init__()
+        self.file = file
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        written = self.file.write(data)
+        self.bytes_written += written
+        return written
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+class _ParquetSink:
+    """
+    Приёмник CSV строк из COPY: каждые `row_group_rows` строк — row group в Parquet.
+    """
+
+    def __init__(self, file: "_CountingWriter", row_group_rows: int, compression: str) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Для выгрузки в Parquet нужен pyarrow: poetry install --extras parquet") from e
+
+        self.schema = pa.schema(
+            [
+                ("date", pa.date32()),
+                ("campaign_id", pa.string()),
+                ("spend", pa.decimal128(10, 2)),
+                ("conversions", pa.int32()),
+                ("cpa", pa.decimal128(10, 2)),
+            ]
+        )
+        self.row_group_rows = row_group_rows
+        self._writer = pq.ParquetWriter(
+            file,
+            self.schema,
+            compression="gzip" if compression == "gzip" else "snappy",
+        )
+        self._lines: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        # psycopg2 передаёт одну строку COPY за вызов
+        self._lines.append(data)
+        if len(self._lines) >= self.row_group_rows:
+            self._flush()
+        return len(data)
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def _flush(self) -> None:
+        if not self._lines:
+            return
+
+        import pyarrow.csv as pa_csv
+
+        table = pa_csv.read_csv(
+            io.BytesIO(b"".join(self._lines)),
+            read_options=pa_csv.ReadOptions(column_names=list(EXPORT_COLUMNS)),
+            convert_options=pa_csv.ConvertOptions(column_types=self.schema, strings_can_be_null=False),
+        )
+        self._writer.write_table(table)
+        self._lines = []
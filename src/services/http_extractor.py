@@ -0,0 +1,375 @@
+import http.client
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, TypeVar
+from urllib.parse import urlencode, urlsplit
+
+from loguru import logger
+
+from src.schemas import ConversionRecord, SpendRecord
+from src.services.rate_limiter import RateLimiter
+from src.services.response_cache import ResponseCache
+from src.settings.api import api_config
+
+SPEND_ENDPOINT = "fb_spend"
+CONVERSION_ENDPOINT = "network_conv"
+TOTAL_PAGES_HEADER = "X-Total-Pages"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+ModelT = TypeVar("ModelT", SpendRecord, ConversionRecord)
+
+# Ошибки переиспользованного keep-alive соединения, которое сервер уже закрыл
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class APIError(Exception):
+    """Ошибка ответа API источника"""
+
+
+class QuotaExceededError(APIError):
+    """Запрос к API не помещается в квоту RateLimiter"""
+
+
+@dataclass
+class ExtractStats:
+    """Счётчики HTTP экстрактора: каждый запрос, включая ответы 429, расходует квоту API"""
+
+    requests: int = 0
+    pages: int = 0
+    rows: int = 0
+    bytes_read: int = 0
+    throttled: int = 0
+    connections_opened: int = 0
+    cache_hits: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ConnectionPool:
+    """
+    Пул keep-alive соединений к одному хосту (http.client).
+
+    Соединение берётся на время одного запроса и возвращается после того, как
+    ответ прочитан до конца; лишние (больше `size`) закрываются.
+    """
+
+    def __init__(self, base_url: str, size: int, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Некорректный адрес API: {base_url}")
+
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.size = max(size, 1)
+        self.timeout = timeout
+        self.opened = 0
+
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[tuple[http.client.HTTPConnection, bool]]:
+        """
+        Соединение из пула и признак того, что оно уже использовалось.
+        При исключении соединение закрывается и в пул не возвращается.
+        """
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+
+        reused = conn is not None
+        if conn is None:
+            conn = self._open()
+
+        try:
+            yield conn, reused
+        except BaseException:
+            conn.close()
+            raise
+
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def count_opened(self) -> None:
+        with self._lock:
+            self.opened += 1
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _open(self) -> http.client.HTTPConnection:
+        connection_cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.count_opened()
+        return connection_cls(self.host, self.port, timeout=self.timeout)
+
+
+class HTTPExtractor:
+    """
+    Загрузка fb_spend / network_conv из HTTP API постранично.
+
+    - keep-alive пул соединений: TCP соединение не открывается на каждую страницу
+    - первая страница сообщает число страниц (заголовок X-Total-Pages),
+      остальные запрашиваются параллельно на `concurrency` потоках
+    - ответ в NDJSON разбирается построчно по мере чтения, тело целиком в памяти не держится
+    - 429 повторяется после Retry-After (не больше `max_retries` раз подряд)
+    - если передан `rate_limiter`, каждый HTTP запрос занимает слот квоты; если квоты
+      на все страницы не хватает, загрузка не начинается (QuotaExceededError)
+    - c `cache` (или API_CACHE_ENABLED) ответ за период сохраняется на диск; повторный
+      запрос за тот же период (или за часть периода) читается из кэша без HTTP и без квоты
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        page_size: int | None = None,
+        concurrency: int | None = None,
+        timeout: float | None = None,
+        max_retries: int | None = None,
+        rate_limiter: RateLimiter | None = None,
+        pool: ConnectionPool | None = None,
+        cache: ResponseCache | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.page_size = max(page_size or api_config.API_PAGE_SIZE, 1)
+        self.concurrency = max(concurrency or api_config.API_CONCURRENCY, 1)
+        self.max_retries = api_config.API_MAX_THROTTLE_RETRIES if max_retries is None else max_retries
+        self.rate_limiter = rate_limiter
+        self.pool = pool or ConnectionPool(
+            base_url or api_config.API_BASE_URL,
+            size=self.concurrency,
+            timeout=timeout or api_config.API_TIMEOUT_SECONDS,
+        )
+        self.cache = cache
+        if self.cache is None and api_config.API_CACHE_ENABLED:
+            self.cache = ResponseCache()
+        self.stats = ExtractStats()
+
+        self._sleep = sleep
+        self._stats_lock = threading.Lock()
+
+    def fetch_spend(self, start_date: date | None = None, end_date: date | None = None) -> list[SpendRecord]:
+        return self.fetch(SPEND_ENDPOINT, SpendRecord, start_date, end_date)
+
+    def fetch_conversions(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[ConversionRecord]:
+        return self.fetch(CONVERSION_ENDPOINT, ConversionRecord, start_date, end_date)
+
+    def fetch(
+        self,
+        endpoint: str,
+        model: type[ModelT],
+        start_date: date | None = None,
+        end_date: date | None = None,
+        stats: ExtractStats | None = None,
+    ) -> list[ModelT]:
+        """
+        Записи `endpoint` за период: страницы склеиваются по порядку.
+        `stats` дополнительно получает счётчики только этого вызова.
+        """
+
+        if self.cache is not None:
+            payload = self.cache.get(endpoint, start_date, end_date)
+            if payload is not None:
+                return self._from_cache(payload, model, start_date, end_date, stats)
+
+        raw: list[bytes] | None = [] if self.cache is not None else None
+
+        params: dict[str, Any] = {"page_size": self.page_size}
+        if start_date is not None:
+            params["start_date"] = start_date.isoformat()
+        if end_date is not None:
+            params["end_date"] = end_date.isoformat()
+
+        records, total_pages = self._fetch_page(endpoint, model, params, 1, raw, stats)
+        if total_pages <= 1:
+            self._store(endpoint, start_date, end_date, raw)
+            return records
+
+        remaining = range(2, total_pages + 1)
+        if self.rate_limiter is not None and self.rate_limiter.get_available_requests() < len(remaining):
+            raise QuotaExceededError(
+                f"{endpoint}: нужно ещё {len(remaining)} запросов, "
+                f"в квоте доступно {self.rate_limiter.get_available_requests()}"
+            )
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(remaining)), thread_name_prefix="http") as pool:
+            page_raws: list[list[bytes] | None] = [[] if raw is not None else None for _ in remaining]
+            pages = list(
+                pool.map(
+                    lambda page, page_raw: self._fetch_page(endpoint, model, params, page, page_raw, stats)[0],
+                    remaining,
+                    page_raws,
+                )
+            )
+
+        for page_records in pages:
+            records.extend(page_records)
+        if raw is not None:
+            for page_raw in page_raws:
+                raw.extend(page_raw or [])
+
+        self._store(endpoint, start_date, end_date, raw)
+
+        logger.debug(f"🌐 {endpoint}: страниц {total_pages}, записей {len(records)}")
+        return records
+
+    def is_cached(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        endpoints: tuple[str, ...] = (SPEND_ENDPOINT, CONVERSION_ENDPOINT),
+    ) -> bool:
+        """Ответы `endpoints` за период есть в кэше: загрузка не потратит запросов API"""
+
+        if self.cache is None:
+            return False
+        return all(self.cache.contains(e, start_date, end_date) for e in endpoints)
+
+    def close(self) -> None:
+        self.pool.close()
+        if self.cache is not None:
+            self.cache.flush()
+
+    def _from_cache(
+        self,
+        payload: bytes,
+        model: type[ModelT],
+        start_date: date | None,
+        end_date: date | None,
+        stats: ExtractStats | None,
+    ) -> list[ModelT]:
+        # Запись кэша может быть шире запрошенного периода
+        records, _ = self._decode_ndjson(payload.splitlines(keepends=True), model)
+        records = [
+            r
+            for r in records
+            if (start_date is None or start_date <= r.date) and (end_date is None or r.date <= end_date)
+        ]
+        self._count(stats, cache_hits=1, rows=len(records))
+        return records
+
+    def _store(self, endpoint: str, start_date: date | None, end_date: date | None, raw: list[bytes] | None) -> None:
+        if self.cache is not None and raw is not None:
+            self.cache.put(endpoint, start_date, end_date, b"".join(raw))
+
+    def _fetch_page(
+        self,
+        endpoint: str,
+        model: type[ModelT],
+        params: dict[str, Any],
+        page: int,
+        raw: list[bytes] | None = None,
+        stats: ExtractStats | None = None,
+    ) -> tuple[list[ModelT], int]:
+        path = f"{self.pool.base_path}/{endpoint}?{urlencode({**params, 'page': page})}"
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire_quota(endpoint)
+
+            with self.pool.connection() as (conn, reused):
+                response = self._send(conn, path, reused, stats)
+
+                if response.status == 429:
+                    response.read()
+                    delay = self._retry_after(response, attempt)
+                    self._count(stats, throttled=1)
+                    if attempt == self.max_retries:
+                        break
+                    logger.debug(f"⏳ {endpoint} стр. {page}: 429, повтор через {delay:.2f} c")
+                    self._sleep(delay)
+                    continue
+
+                if response.status != 200:
+                    body = response.read(500).decode("utf-8", errors="replace")
+                    raise APIError(f"{endpoint} стр. {page}: HTTP {response.status}: {body}")
+
+                total_pages = int(response.getheader(TOTAL_PAGES_HEADER) or 1)
+                records, bytes_read = self._decode_ndjson(response, model, raw)
+
+            self._count(stats, pages=1, rows=len(records), bytes_read=bytes_read)
+            return records, total_pages
+
+        raise APIError(f"{endpoint} стр. {page}: HTTP 429 после {self.max_retries} повторов")
+
+    def _send(
+        self,
+        conn: http.client.HTTPConnection,
+        path: str,
+        reused: bool,
+        stats: ExtractStats | None = None,
+    ) -> http.client.HTTPResponse:
+        headers = {"Accept": NDJSON_CONTENT_TYPE, "Connection": "keep-alive"}
+
+        try:
+            conn.request("GET", path, headers=headers)
+            return conn.getresponse()
+        except _STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+            # Сервер закрыл простаивающее соединение: один повтор на новом
+            conn.close()
+            self.pool.count_opened()
+            conn.request("GET", path, headers=headers)
+            return conn.getresponse()
+        finally:
+            self._count(stats, requests=1)
+
+    @staticmethod
+    def _decode_ndjson(
+        lines: Iterable[bytes],
+        model: type[ModelT],
+        raw: list[bytes] | None = None,
+    ) -> tuple[list[ModelT], int]:
+        """Разбор NDJSON по строкам; при `raw` строки ещё и копятся для кэша"""
+
+        records: list[ModelT] = []
+        bytes_read = 0
+
+        for line in lines:
+            bytes_read += len(line)
+            if raw is not None:
+                raw.append(line)
+            line = line.strip()
+            if line:
+                records.append(model.model_validate(json.loads(line)))
+
+        return records, bytes_read
+
+    @staticmethod
+    def _retry_after(response: http.client.HTTPResponse, attempt: int) -> float:
+        header = response.getheader("Retry-After")
+        try:
+            return max(float(header), 0.0) if header is not None else float(2**attempt)
+        except ValueError:
+            return float(2**attempt)
+
+    def _acquire_quota(self, endpoint: str) -> None:
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            raise QuotaExceededError(f"{endpoint}: квота API исчерпана")
+
+    def _count(self, call_stats: ExtractStats | None, **increments: int) -> None:
+        with self._stats_lock:
+            for stats in (self.stats, call_stats):
+                if stats is None:
+                    continue
+                for key, value in increments.items():
+                    setattr(stats, key, getattr(stats, key) + value)
+            self.stats.connections_opened = self.pool.opened
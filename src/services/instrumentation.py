@@ -0,0 +1,139 @@
+import json
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+from src.schemas import MergedRecord
+
+if sys.platform != "win32":
+    import resource
+
+
+def peak_rss_mb() -> float | None:
+    """Пиковый RSS процесса в МБ (None, если платформа не поддерживает)"""
+
+    if sys.platform == "win32":
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divider = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max_rss / divider, 1)
+
+
+@dataclass
+class StageMetrics:
+    """
+    Метрики одной стадии ETL.
+
+    `cpu_seconds` — CPU потока, выполняющего стадию; `process_cpu_seconds` — CPU
+    процесса за время стадии, включая потоки extract-* и соседние запуски ETL.
+    """
+
+    stage: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    process_cpu_seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_read: int = 0
+    requests: int = 0
+    duplicates: int = 0
+    peak_rss_mb: float | None = None
+
+
+@dataclass
+class RunReport:
+    """Отчёт o запуске ETL: метрики по стадиям и итог"""
+
+    started_at: datetime = field(default_factory=datetime.now)
+    start_date: str | None = None
+    end_date: str | None = None
+    stages: list[StageMetrics] = field(default_factory=list)
+    stage_hook: Callable[[str], AbstractContextManager[Any]] | None = field(default=None, repr=False)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = 0, bytes_read: int = 0) -> Iterator[StageMetrics]:
+        """
+        Замерить стадию: wall время, CPU потока и процесса, пиковый RSS после завершения.
+        Стадии load_* ждут источники в потоках extract-*: их работа видна только
+        в process_cpu_seconds, CPU их собственного потока близок к нулю.
+        rows_out (и при необходимости rows_in) заполняет вызывающий код.
+        `stage_hook` (например, профайлер) оборачивает тело стадии.
+        """
+
+        metrics = StageMetrics(stage=name, rows_in=rows_in, bytes_read=bytes_read)
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        process_cpu_started = time.process_time()
+
+        try:
+            with ExitStack() as stack:
+                if self.stage_hook is not None:
+                    stack.enter_context(self.stage_hook(name))
+                yield metrics
+        finally:
+            metrics.wall_seconds = round(time.perf_counter() - wall_started, 6)
+            metrics.cpu_seconds = round(time.thread_time() - cpu_started, 6)
+            metrics.process_cpu_seconds = round(time.process_time() - process_cpu_started, 6)
+            metrics.peak_rss_mb = peak_rss_mb()
+            self.stages.append(metrics)
+
+    @property
+    def wall_seconds(self) -> float:
+        return round(sum(s.wall_seconds for s in self.stages), 6)
+
+    @property
+    def cpu_seconds(self) -> float:
+        """
+        CPU потоков стадий. process_cpu_seconds не суммируется: интервалы стадий
+        одного процесса пересекаются c чужими потоками и запусками.
+        """
+
+        return round(sum(s.cpu_seconds for s in self.stages), 6)
+
+    @property
+    def requests(self) -> int:
+        """Запросы к источникам (слоты квоты) за запуск"""
+
+        return sum(s.requests for s in self.stages)
+
+    def slowest_stage(self) -> str | None:
+        """Стадия c наибольшим wall временем"""
+
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda s: s.wall_seconds).stage
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "requests": self.requests,
+            "slowest_stage": self.slowest_stage(),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+    def to_json(self) -> str:
+        """Отчёт одной строкой JSON для логов"""
+
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+class ETLResult(list[MergedRecord]):
+    """
+    Результат ETLService.run: список записей (как и раньше) c отчётом в `report`
+    и числом строк, реально отправленных в daily_stats, в `rows_written`.
+    """
+
+    def __init__(self, records: list[MergedRecord], report: RunReport, rows_written: int | None = None) -> None:
+        super().__init__(records)
+        self.report = report
+        self.rows_written = len(records) if rows_written is None else rows_written
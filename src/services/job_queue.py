@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, update
+
+from src.database.db import Database
+from src.database.models import EtlJob
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+
+class JobQueue:
+    """
+    Очередь ETL задач в таблице etl_jobs.
+
+    Любое число воркеров забирает задачи через SELECT ... FOR UPDATE SKIP LOCKED:
+    одна задача достаётся ровно одному воркеру, остальные не ждут блокировок.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+    def enqueue(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        sources: str = "all",
+        dedupe: bool = True,
+    ) -> int | None:
+        """
+        Поставить задачу в очередь. При dedupe не создаёт дубликат
+        ожидающей или выполняющейся задачи c тем же диапазоном.
+        """
+
+        with self.database.get_session() as session:
+            if dedupe:
+                duplicate = session.execute(
+                    select(EtlJob.id)
+                    .where(EtlJob.status.in_(("queued", "running")))
+                    .where(EtlJob.start_date.is_not_distinct_from(start_date))
+                    .where(EtlJob.end_date.is_not_distinct_from(end_date))
+                    .where(EtlJob.sources == sources)
+                    .limit(1)
+                ).scalar_one_or_none()
+                if duplicate is not None:
+                    return None
+
+            job = EtlJob(
+                start_date=start_date,
+                end_date=end_date,
+                sources=sources,
+                status="queued",
+                attempts=0,
+                enqueued_at=func.clock_timestamp(),
+            )
+            session.add(job)
+            session.flush()
+            return job.id
+
+    def claim(self, worker_id: str) -> EtlJob | None:
+        """
+        Забрать следующую задачу из очереди.
+        """
+
+        with self.database.get_session() as session:
+            next_job = (
+                select(EtlJob.id)
+                .where(EtlJob.status == "queued")
+                .order_by(EtlJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            job = session.execute(
+                update(EtlJob)
+                .where(EtlJob.id == next_job)
+                .values(
+                    status="running",
+                    worker_id=worker_id,
+                    started_at=func.clock_timestamp(),
+                    attempts=EtlJob.attempts + 1,
+                )
+                .returning(EtlJob)
+            ).scalar_one_or_none()
+
+            session.expunge_all()
+            return job
+
+    def complete(self, job_id: int, rows: int, duration_seconds: float) -> None:
+        """Отметить задачу выполненной"""
+
+        self._finish(job_id, status="done", rows=rows, duration_seconds=duration_seconds, error=None)
+
+    def fail(self, job_id: int, error: str, duration_seconds: float) -> None:
+        """Отметить задачу упавшей"""
+
+        self._finish(job_id, status="failed", rows=None, duration_seconds=duration_seconds, error=error[:2000])
+
+    def release(self, job_id: int) -> None:
+        """Вернуть забранную задачу в очередь без учёта попытки (например, нет квоты API)"""
+
+        with self.database.get_session() as session:
+            session.execute(
+                update(EtlJob)
+                .where(EtlJob.id == job_id)
+                .values(status="queued", worker_id=None, started_at=None, attempts=EtlJob.attempts - 1)
+            )
+
+    def requeue_stale(self, timeout_seconds: int) -> int:
+        """
+        Вернуть в очередь задачи, зависшие в running дольше timeout (упавший воркер).
+        """
+
+        with self.database.get_session() as session:
+            result = session.execute(
+                update(EtlJob)
+                .where(EtlJob.status == "running")
+                .where(EtlJob.started_at < func.clock_timestamp() - timedelta(seconds=timeout_seconds))
+                .values(status="queued", worker_id=None)
+            )
+            return int(result.rowcount)  # type: ignore[attr-defined]
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Количество задач по статусам.
+        """
+
+        with self.database.get_session() as session:
+            rows = session.execute(select(EtlJob.status, func.count()).group_by(EtlJob.status)).all()
+
+        stats = dict.fromkeys(JOB_STATUSES, 0)
+        stats.update({status: int(count) for status, count in rows})
+        return stats
+
+    def _finish(
+        self,
+        job_id: int,
+        status: str,
+        rows: int | None,
+        duration_seconds: float,
+        error: str | None,
+    ) -> None:
+        with self.database.get_session() as session:
+            session.execute(
+                update(EtlJob)
+                .where(EtlJob.id == job_id)
+                .values(
+                    status=status,
+                    finished_at=func.clock_timestamp(),
+                    duration_seconds=round(duration_seconds, 3),
+                    rows=rows,
+                    error=error,
+                )
+            )
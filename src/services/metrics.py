@@ -0,0 +1,194 @@
+import bisect
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from loguru import logger
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+Collector = Callable[["MetricsRegistry"], None]
+
+
+def _labels_key(labels: dict[str, Any] | None) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra else list(labels)
+    if not pairs:
+        return ""
+    escaped = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + escaped + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Минимальный реестр метрик в текстовом формате Prometheus (без prometheus_client).
+
+    Счётчики и гистограммы обновляются из кода ETL; gauge-значения c внешних
+    объектов (RateLimiter, пул БД) снимают коллекторы в момент запроса /metrics.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._values: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, _Histogram]] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._collectors: list[Collector] = []
+
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: tuple[float, ...] | None = None) -> None:
+        """Зарегистрировать метрику: тип (counter, gauge, histogram) и описание"""
+
+        with self._lock:
+            self._meta[name] = (metric_type, help_text)
+            if metric_type == "histogram":
+                self._histograms.setdefault(name, {})
+                self._buckets[name] = buckets or DEFAULT_BUCKETS
+            else:
+                self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, labels: dict[str, Any] | None = None) -> None:
+        with self._lock:
+            series = self._values[name]
+            key = _labels_key(labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, labels: dict[str, Any] | None = None) -> None:
+        with self._lock:
+            self._values[name][_labels_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, labels: dict[str, Any] | None = None) -> None:
+        with self._lock:
+            series = self._histograms[name]
+            key = _labels_key(labels)
+            if key not in series:
+                series[key] = _Histogram(self._buckets[name])
+            series[key].observe(value)
+
+    def get(self, name: str, labels: dict[str, Any] | None = None) -> float | None:
+        """Текущее значение counter/gauge (для тестов и отладки)"""
+
+        with self._lock:
+            return self._values.get(name, {}).get(_labels_key(labels))
+
+    def add_collector(self, collector: Collector) -> None:
+        """Коллектор вызывается перед каждым render() и обновляет gauge-значения"""
+
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Отрисовать метрики в текстовом формате экспозиции Prometheus.
+        """
+
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                logger.warning(f"⚠️ Коллектор метрик упал: {e}")
+
+        lines: list[str] = []
+        with self._lock:
+            for name, (metric_type, help_text) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+
+                if metric_type == "histogram":
+                    for labels, histogram in self._histograms[name].items():
+                        cumulative = 0
+                        for bound, count in zip(histogram.buckets, histogram.counts, strict=True):
+                            cumulative += count
+                            lines.append(
+                                f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}"
+                            )
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.total}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {histogram.total}")
+                    continue
+
+                for labels, value in self._values[name].items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    HTTP эндпоинт /metrics на stdlib http.server в фоновом потоке.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Запуск сервера (port=0 — свободный порт, см. self.port после старта)"""
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        logger.info(f"📈 Метрики доступны на http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        """Остановка сервера"""
+
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,166 @@
+import math
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from src.services.rate_limiter import RateLimiter
+from src.settings.scheduler import scheduler_config
+
+
+@dataclass
+class PacingDecision:
+    """Решение планировщика на один запуск"""
+
+    ranges: list[tuple[date, date]] = field(default_factory=list)
+    budget: int = 0
+    available: int = 0
+    backlog_ranges: int = 0
+    seconds_left: float = 0.0
+    next_interval_seconds: float = 0.0
+    backoff: bool = False
+    requests_per_range: float = 1.0
+
+
+class QuotaPacer:
+    """
+    Адаптивное расписание: равномерно распределяет оставшуюся квоту API
+    по оставшимся часам суток и ранжирует даты по важности.
+
+    Квота списывается за каждый запрос к источнику (чтение файла, страница HTTP),
+    поэтому диапазон стоит `requests_per_range` слотов: начальная оценка —
+    число источников на общей квоте, дальше — скользящее среднее по record_cost().
+
+    - бюджет запуска = диапазонов на остаток квоты / число оставшихся штатных запусков,
+      но не меньше числа диапазонов c сегодняшними и вчерашними данными
+    - интервал до следующего запуска = время до конца суток / диапазонов на остаток квоты,
+      в пределах [MIN_INTERVAL_MINUTES, MAX_INTERVAL_MINUTES]; без бэклога
+      не чаще штатного UPDATE_INTERVAL_MINUTES
+    - квота исчерпана (backoff): следующий запуск через MAX_INTERVAL_MINUTES,
+      такие решения считаются в `throttled_total`
+    """
+
+    # Доля нового замера в скользящей оценке стоимости диапазона
+    COST_SMOOTHING = 0.3
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        base_interval_minutes: int = scheduler_config.UPDATE_INTERVAL_MINUTES,
+        min_interval_minutes: int = scheduler_config.MIN_INTERVAL_MINUTES,
+        max_interval_minutes: int = scheduler_config.MAX_INTERVAL_MINUTES,
+        now: Callable[[], datetime] = datetime.now,
+        requests_per_range: float = 1.0,
+    ) -> None:
+        self.rate_limiter = rate_limiter
+        self.requests_per_range = max(requests_per_range, 1.0)
+        self.base_interval = base_interval_minutes * 60
+        self.min_interval = min_interval_minutes * 60
+        self.max_interval = max(max_interval_minutes * 60, self.min_interval)
+        self._now = now
+
+        self.last_decision: PacingDecision | None = None
+        self.decisions_total = 0
+        self.ranges_deferred_total = 0
+        self.throttled_total = 0
+        self._cost_lock = threading.Lock()
+
+    @staticmethod
+    def date_weight(check_date: date, today: date) -> float:
+        """
+        Приоритет даты: сегодня и вчера важнее всего, дальше — убывает c возрастом.
+        """
+
+        age_days = (today - check_date).days
+        if age_days <= 0:
+            return 1.0
+        if age_days == 1:
+            return 0.9
+        return 0.5 / age_days
+
+    def rank_ranges(self, ranges: list[tuple[date, date]], today: date) -> list[tuple[date, date]]:
+        """
+        Отсортировать диапазоны по весу самой важной даты внутри.
+        """
+
+        return sorted(ranges, key=lambda r: self.date_weight(r[1], today), reverse=True)
+
+    def record_cost(self, requests: int) -> None:
+        """
+        Учесть фактическую стоимость загруженного диапазона в запросах.
+        Запуск из кэша (0 запросов) квоту не тратит и оценку не меняет.
+        """
+
+        if requests <= 0:
+            return
+        with self._cost_lock:
+            cost = self.COST_SMOOTHING * requests + (1 - self.COST_SMOOTHING) * self.requests_per_range
+            self.requests_per_range = max(cost, 1.0)
+
+    def plan(self, ranges: list[tuple[date, date]]) -> PacingDecision:
+        """
+        Выбрать диапазоны на текущий запуск и интервал до следующего.
+        """
+
+        now = self._now()
+        today = now.date()
+        end_of_day = datetime.combine(today + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+        seconds_left = max((end_of_day - now).total_seconds(), 60.0)
+
+        available = self.rate_limiter.get_available_requests()
+        ranked = self.rank_ranges(ranges, today)
+        cost = self.requests_per_range
+        affordable = math.floor(available / cost) if available > 0 else 0
+
+        runs_left = max(1, math.floor(seconds_left / self.base_interval))
+        budget = math.ceil(affordable / runs_left) if affordable > 0 else 0
+        priority = sum(1 for _, range_end in ranked if self.date_weight(range_end, today) >= 0.9)
+        budget = min(max(budget, priority), affordable, len(ranked))
+
+        selected = ranked[:budget]
+        backlog = len(ranked) - len(selected)
+        ranges_after = math.floor((available - len(selected) * cost) / cost)
+
+        backoff = ranges_after <= 0
+        if backoff:
+            interval = float(self.max_interval)
+        else:
+            interval = min(max(seconds_left / ranges_after, self.min_interval), self.max_interval)
+            if backlog == 0:
+                interval = max(interval, float(self.base_interval))
+
+        decision = PacingDecision(
+            ranges=selected,
+            budget=budget,
+            available=available,
+            backlog_ranges=backlog,
+            seconds_left=round(seconds_left, 1),
+            next_interval_seconds=round(interval, 1),
+            backoff=backoff,
+            requests_per_range=round(cost, 2),
+        )
+
+        self.last_decision = decision
+        self.decisions_total += 1
+        self.ranges_deferred_total += backlog
+        self.throttled_total += int(backoff)
+        return decision
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Метрики последнего решения и счётчики.
+        """
+
+        metrics: dict[str, Any] = {
+            "decisions_total": self.decisions_total,
+            "ranges_deferred_total": self.ranges_deferred_total,
+            "throttled_total": self.throttled_total,
+        }
+
+        if self.last_decision is not None:
+            decision = asdict(self.last_decision)
+            decision["ranges"] = len(self.last_decision.ranges)
+            metrics.update(decision)
+
+        return metrics
@@ -0,0 +1,378 @@
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, ParamSpec, TypeVar, cast
+
+from loguru import logger
+
+from src.database.db import Database
+from src.schemas import ConversionRecord, MergedRecord, SpendRecord
+from src.services.calculator import CPACalculator
+from src.services.sources import CONVERSION_KIND, SPEND_KIND, DataSource, SourceRegistry
+from src.services.watermarks import WatermarkTracker
+from src.settings.etl import etl_config
+
+
+@dataclass
+class StageStats:
+    """Статистика одной стадии конвейера (глубина считается по выходной очереди)"""
+
+    name: str
+    chunks: int = 0
+    rows_in: int = 0
+    rows_out: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    queue_depth_sum: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_in / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+    @property
+    def avg_queue_depth(self) -> float:
+        return self.queue_depth_sum / self.chunks if self.chunks else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stage": self.name,
+            "chunks": self.chunks,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": round(self.avg_queue_depth, 2),
+        }
+
+
+@dataclass
+class _Batch:
+    source: DataSource
+    rows: list[Any]
+    done: bool = False
+
+
+@dataclass
+class _Chunk:
+    dates: list[date]
+    records: dict[str, list[Any]] = field(default_factory=lambda: defaultdict(list))
+    rows: int = 0
+    merged: list[MergedRecord] = field(default_factory=list)
+    changed_dates: set[date] = field(default_factory=set)
+    watermarks: list[dict[str, Any]] = field(default_factory=list)
+
+
+ItemT = TypeVar("ItemT", _Batch, _Chunk)
+P = ParamSpec("P")
+R = TypeVar("R")
+
+SourceRows = dict[str, list[Any]]
+
+
+class _DateBuffer:
+    """
+    Строки по датам до выдачи в чанк.
+
+    Дата полная, когда каждый ещё читаемый источник прислал строку c более поздней
+    датой (источники отдают даты по возрастанию: файлы и API сортированы по дате).
+    Строка источника, вернувшегося к уже выданной дате, откладывается: после чтения
+    такие даты собираются заново из всех своих строк и записываются повторно,
+    поэтому строки выданных дат хранятся до конца запуска.
+    """
+
+    def __init__(self, sources: Iterable[str], start_date: date | None, end_date: date | None) -> None:
+        self.reading = set(sources)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.frontier: dict[str, date] = {}
+        self.pending: dict[date, SourceRows] = defaultdict(lambda: defaultdict(list))
+        self.emitted: dict[date, SourceRows] = {}
+        self.late: set[date] = set()
+        self.cursor = start_date
+
+    def add(self, source: str, records: Iterable[SpendRecord | ConversionRecord]) -> None:
+        for record in records:
+            if source not in self.frontier or record.date > self.frontier[source]:
+                self.frontier[source] = record.date
+            if (self.start_date and record.date < self.start_date) or (self.end_date and record.date > self.end_date):
+                continue
+            if self.cursor is not None and record.date < self.cursor:
+                self.emitted.setdefault(record.date, defaultdict(list))[source].append(record)
+                self.late.add(record.date)
+            else:
+                self.pending[record.date][source].append(record)
+
+    def finish(self, source: str) -> None:
+        self.reading.discard(source)
+
+    def take_complete(self) -> Iterator[tuple[date, SourceRows]]:
+        """Полные даты по порядку, включая даты без строк"""
+
+        if any(source not in self.frontier for source in self.reading):
+            return
+        last: date | None
+        if self.reading:
+            last = min(self.frontier[source] for source in self.reading) - timedelta(days=1)
+            if self.end_date is not None:
+                last = min(last, self.end_date)
+        else:
+            last = self.end_date or max(self.pending, default=None) or self._before_cursor()
+        yield from self._take_until(last)
+
+    def take_late(self) -> Iterator[list[tuple[date, SourceRows]]]:
+        """
+        Даты c отложенными строками, сгруппированные в непрерывные отрезки: к ним
+        добавляются ещё не выданные даты без строк (до первой выданной даты).
+        """
+
+        if not self.late:
+            return
+        run: list[tuple[date, SourceRows]] = []
+        current, last = min(self.late), max(self.late)
+        while current <= last:
+            if current in self.late or current not in self.emitted:
+                run.append((current, self.emitted.get(current) or defaultdict(list)))
+            elif run:
+                yield run
+                run = []
+            current += timedelta(days=1)
+        if run:
+            yield run
+
+    def _take_until(self, last: date | None) -> Iterator[tuple[date, SourceRows]]:
+        if last is None:
+            return
+        if self.cursor is None:
+            if not self.pending:
+                return
+            self.cursor = min(self.pending)
+        while self.cursor <= last:
+            records = self.pending.pop(self.cursor, None) or defaultdict(list)
+            self.emitted[self.cursor] = records
+            yield self.cursor, records
+            self.cursor += timedelta(days=1)
+
+    def _before_cursor(self) -> date | None:
+        return self.cursor - timedelta(days=1) if self.cursor is not None else None
+
+
+class PipelinedETL:
+    """
+    Конвейерный ETL: extract → parse → merge → load через ограниченные asyncio очереди.
+
+    extract читает все источники SourceRegistry одновременно порциями по `chunk_rows`
+    (файл — блоками, HTTP — через HTTPExtractor c кэшем ответов), parse проверяет
+    порции по мере поступления. Ключ слияния включает дату, поэтому parse выдаёт чанк
+    из дат, которые уже прошли все источники (см. _DateBuffer): пока читаются
+    следующие даты, чанк N сливается, a чанк N-1 записывается в БД.
+    Заполненная очередь приостанавливает предыдущую стадию.
+
+    `stage_hook` (профайлер, см. RunReport.stage) оборачивает весь запуск одной стадией
+    `pipeline`: стадии конвейера идут одновременно, поэтому их работа выполняется
+    в потоке event loop, где её видит профайлер.
+    """
+
+    STAGES = ("extract", "parse", "merge", "load")
+
+    def __init__(
+        self,
+        database: Database,
+        chunk_rows: int = etl_config.PIPELINE_CHUNK_ROWS,
+        queue_size: int = etl_config.PIPELINE_QUEUE_SIZE,
+        registry: SourceRegistry | None = None,
+        stage_hook: Callable[[str], AbstractContextManager[Any]] | None = None,
+    ) -> None:
+        self.database = database
+        self.stage_hook = stage_hook
+        self.registry = registry or SourceRegistry.from_config(database=database)
+        self.chunk_rows = max(chunk_rows, 1)
+        self.queue_size = max(queue_size, 1)
+        self.calculator = CPACalculator()
+        self.stats: dict[str, StageStats] = {}
+        self.skip_unchanged = False
+
+    def run(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        skip_unchanged: bool = False,
+    ) -> list[MergedRecord]:
+        """
+        Синхронный запуск конвейера.
+        """
+
+        return asyncio.run(self.run_async(start_date, end_date, skip_unchanged))
+
+    async def run_async(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        skip_unchanged: bool = False,
+    ) -> list[MergedRecord]:
+        """
+        Запуск конвейера. Возвращает все объединённые записи, отсортированные по (date, campaign_id).
+
+        Как и ETLService.run, по умолчанию пишет все записи; `skip_unchanged` пропускает
+        даты c прежним отпечатком источников. Записанные строки — rows_out стадии load.
+        """
+
+        self.skip_unchanged = skip_unchanged
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        parse_q: asyncio.Queue[_Batch | None] = asyncio.Queue(self.queue_size)
+        merge_q: asyncio.Queue[_Chunk | None] = asyncio.Queue(self.queue_size)
+        load_q: asyncio.Queue[_Chunk | None] = asyncio.Queue(self.queue_size)
+        results: list[MergedRecord] = []
+
+        with self.stage_hook("pipeline") if self.stage_hook is not None else nullcontext():
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._extract(start_date, end_date, parse_q))
+                group.create_task(self._parse(start_date, end_date, parse_q, merge_q))
+                group.create_task(self._merge(merge_q, load_q))
+                group.create_task(self._load(load_q, results))
+
+        for stage in self.stats.values():
+            logger.debug(f"🔧 Стадия {stage.name}: {stage.to_dict()}")
+
+        # Повторно записанная дата заменяет свои прежние записи
+        latest = {(record.date, record.campaign_id): record for record in results}
+        return sorted(latest.values(), key=lambda r: (r.date, r.campaign_id))
+
+    def get_stats(self) -> list[dict[str, Any]]:
+        """
+        Статистика стадий последнего запуска: пропускная способность и глубина очередей.
+        """
+
+        return [stage.to_dict() for stage in self.stats.values()]
+
+    async def _extract(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        out_q: "asyncio.Queue[_Batch | None]",
+    ) -> None:
+        stats = self.stats["extract"]
+
+        async def read(source: DataSource) -> None:
+            batches = source.stream(start_date, end_date, self.chunk_rows)
+            while True:
+                started = time.perf_counter()
+                rows = await self._call(next, batches, None)
+                stats.busy_seconds += time.perf_counter() - started
+                if rows is None:
+                    await out_q.put(_Batch(source, [], done=True))
+                    return
+                stats.rows_in += len(rows)
+                await self._put(stats, out_q, _Batch(source, rows), len(rows))
+
+        await asyncio.gather(*(read(source) for source in self.registry.sources))
+        await out_q.put(None)
+
+    async def _parse(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        in_q: "asyncio.Queue[_Batch | None]",
+        out_q: "asyncio.Queue[_Chunk | None]",
+    ) -> None:
+        stats = self.stats["parse"]
+        buffer = _DateBuffer(self.registry.names, start_date, end_date)
+        chunk = _Chunk(dates=[])
+
+        async def emit(dates: Iterable[tuple[date, SourceRows]], flush: bool) -> _Chunk:
+            current = chunk
+            for record_date, by_source in dates:
+                current.dates.append(record_date)
+                for source, records in by_source.items():
+                    current.records[source].extend(records)
+                    current.rows += len(records)
+                if current.rows >= self.chunk_rows:
+                    await self._put(stats, out_q, current, current.rows)
+                    current = _Chunk(dates=[])
+            if flush and current.dates:
+                await self._put(stats, out_q, current, current.rows)
+                current = _Chunk(dates=[])
+            return current
+
+        while (batch := await in_q.get()) is not None:
+            if batch.done:
+                buffer.finish(batch.source.name)
+            else:
+                started = time.perf_counter()
+                records = await self._call(batch.source.parse, batch.rows)
+                buffer.add(batch.source.name, records)
+                stats.busy_seconds += time.perf_counter() - started
+                stats.rows_in += len(batch.rows)
+            chunk = await emit(buffer.take_complete(), flush=False)
+
+        chunk = await emit(buffer.take_complete(), flush=True)
+        for dates in buffer.take_late():
+            logger.warning(f"⚠️ Источник вернулся к выданным датам, повторная запись: {dates[0][0]} — {dates[-1][0]}")
+            await emit(dates, flush=True)
+
+        await out_q.put(None)
+
+    async def _merge(self, in_q: "asyncio.Queue[_Chunk | None]", out_q: "asyncio.Queue[_Chunk | None]") -> None:
+        stats = self.stats["merge"]
+
+        while (chunk := await in_q.get()) is not None:
+            started = time.perf_counter()
+            await self._call(self._merge_chunk, chunk)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.rows_in += chunk.rows
+            await self._put(stats, out_q, chunk, len(chunk.merged))
+
+        await out_q.put(None)
+
+    async def _load(self, in_q: "asyncio.Queue[_Chunk | None]", results: list[MergedRecord]) -> None:
+        stats = self.stats["load"]
+
+        while (chunk := await in_q.get()) is not None:
+            started = time.perf_counter()
+            stats_list = [
+                record.model_dump()
+                for record in chunk.merged
+                if not self.skip_unchanged or record.date in chunk.changed_dates
+            ]
+            if stats_list:
+                await self._call(self.database.bulk_upsert_stats, stats_list)
+            if chunk.watermarks:
+                await self._call(self.database.upsert_watermarks, chunk.watermarks)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.chunks += 1
+            stats.rows_in += len(chunk.merged)
+            stats.rows_out += len(stats_list)
+            results.extend(chunk.merged)
+
+    def _merge_chunk(self, chunk: _Chunk) -> None:
+        records: dict[str, Iterable[SpendRecord | ConversionRecord]] = {
+            source.name: chunk.records.get(source.name, []) for source in self.registry.sources
+        }
+        chunk.merged = self.calculator.merge_sources(
+            (cast(list[SpendRecord], records[s.name]) for s in self.registry.by_kind(SPEND_KIND)),
+            (cast(list[ConversionRecord], records[s.name]) for s in self.registry.by_kind(CONVERSION_KIND)),
+        )
+
+        fingerprints = WatermarkTracker.fingerprint_sources(records, chunk.dates[0], chunk.dates[-1])
+        existing = self.database.get_watermarks(chunk.dates[0], chunk.dates[-1])
+        chunk.changed_dates, chunk.watermarks = WatermarkTracker.build(fingerprints, existing)
+
+    async def _call(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """Блокирующий вызов стадии: в пуле потоков, при профилировании — в потоке event loop"""
+
+        if self.stage_hook is not None:
+            return func(*args, **kwargs)
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    @staticmethod
+    async def _put(stats: StageStats, out_q: "asyncio.Queue[ItemT | None]", item: ItemT, rows_out: int) -> None:
+        stats.chunks += 1
+        stats.rows_out += rows_out
+        depth = out_q.qsize()
+        stats.queue_depth_sum += depth
+        stats.max_queue_depth = max(stats.max_queue_depth, depth)
+        await out_q.put(item)
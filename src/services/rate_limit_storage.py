@@ -0,0 +1,174 @@
+import time
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Protocol
+
+from sqlalchemy import ColumnElement, Delete, Select, delete, func, insert, select
+
+from src.database.db import Database
+from src.database.models import ApiRequestLog
+
+WINDOW_SECONDS = 24 * 60 * 60
+
+
+class RateLimitStorage(Protocol):
+    """Хранилище журнала запросов скользящего окна"""
+
+    def count(self) -> int: ...
+
+    def oldest(self) -> datetime | None: ...
+
+    def append(self) -> None: ...
+
+    def try_append(self, limit: int) -> bool: ...
+
+    def snapshot(self) -> list[datetime]: ...
+
+    def replace(self, requests: list[datetime]) -> None: ...
+
+    def cleanup(self) -> None: ...
+
+
+class MemoryRateLimitStorage:
+    """
+    Журнал запросов в памяти процесса.
+
+    Время хранится в deque по монотонным часам: очистка окна и поиск
+    самого старого запроса — амортизированно O(1).
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self._clock = clock
+        self._now = now
+        self._timestamps: deque[float] = deque()
+
+    def count(self) -> int:
+        self.cleanup()
+        return len(self._timestamps)
+
+    def oldest(self) -> datetime | None:
+        self.cleanup()
+        if not self._timestamps:
+            return None
+        return self._to_wall(self._timestamps[0])
+
+    def append(self) -> None:
+        self._timestamps.append(self._clock())
+
+    def try_append(self, limit: int) -> bool:
+        if self.count() >= limit:
+            return False
+        self.append()
+        return True
+
+    def snapshot(self) -> list[datetime]:
+        return [self._to_wall(ts) for ts in self._timestamps]
+
+    def replace(self, requests: list[datetime]) -> None:
+        now = self._clock()
+        wall_now = self._now()
+        self._timestamps = deque(sorted(now - (wall_now - req).total_seconds() for req in requests))
+
+    def cleanup(self) -> None:
+        """Удалить запросы старше 24 часов"""
+
+        cutoff = self._clock() - WINDOW_SECONDS
+        while self._timestamps and self._timestamps[0] <= cutoff:
+            self._timestamps.popleft()
+
+    def _to_wall(self, ts: float) -> datetime:
+        return self._now() - timedelta(seconds=self._clock() - ts)
+
+
+class PostgresRateLimitStorage:
+    """
+    Журнал запросов в таблице api_request_log.
+
+    Общий для всех процессов и переживает рестарты. Проверка и запись
+    выполняются в одной транзакции под advisory lock на scope, поэтому
+    несколько воркеров не могут вместе превысить квоту.
+    """
+
+    def __init__(self, database: Database, scope: str = "default") -> None:
+        self.database = database
+        self.scope = scope
+
+    def count(self) -> int:
+        with self.database.get_session() as session:
+            return int(session.execute(self._count_query()).scalar_one())
+
+    def oldest(self) -> datetime | None:
+        with self.database.get_session() as session:
+            oldest: datetime | None = session.execute(
+                select(func.min(ApiRequestLog.requested_at)).where(
+                    ApiRequestLog.scope == self.scope,
+                    ApiRequestLog.requested_at > self._cutoff(),
+                )
+            ).scalar_one()
+
+        return self._to_local(oldest) if oldest is not None else None
+
+    def append(self) -> None:
+        with self.database.get_session() as session:
+            session.execute(insert(ApiRequestLog).values(scope=self.scope, requested_at=func.clock_timestamp()))
+
+    def try_append(self, limit: int) -> bool:
+        with self.database.get_session() as session:
+            session.execute(select(func.pg_advisory_xact_lock(func.hashtext(self.scope))))
+            session.execute(self._cleanup_query())
+
+            if int(session.execute(self._count_query()).scalar_one()) >= limit:
+                return False
+
+            session.execute(insert(ApiRequestLog).values(scope=self.scope, requested_at=func.clock_timestamp()))
+            return True
+
+    def snapshot(self) -> list[datetime]:
+        with self.database.get_session() as session:
+            rows = session.execute(
+                select(ApiRequestLog.requested_at)
+                .where(ApiRequestLog.scope == self.scope, ApiRequestLog.requested_at > self._cutoff())
+                .order_by(ApiRequestLog.requested_at)
+            ).scalars()
+            return [self._to_local(row) for row in rows]
+
+    def replace(self, requests: list[datetime]) -> None:
+        with self.database.get_session() as session:
+            session.execute(select(func.pg_advisory_xact_lock(func.hashtext(self.scope))))
+            session.execute(delete(ApiRequestLog).where(ApiRequestLog.scope == self.scope))
+            if requests:
+                session.execute(
+                    insert(ApiRequestLog),
+                    [{"scope": self.scope, "requested_at": req.astimezone()} for req in requests],
+                )
+
+    def cleanup(self) -> None:
+        """Удалить запросы старше 24 часов"""
+
+        with self.database.get_session() as session:
+            session.execute(self._cleanup_query())
+
+    def _cleanup_query(self) -> Delete:
+        return delete(ApiRequestLog).where(
+            ApiRequestLog.scope == self.scope,
+            ApiRequestLog.requested_at <= self._cutoff(),
+        )
+
+    def _count_query(self) -> Select[tuple[int]]:
+        return select(func.count()).where(
+            ApiRequestLog.scope == self.scope,
+            ApiRequestLog.requested_at > self._cutoff(),
+        )
+
+    @staticmethod
+    def _cutoff() -> ColumnElement[datetime]:
+        return func.clock_timestamp() - timedelta(seconds=WINDOW_SECONDS)
+
+    @staticmethod
+    def _to_local(value: datetime) -> datetime:
+        return value.astimezone().replace(tzinfo=None)
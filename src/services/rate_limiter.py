@@ -1,71 +1,197 @@
+import threading
+import time
+from collections.abc import Callable
 from datetime import datetime, timedelta
 
+from src.database.db import Database
+from src.services.rate_limit_storage import (
+    WINDOW_SECONDS,
+    MemoryRateLimitStorage,
+    PostgresRateLimitStorage,
+    RateLimitStorage,
+)
 from src.settings.api import api_config
 
+RATE_LIMIT_MODES = ("sliding_window", "token_bucket")
+RATE_LIMIT_BACKENDS = ("memory", "postgres")
+
 
 class RateLimiter:
     """
     Класс для контроля лимитов API запросов.
+
+    Режимы:
+    - sliding_window: не более max_requests запросов за скользящие 24 часа
+    - token_bucket: то же окно + ведро токенов, которое пополняется равномерно
+      (max_requests в сутки) и не даёт потратить квоту одной пачкой
+
+    Бэкенды журнала запросов:
+    - memory: deque в памяти процесса, O(1) операции
+    - postgres: таблица api_request_log, общая для всех процессов и
+      переживающая рестарты (ведро токенов остаётся локальным)
     """
 
-    def __init__(self) -> None:
-        self.requests_log: list[datetime] = []
-        self.max_requests = api_config.API_MAX_REQUESTS_PER_DAY  # 80
+    WINDOW_SECONDS = WINDOW_SECONDS
+
+    def __init__(
+        self,
+        max_requests: int | None = None,
+        mode: str | None = None,
+        burst: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        backend: str | None = None,
+        database: Database | None = None,
+        scope: str | None = None,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.max_requests = max_requests if max_requests is not None else api_config.API_MAX_REQUESTS_PER_DAY  # 80
+        self.mode = mode or api_config.RATE_LIMIT_MODE
+        self.backend = backend or api_config.RATE_LIMIT_BACKEND
+
+        if self.mode not in RATE_LIMIT_MODES:
+            raise ValueError(f"Неизвестный режим RateLimiter: {self.mode}")
+        if self.backend not in RATE_LIMIT_BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд RateLimiter: {self.backend}")
+
+        self._clock = clock
+        self._now = now
+        self._lock = threading.RLock()
+        self.storage: RateLimitStorage
+
+        if self.backend == "postgres":
+            if database is None:
+                raise ValueError("Для бэкенда postgres нужен database")
+            self.storage = PostgresRateLimitStorage(database, scope=scope or api_config.RATE_LIMIT_SCOPE)
+        else:
+            self.storage = MemoryRateLimitStorage(clock=clock, now=now)
+
+        self.burst = max(burst if burst is not None else api_config.RATE_LIMIT_BURST, 1)
+        self._refill_rate = self.max_requests / self.WINDOW_SECONDS
+        self._tokens = float(self.burst)
+        self._last_refill = self._clock()
+
+    @property
+    def requests_log(self) -> list[datetime]:
+        """Запросы в текущем окне (время по настенным часам)"""
+
+        with self._lock:
+            return self.storage.snapshot()
+
+    @requests_log.setter
+    def requests_log(self, value: list[datetime]) -> None:
+        with self._lock:
+            self.storage.replace(value)
 
     def can_make_request(self) -> bool:
         """
         Проверка возможности сделать запрос.
         """
 
-        self._cleanup_old_requests()
-        return len(self.requests_log) < self.max_requests
+        with self._lock:
+            if self.storage.count() >= self.max_requests:
+                return False
+
+            if self.mode == "token_bucket":
+                self._refill()
+                return self._tokens >= 1
+
+            return True
 
     def record_request(self) -> None:
         """Записать новый запрос в лог"""
 
-        self.requests_log.append(datetime.now())
+        with self._lock:
+            self.storage.append()
+            self._take_token()
+
+    def try_acquire(self) -> bool:
+        """
+        Атомарно проверить лимит и записать запрос.
+
+        Безопасно для вызова из нескольких потоков (и процессов при бэкенде
+        postgres): два воркера не могут занять один и тот же последний слот.
+        """
+
+        with self._lock:
+            if self.mode == "token_bucket":
+                self._refill()
+                if self._tokens < 1:
+                    return False
+
+            if not self.storage.try_append(self.max_requests):
+                return False
+
+            self._take_token()
+            return True
 
     def get_available_requests(self) -> int:
         """
         Получить количество доступных запросов.
         """
 
-        self._cleanup_old_requests()
-        return self.max_requests - len(self.requests_log)
+        with self._lock:
+            return self.max_requests - self.storage.count()
 
     def get_next_available_time(self) -> datetime | None:
         """
         Получить время когда будет доступен следующий запрос.
         """
 
-        self._cleanup_old_requests()
+        with self._lock:
+            next_time: datetime | None = None
 
-        if len(self.requests_log) < self.max_requests:
-            return None
+            if self.storage.count() >= self.max_requests:
+                oldest_request = self.storage.oldest()
+                if oldest_request is not None:
+                    next_time = oldest_request + timedelta(seconds=self.WINDOW_SECONDS + 1)
 
-        oldest_request = min(self.requests_log)
-        return oldest_request + timedelta(days=1, seconds=1)
+            if self.mode == "token_bucket":
+                self._refill()
+                if self._tokens < 1 and self._refill_rate > 0:
+                    bucket_time = self._now() + timedelta(seconds=(1 - self._tokens) / self._refill_rate)
+                    next_time = max(next_time, bucket_time) if next_time else bucket_time
+
+            return next_time
 
     def _cleanup_old_requests(self) -> None:
         """Удалить запросы старше 24 часов"""
 
-        now = datetime.now()
-        cutoff_time = now - timedelta(days=1)
-        self.requests_log = [req for req in self.requests_log if req > cutoff_time]
+        with self._lock:
+            self.storage.cleanup()
+
+    def _refill(self) -> None:
+        """Пополнить ведро токенов пропорционально прошедшему времени"""
+
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self._refill_rate)
+
+    def _take_token(self) -> None:
+        if self.mode == "token_bucket":
+            self._refill()
+            self._tokens -= 1
 
     def get_stats(self) -> dict[str, int | float]:
         """
         Получить статистику использования лимитов.
         """
 
-        self._cleanup_old_requests()
-        used = len(self.requests_log)
+        with self._lock:
+            used = self.storage.count()
+            if self.mode == "token_bucket":
+                self._refill()
         available = self.max_requests - used
         usage_percent = (used / self.max_requests * 100) if self.max_requests > 0 else 0
 
-        return {
+        stats: dict[str, int | float] = {
             "used": used,
             "available": available,
             "total": self.max_requests,
             "usage_percent": round(usage_percent, 2),
         }
+
+        if self.mode == "token_bucket":
+            stats["tokens"] = round(self._tokens, 2)
+
+        return stats
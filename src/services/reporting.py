@@ -0,0 +1,390 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from loguru import logger
+
+from src.database.db import Database
+from src.services.calculator import CPACalculator
+from src.services.export import NDJSON_COPY_OPTIONS, StatsExporter
+from src.settings.report import report_config
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+STREAM_CHUNK_BYTES = 64 * 1024
+CPA_ORDERS = ("asc", "desc")
+DEFAULT_TOP = 10
+
+STATS_PATH = "/stats"
+CAMPAIGNS_PATH = "/campaigns"
+TOP_PATH = "/top"
+REPORT_PATHS = (STATS_PATH, CAMPAIGNS_PATH, TOP_PATH)
+
+
+class ReportQueryError(ValueError):
+    """Некорректные параметры запроса отчёта (ответ 400)"""
+
+
+@dataclass
+class ReportQuery:
+    """Разобранные параметры запроса"""
+
+    path: str
+    start_date: date | None = None
+    end_date: date | None = None
+    campaign_id: str | None = None
+    top: int = DEFAULT_TOP
+    order: str = "asc"
+
+    @classmethod
+    def parse(cls, path: str, query_string: str) -> "ReportQuery":
+        params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+        try:
+            start_date = date.fromisoformat(params["start_date"]) if "start_date" in params else None
+            end_date = date.fromisoformat(params["end_date"]) if "end_date" in params else None
+            top = int(params.get("n", DEFAULT_TOP))
+        except ValueError as e:
+            raise ReportQueryError(f"Неверный параметр: {e}") from e
+
+        if start_date and end_date and start_date > end_date:
+            raise ReportQueryError("start_date позже end_date")
+        if not 1 <= top <= report_config.REPORT_TOP_MAX:
+            raise ReportQueryError(f"n должно быть от 1 до {report_config.REPORT_TOP_MAX}")
+
+        order = params.get("order", "asc")
+        if order not in CPA_ORDERS:
+            raise ReportQueryError(f"order должен быть одним из: {', '.join(CPA_ORDERS)}")
+
+        return cls(path, start_date, end_date, params.get("campaign_id"), top, order)
+
+    @property
+    def cache_key(self) -> str:
+        """Нормализованный запрос: одинаковые по смыслу URL дают один ключ кэша и один ETag"""
+
+        params: dict[str, Any] = {
+            "start_date": self.start_date.isoformat() if self.start_date else "",
+            "end_date": self.end_date.isoformat() if self.end_date else "",
+        }
+        if self.path == STATS_PATH:
+            params["campaign_id"] = self.campaign_id or ""
+        if self.path == TOP_PATH:
+            params.update(n=self.top, order=self.order)
+        return f"{self.path}?{urlencode(params)}"
+
+
+@dataclass
+class ReportingStats:
+    """Счётчики сервиса отчётов"""
+
+    requests: int = 0
+    not_modified: int = 0
+    cache_hits: int = 0
+    streamed: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ReportService:
+    """
+    Отчёты по daily_stats поверх Database.
+
+    - ETag — хэш нормализованного запроса и версии watermarks за период (число строк
+      и последний changed_at): меняется только когда ETL записал новые данные
+    - готовые ответы хранятся в LRU (`cache_entries` штук, каждый не больше
+      `cache_max_body_bytes`) и отдаются без запроса к daily_stats, пока ETag тот же
+    - /stats пишется потоком из COPY TO STDOUT: большие периоды не собираются в памяти
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        cache_entries: int | None = None,
+        cache_max_body_bytes: int | None = None,
+    ) -> None:
+        self.database = database
+        self.cache_entries = cache_entries if cache_entries is not None else report_config.REPORT_CACHE_ENTRIES
+        self.cache_max_body_bytes = (
+            cache_max_body_bytes if cache_max_body_bytes is not None else report_config.REPORT_CACHE_MAX_BODY_KB * 1024
+        )
+        self.stats = ReportingStats()
+
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+
+    def etag(self, query: ReportQuery) -> str:
+        count, changed_at = self.database.get_watermark_version(query.start_date, query.end_date)
+        version = f"{query.cache_key}|{count}|{changed_at.isoformat() if changed_at else ''}"
+        return f'"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+
+    def cached(self, query: ReportQuery, etag: str) -> bytes | None:
+        """Готовый ответ, если он построен для того же ETag"""
+
+        with self._lock:
+            entry = self._cache.get(query.cache_key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._cache.move_to_end(query.cache_key)
+            self.stats.cache_hits += 1
+            return entry[1]
+
+    def store(self, query: ReportQuery, etag: str, body: bytes) -> None:
+        if self.cache_entries <= 0 or len(body) > self.cache_max_body_bytes:
+            return
+
+        with self._lock:
+            self._cache[query.cache_key] = (etag, body)
+            self._cache.move_to_end(query.cache_key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def campaigns(self, query: ReportQuery) -> bytes:
+        """Итоги по кампаниям за период"""
+
+        rows = self.database.get_campaign_totals(query.start_date, query.end_date)
+        return self._render(query, {"campaigns": [self._with_cpa(row) for row in rows]})
+
+    def top(self, query: ReportQuery) -> bytes:
+        """Top-N кампаний по CPA (asc — самые дешёвые конверсии); кампании без конверсий не участвуют"""
+
+        rows = self.database.get_campaign_totals(query.start_date, query.end_date, query.order, query.top)
+        return self._render(
+            query,
+            {"order": query.order, "n": query.top, "campaigns": [self._with_cpa(row) for row in rows]},
+        )
+
+    def stream_stats(self, query: ReportQuery, write: Callable[[bytes], None]) -> bytes | None:
+        """
+        JSON массив строк daily_stats за период, частями по STREAM_CHUNK_BYTES через `write`.
+
+        Возвращает тело целиком, если оно поместилось в лимит кэша, иначе None.
+        """
+
+        stream = _JSONArrayStream(write, self.cache_max_body_bytes if self.cache_entries > 0 else 0)
+        rows = StatsExporter.query(query.start_date, query.end_date, query.campaign_id)
+        self.database.copy_to(StatsExporter.ndjson_query(rows), stream, NDJSON_COPY_OPTIONS)
+        return stream.close()
+
+    def count(self, **increments: int) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                setattr(self.stats, key, getattr(self.stats, key) + value)
+
+    @staticmethod
+    def _with_cpa(row: dict[str, Any]) -> dict[str, Any]:
+        return {**row, "cpa": CPACalculator.calculate_cpa(row["spend"], row["conversions"])}
+
+    @staticmethod
+    def _render(query: ReportQuery, payload: dict[str, Any]) -> bytes:
+        payload = {
+            "start_date": query.start_date.isoformat() if query.start_date else None,
+            "end_date": query.end_date.isoformat() if query.end_date else None,
+            **payload,
+        }
+        return json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ReportingServer:
+    """
+    Read-only HTTP API отчётов на stdlib http.server в фоновом потоке.
+
+    GET /stats?start_date&end_date[&campaign_id] — строки daily_stats (JSON массив, chunked)
+    GET /campaigns?start_date&end_date — итоги по кампаниям
+    GET /top?start_date&end_date[&n=10][&order=asc] — top-N кампаний по CPA
+
+    Ответы c ETag и Cache-Control: no-cache; If-None-Match c тем же ETag — 304 без тела.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        host: str | None = None,
+        port: int | None = None,
+        service: ReportService | None = None,
+    ) -> None:
+        self.service = service or ReportService(database)
+        self.host = host or report_config.REPORT_HOST
+        self.port = port if port is not None else report_config.REPORT_PORT
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def stats(self) -> ReportingStats:
+        return self.service.stats
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Запуск сервера (port=0 — свободный порт, см. self.port после старта)"""
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                api._handle(self)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="report-api", daemon=True)
+        self._thread.start()
+        logger.info(f"📑 API отчётов доступен на {self.base_url}")
+
+    def stop(self) -> None:
+        """Остановка сервера"""
+
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        service = self.service
+        service.count(requests=1)
+        url = urlsplit(handler.path)
+
+        if url.path not in REPORT_PATHS:
+            self._send_error(handler, 404, f"Неизвестный отчёт: {url.path}")
+            return
+
+        try:
+            query = ReportQuery.parse(url.path, url.query)
+        except ReportQueryError as e:
+            self._send_error(handler, 400, str(e))
+            return
+
+        try:
+            etag = service.etag(query)
+            if _etag_matches(handler.headers.get("If-None-Match"), etag):
+                service.count(not_modified=1)
+                handler.send_response(304)
+                handler.send_header("ETag", etag)
+                handler.send_header("Cache-Control", "no-cache")
+                handler.end_headers()
+                return
+
+            body = service.cached(query, etag)
+            if body is None and query.path != STATS_PATH:
+                body = service.campaigns(query) if query.path == CAMPAIGNS_PATH else service.top(query)
+                service.store(query, etag, body)
+        except Exception as e:
+            logger.error(f"❌ Отчёт {handler.path}: {e}")
+            self._send_error(handler, 500, "Ошибка построения отчёта")
+            return
+
+        if body is not None:
+            self._send_headers(handler, etag, len(body))
+            handler.wfile.write(body)
+            return
+
+        self._send_headers(handler, etag, None)
+        try:
+            body = service.stream_stats(query, lambda chunk: _write_chunk(handler, chunk))
+        except Exception as e:
+            # Заголовок 200 уже отправлен: обрываем соединение, клиент увидит незавершённый ответ
+            logger.error(f"❌ Отчёт {handler.path}: {e}")
+            service.count(errors=1)
+            handler.close_connection = True
+            return
+
+        service.count(streamed=1)
+        if body is not None:
+            service.store(query, etag, body)
+        handler.wfile.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _send_headers(handler: BaseHTTPRequestHandler, etag: str, length: int | None) -> None:
+        handler.send_response(200)
+        handler.send_header("Content-Type", JSON_CONTENT_TYPE)
+        handler.send_header("ETag", etag)
+        handler.send_header("Cache-Control", "no-cache")
+        if length is None:
+            handler.send_header("Transfer-Encoding", "chunked")
+        else:
+            handler.send_header("Content-Length", str(length))
+        handler.end_headers()
+
+    def _send_error(self, handler: BaseHTTPRequestHandler, status: int, message: str) -> None:
+        self.service.count(errors=1)
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", JSON_CONTENT_TYPE)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+class _JSONArrayStream:
+    """
+    Приёмник строк NDJSON из COPY: склеивает их в JSON массив и отдаёт частями.
+    Пока тело не превысило `keep_limit`, хранит копию для кэша.
+    """
+
+    def __init__(self, send: Callable[[bytes], None], keep_limit: int) -> None:
+        self._send_chunk = send
+        self._buffer = bytearray(b"[")
+        self._first = True
+        self._kept: bytearray | None = bytearray() if keep_limit > 0 else None
+        self._keep_limit = keep_limit
+
+    def write(self, line: bytes) -> int:
+        if not self._first:
+            self._buffer += b","
+        self._buffer += line.rstrip(b"\n")
+        self._first = False
+        if len(self._buffer) >= STREAM_CHUNK_BYTES:
+            self._flush()
+        return len(line)
+
+    def close(self) -> bytes | None:
+        self._buffer += b"]"
+        self._flush()
+        return bytes(self._kept) if self._kept is not None else None
+
+    def _flush(self) -> None:
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._send_chunk(chunk)
+
+        if self._kept is not None:
+            if len(self._kept) + len(chunk) > self._keep_limit:
+                self._kept = None
+            else:
+                self._kept += chunk
+
+
+def _write_chunk(handler: BaseHTTPRequestHandler, chunk: bytes) -> None:
+    handler.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} не сериализуется в JSON")
@@ -0,0 +1,281 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from src.settings.api import api_config
+
+INDEX_FILE = "index.json"
+BLOBS_DIR = "blobs"
+
+
+@dataclass
+class CacheEntry:
+    """Запись индекса: ответ источника за период и файл c содержимым ответа"""
+
+    endpoint: str
+    start_date: date | None
+    end_date: date | None
+    blob: str
+    size: int
+    fetched_at: datetime
+    last_access: datetime
+
+    def covers(self, start_date: date | None, end_date: date | None) -> bool:
+        """Период записи включает запрошенный (None — без границы)"""
+
+        return _covers(self.start_date, self.end_date, start_date, end_date)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "blob": self.blob,
+            "size": self.size,
+            "fetched_at": self.fetched_at.isoformat(),
+            "last_access": self.last_access.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CacheEntry":
+        return cls(
+            endpoint=data["endpoint"],
+            start_date=date.fromisoformat(data["start_date"]) if data["start_date"] else None,
+            end_date=date.fromisoformat(data["end_date"]) if data["end_date"] else None,
+            blob=data["blob"],
+            size=int(data["size"]),
+            fetched_at=datetime.fromisoformat(data["fetched_at"]),
+            last_access=datetime.fromisoformat(data["last_access"]),
+        )
+
+
+@dataclass
+class CacheStats:
+    """Счётчики кэша за время жизни процесса"""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ResponseCache:
+    """
+    Дисковый кэш ответов API по ключу (источник, период).
+
+    - содержимое хранится в blobs/<sha256>.ndjson: одинаковые ответы за разные
+      периоды занимают место один раз
+    - запрос за под-период обслуживается записью c более широким периодом
+    - срок жизни зависит от самой свежей запрошенной даты: сегодня — TTL_TODAY,
+      недавние — TTL_RECENT; даты, которым на момент загрузки было не меньше
+      IMMUTABLE_AFTER_DAYS дней, считаются неизменными и не истекают
+    - при превышении max_bytes удаляются давно не читавшиеся записи (LRU)
+
+    Индекс (index.json) перезаписывается атомарно при put, вытеснении и clear;
+    время чтения (для LRU) копится в памяти и пишется не чаще `index_flush_interval`
+    и в flush(). Кэш рассчитан на один процесс, при нескольких процессах побеждает
+    последняя запись индекса.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_bytes: int | None = None,
+        ttl_today: timedelta | None = None,
+        ttl_recent: timedelta | None = None,
+        immutable_after_days: int | None = None,
+        now: Callable[[], datetime] = datetime.now,
+        index_flush_interval: timedelta | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir or api_config.API_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else api_config.API_CACHE_MAX_MB * 1024 * 1024
+        self.ttl_today = ttl_today or timedelta(minutes=api_config.API_CACHE_TTL_TODAY_MINUTES)
+        self.ttl_recent = ttl_recent or timedelta(hours=api_config.API_CACHE_TTL_RECENT_HOURS)
+        self.immutable_after_days = (
+            immutable_after_days if immutable_after_days is not None else api_config.API_CACHE_IMMUTABLE_AFTER_DAYS
+        )
+        self.index_flush_interval = index_flush_interval or timedelta(seconds=api_config.API_CACHE_INDEX_FLUSH_SECONDS)
+        self.stats = CacheStats()
+
+        self._now = now
+        self._lock = threading.Lock()
+        self._blobs_dir = self.cache_dir / BLOBS_DIR
+        self._blobs_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = self._load_index()
+        self._index_dirty = False
+        self._index_saved_at = now()
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def get(self, endpoint: str, start_date: date | None, end_date: date | None) -> bytes | None:
+        """
+        Содержимое свежей записи, покрывающей период (может быть шире запрошенного).
+        """
+
+        with self._lock:
+            entry = self._find(endpoint, start_date, end_date)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            try:
+                payload = (self._blobs_dir / entry.blob).read_bytes()
+            except OSError:
+                self._entries.remove(entry)
+                self._save_index()
+                self.stats.misses += 1
+                return None
+
+            entry.last_access = self._now()
+            self._index_dirty = True
+            if entry.last_access - self._index_saved_at >= self.index_flush_interval:
+                self._save_index()
+            self.stats.hits += 1
+            return payload
+
+    def contains(self, endpoint: str, start_date: date | None, end_date: date | None) -> bool:
+        """Есть ли свежая запись (без чтения содержимого и без учёта в статистике)"""
+
+        with self._lock:
+            return self._find(endpoint, start_date, end_date) is not None
+
+    def put(self, endpoint: str, start_date: date | None, end_date: date | None, payload: bytes) -> None:
+        """
+        Сохранить ответ. Записи того же источника, которые новая покрывает, удаляются.
+        """
+
+        blob = f"{hashlib.sha256(payload).hexdigest()}.ndjson"
+        now = self._now()
+
+        with self._lock:
+            blob_path = self._blobs_dir / blob
+            if not blob_path.exists():
+                self._write_atomic(blob_path, payload)
+
+            self._entries = [
+                e
+                for e in self._entries
+                if not (e.endpoint == endpoint and _covers(start_date, end_date, e.start_date, e.end_date))
+            ]
+            self._entries.append(CacheEntry(endpoint, start_date, end_date, blob, len(payload), now, now))
+            self.stats.stores += 1
+
+            self._evict()
+            self._remove_orphan_blobs()
+            self._save_index()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = []
+            self._remove_orphan_blobs()
+            self._save_index()
+
+    def flush(self) -> None:
+        """Записать накопленное время чтения записей (вызывается и при выходе из процесса)"""
+
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(self._blob_sizes().values())
+
+    def is_fresh(self, entry: CacheEntry, end_date: date | None) -> bool:
+        """
+        Актуальна ли запись для периода, заканчивающегося `end_date`.
+        """
+
+        now = self._now()
+        newest = min(d for d in (end_date, entry.end_date, now.date()) if d is not None)
+
+        if (entry.fetched_at.date() - newest).days >= self.immutable_after_days:
+            return True
+
+        ttl = self.ttl_today if newest >= now.date() else self.ttl_recent
+        return now - entry.fetched_at < ttl
+
+    def _find(self, endpoint: str, start_date: date | None, end_date: date | None) -> CacheEntry | None:
+        candidates = [
+            e
+            for e in self._entries
+            if e.endpoint == endpoint and e.covers(start_date, end_date) and self.is_fresh(e, end_date)
+        ]
+        # Самая узкая запись: меньше лишних строк на фильтрацию
+        return min(candidates, key=lambda e: e.size, default=None)
+
+    def _evict(self) -> None:
+        sizes = self._blob_sizes()
+        total = sum(sizes.values())
+        evicted = 0
+
+        for entry in sorted(self._entries, key=lambda e: e.last_access):
+            if total <= self.max_bytes:
+                break
+            self._entries.remove(entry)
+            evicted += 1
+            if all(e.blob != entry.blob for e in self._entries):
+                total -= sizes.pop(entry.blob, 0)
+
+        self.stats.evictions += evicted
+        if evicted:
+            logger.debug(f"🧹 Кэш API: вытеснено записей {evicted}, осталось {total} байт (лимит {self.max_bytes})")
+
+    def _blob_sizes(self) -> dict[str, int]:
+        return {e.blob: e.size for e in self._entries}
+
+    def _remove_orphan_blobs(self) -> None:
+        referenced = {e.blob for e in self._entries}
+        for path in self._blobs_dir.glob("*.ndjson"):
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
+
+    def _load_index(self) -> list[CacheEntry]:
+        index_path = self.cache_dir / INDEX_FILE
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                return [CacheEntry.from_dict(item) for item in json.load(f)]
+        except FileNotFoundError:
+            return []
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Индекс кэша API повреждён, кэш сброшен: {e}")
+            return []
+
+    def _save_index(self) -> None:
+        payload = json.dumps([e.to_dict() for e in self._entries], ensure_ascii=False).encode("utf-8")
+        self._write_atomic(self.cache_dir / INDEX_FILE, payload)
+        self._index_dirty = False
+        self._index_saved_at = self._now()
+
+    @staticmethod
+    def _write_atomic(path: Path, payload: bytes) -> None:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+
+
+def _flush_at_exit(ref: "weakref.ReferenceType[ResponseCache]") -> None:
+    cache = ref()
+    if cache is not None:
+        with suppress(OSError):
+            cache.flush()
+
+
+def _covers(outer_start: date | None, outer_end: date | None, start: date | None, end: date | None) -> bool:
+    starts_before = outer_start is None or (start is not None and outer_start <= start)
+    ends_after = outer_end is None or (end is not None and end <= outer_end)
+    return starts_before and ends_after
@@ -0,0 +1,111 @@
+import random
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from src.settings.scheduler import scheduler_config
+
+DateRange = tuple[date, date]
+
+
+@dataclass
+class RetryEntry:
+    """Диапазон дат, ожидающий повторной загрузки"""
+
+    start_date: date
+    end_date: date
+    attempt: int
+    next_run_at: datetime
+    last_error: str
+
+
+class RetryPolicy:
+    """
+    Экспоненциальная задержка c джиттером: base * 2^(attempt-1), не больше max_delay,
+    затем случайно ±jitter от значения, чтобы повторы разных диапазонов не совпадали.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = scheduler_config.MAX_RETRIES,
+        base_delay_seconds: float = scheduler_config.RETRY_DELAY_SECONDS,
+        max_delay_seconds: float = scheduler_config.RETRY_MAX_DELAY_SECONDS,
+        jitter: float = scheduler_config.RETRY_JITTER,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay_seconds
+        self.max_delay = max(max_delay_seconds, base_delay_seconds)
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._rng = rng
+
+    def should_retry(self, attempt: int) -> bool:
+        """Можно ли сделать попытку c номером `attempt` (1 — первый повтор)"""
+
+        return attempt <= self.max_retries
+
+    def delay(self, attempt: int) -> float:
+        """Задержка перед попыткой `attempt` в секундах"""
+
+        delay = min(self.base_delay * 2.0 ** max(attempt - 1, 0), self.max_delay)
+        spread = delay * self.jitter
+        return max(delay - spread + 2 * spread * self._rng(), 0.0)
+
+
+class RetryBacklog:
+    """
+    Потокобезопасный реестр отложенных повторов: что, когда и после какой ошибки
+    будет перезапущено, плюс счётчики для мониторинга.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[DateRange, RetryEntry] = {}
+        self._lock = threading.Lock()
+
+        self.scheduled_total = 0
+        self.succeeded_total = 0
+        self.exhausted_total = 0
+
+    def add(self, date_range: DateRange, attempt: int, next_run_at: datetime, error: str) -> None:
+        """Запланировать (или перепланировать) повтор диапазона"""
+
+        with self._lock:
+            self._entries[date_range] = RetryEntry(date_range[0], date_range[1], attempt, next_run_at, error)
+            self.scheduled_total += 1
+
+    def resolve(self, date_range: DateRange, succeeded: bool) -> None:
+        """Убрать диапазон из бэклога: успешный повтор или исчерпаны попытки"""
+
+        with self._lock:
+            self._entries.pop(date_range, None)
+            if succeeded:
+                self.succeeded_total += 1
+            else:
+                self.exhausted_total += 1
+
+    def pending_dates(self) -> set[date]:
+        """Даты, которые уже ждут повтора и не должны загружаться плановым запуском"""
+
+        with self._lock:
+            return {
+                entry.start_date + timedelta(days=offset)
+                for entry in self._entries.values()
+                for offset in range((entry.end_date - entry.start_date).days + 1)
+            }
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Текущий бэклог и счётчики повторов.
+        """
+
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e.next_run_at)
+            return {
+                "pending": len(entries),
+                "scheduled_total": self.scheduled_total,
+                "succeeded_total": self.succeeded_total,
+                "exhausted_total": self.exhausted_total,
+                "entries": [asdict(entry) for entry in entries],
+            }
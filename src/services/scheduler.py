@@ -1,13 +1,39 @@
-from datetime import date, timedelta
-
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+    JobExecutionEvent,
+    JobSubmissionEvent,
+)
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from loguru import logger
 
-from src.database import Database
+from src.database import Database, LoadWatermark
+from src.services.coordination import COORDINATION_MODES, DateClaimer, DatesClaimedError, LeaderElector
+from src.services.db_writer import BufferedWriter
 from src.services.etl_service import ETLService
+from src.services.http_extractor import QuotaExceededError
+from src.services.instrumentation import ETLResult
+from src.services.job_queue import JobQueue
+from src.services.metrics import MetricsRegistry, MetricsServer
+from src.services.pacing import QuotaPacer
 from src.services.rate_limiter import RateLimiter
+from src.services.retry import RetryBacklog, RetryPolicy
+from src.services.watermarks import WatermarkTracker
 from src.settings.scheduler import scheduler_config
+from src.utils.clock import Clock, SystemClock
 
 
 class SchedulerService:
@@ -15,17 +41,59 @@ class SchedulerService:
     Сервис для планирования автоматических обновлений данных.
     """
 
-    def __init__(self, database: Database) -> None:
+    def __init__(
+        self,
+        database: Database,
+        metrics_port: int = scheduler_config.METRICS_PORT,
+        clock: Clock | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
         """
         Инициализация планировщика.
+
+        При `metrics_port` > 0 на старте поднимается HTTP эндпоинт /metrics.
+        `clock` подменяет время (симуляция, тесты); по умолчанию — системное.
         """
 
         self.database = database
-        self.etl_service = ETLService(database=database)
-        self.rate_limiter = RateLimiter()
+        self.clock = clock or SystemClock()
+        self.writer = BufferedWriter(database=database)
+        self.rate_limiter = rate_limiter or RateLimiter(
+            database=database,
+            clock=self.clock.monotonic,
+            now=self.clock.now,
+        )
+        # Квоту расходуют источники: по слоту на чтение файла или HTTP запрос
+        self.etl_service = ETLService(database=database, writer=self.writer, rate_limiter=self.rate_limiter)
+        self.watermark_sources = self.etl_service.registry.names
+        self.pacer = (
+            QuotaPacer(self.rate_limiter, now=self.clock.now, requests_per_range=self._shared_quota_sources())
+            if scheduler_config.ADAPTIVE_SCHEDULING
+            else None
+        )
+        self.retry_policy = RetryPolicy()
+        self.retry_backlog = RetryBacklog()
+        # Диапазоны, чей поток ETL ещё работает (в том числе после таймаута)
+        self._inflight: dict[tuple[date, date], Future[int | None]] = {}
+        self._inflight_lock = threading.Lock()
         self.scheduler = BackgroundScheduler()
         self.is_running = False
 
+        self.coordination_mode = scheduler_config.COORDINATION_MODE
+        if self.coordination_mode not in COORDINATION_MODES:
+            raise ValueError(f"Неизвестный режим координации: {self.coordination_mode}")
+        self.leader_elector = LeaderElector(database) if self.coordination_mode == "leader" else None
+        self.date_claimer = DateClaimer(database) if self.coordination_mode == "shard" else None
+        self.job_queue = JobQueue(database) if scheduler_config.USE_JOB_QUEUE else None
+
+        self.metrics = MetricsRegistry()
+        self._describe_metrics()
+        self.metrics.add_collector(self._collect_metrics)
+        self.metrics_server = (
+            MetricsServer(self.metrics, scheduler_config.METRICS_HOST, metrics_port) if metrics_port else None
+        )
+        self.scheduler.add_listener(self._on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED | EVENT_JOB_ERROR)
+
     def start(self) -> None:
         """Запуск планировщика"""
         if self.is_running:
@@ -34,6 +102,8 @@ class SchedulerService:
 
         logger.info("🚀 Запуск планировщика ETL процессов...")
 
+        self.writer.start()
+
         self.scheduler.add_job(
             func=self._run_etl_job,
             trigger=IntervalTrigger(minutes=scheduler_config.UPDATE_INTERVAL_MINUTES),
@@ -43,6 +113,8 @@ class SchedulerService:
         )
 
         self.scheduler.start()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
         self.is_running = True
 
         logger.info(f"✅ Планировщик запущен. Интервал обновления: {scheduler_config.UPDATE_INTERVAL_MINUTES} мин")
@@ -55,6 +127,13 @@ class SchedulerService:
 
         logger.info("🛑 Остановка планировщика...")
         self.scheduler.shutdown()
+        self.writer.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.leader_elector is not None:
+            self.leader_elector.release()
+        if self.date_claimer is not None:
+            self.date_claimer.release()
         self.is_running = False
         logger.info("✅ Планировщик остановлен")
 
@@ -63,82 +142,485 @@ class SchedulerService:
         Основная задача ETL c проверкой лимитов и умной загрузкой.
         """
 
-        logger.info("=" * 80)
+        logger.debug("=" * 80)
         logger.info("📊 Запуск плановой задачи ETL")
 
+        if self.leader_elector is not None and not self.leader_elector.try_acquire():
+            logger.info("💤 Процесс не является лидером, пропускаем запуск")
+            return
+
         if not self.rate_limiter.can_make_request():
             stats = self.rate_limiter.get_stats()
             next_time = self.rate_limiter.get_next_available_time()
             logger.warning(f"⚠️ Достигнут лимит API: {stats['used']}/{stats['total']} ({stats['usage_percent']}%)")
             logger.warning(f"⏳ Следующий доступный слот: {next_time}")
+            self._apply_pacing([])
             return
 
         try:
             dates_to_load = self._get_dates_to_load()
 
+            retry_dates = self.retry_backlog.pending_dates()
+            if retry_dates:
+                dates_to_load = [d for d in dates_to_load if d not in retry_dates]
+                logger.info(f"🔁 Дат в очереди повторов: {len(retry_dates)}, плановый запуск их пропускает")
+
+            inflight_dates = self._inflight_dates()
+            if inflight_dates:
+                dates_to_load = [d for d in dates_to_load if d not in inflight_dates]
+                logger.info(f"⏳ Дат в незавершённых загрузках: {len(inflight_dates)}, плановый запуск их пропускает")
+
             if not dates_to_load:
                 logger.info("✅ Bce данные актуальны, загрузка не требуется")
+                self._apply_pacing([])
                 return
 
-            logger.info(f"📅 Найдено дат для загрузки: {len(dates_to_load)}")
-
-            for check_date in dates_to_load:
-                if not self.rate_limiter.can_make_request():
-                    logger.warning("⚠️ Лимит API исчерпан, прерываем загрузку")
-                    break
+            date_ranges = self._coalesce_date_ranges(dates_to_load, scheduler_config.MAX_RANGE_DAYS)
+            logger.info(f"📅 Найдено дат для загрузки: {len(dates_to_load)}, диапазонов: {len(date_ranges)}")
 
-                logger.info(f"📥 Загрузка данных за {check_date}...")
+            date_ranges = self._apply_pacing(date_ranges)
 
-                results = self.etl_service.run(
-                    start_date=check_date,
-                    end_date=check_date,
-                )
+            if self.job_queue is not None:
+                enqueued = [r for r in date_ranges if self.job_queue.enqueue(r[0], r[1]) is not None]
+                skipped = len(date_ranges) - len(enqueued)
+                logger.info(f"📬 Поставлено в очередь задач: {len(enqueued)} (уже в очереди: {skipped})")
+                return
 
-                self.rate_limiter.record_request()
+            run_stats = self._run_date_ranges(date_ranges)
+            logger.info(
+                f"🏁 Диапазонов: {run_stats['ranges']}, успешно: {run_stats['succeeded']}, "
+                f"ошибок: {run_stats['failed']}, таймаутов: {run_stats['timed_out']}, "
+                f"пропущено (лимит): {run_stats['skipped']}, "
+                f"занято другими репликами: {run_stats['claimed_elsewhere']}, записано в БД: {run_stats['records']}, "
+                f"время: {run_stats['duration_seconds']} c"
+            )
 
-                logger.info(f"✅ Загружено записей: {len(results)}")
+            for range_start, range_end, error in run_stats["failed_ranges"]:
+                self._schedule_retry((range_start, range_end), attempt=1, error=error)
 
             stats = self.rate_limiter.get_stats()
             logger.info(f"📊 Использовано API запросов: {stats['used']}/{stats['total']} ({stats['usage_percent']}%)")
             logger.info(f"💚 Доступно запросов: {stats['available']}")
 
+            retry_stats = self.retry_backlog.get_stats()
+            if retry_stats["pending"]:
+                logger.info(f"🔁 Ожидают повтора диапазонов: {retry_stats['pending']}")
+
         except Exception as e:
             logger.error(f"❌ Ошибка при выполнении ETL задачи: {e}", exc_info=True)
 
-        logger.info("=" * 80)
+        logger.debug("=" * 80)
+
+    def _apply_pacing(self, date_ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+        """
+        Адаптивный режим: отобрать диапазоны в рамках бюджета запуска
+        и перенастроить интервал задачи. Без ADAPTIVE_SCHEDULING — без изменений.
+        """
+
+        if self.pacer is None:
+            return date_ranges
+
+        decision = self.pacer.plan(date_ranges)
+        logger.info(
+            f"🧭 Пейсинг: бюджет {decision.budget} диапазонов (~{decision.requests_per_range} запросов на диапазон, "
+            f"доступно {decision.available}), отложено диапазонов: "
+            f"{decision.backlog_ranges}, следующий запуск через {decision.next_interval_seconds / 60:.1f} мин"
+        )
+
+        if self.scheduler.get_job("etl_job") is not None:
+            self.scheduler.reschedule_job(
+                "etl_job",
+                trigger=IntervalTrigger(seconds=decision.next_interval_seconds),
+            )
+
+        return decision.ranges
+
+    def _shared_quota_sources(self) -> int:
+        """Источники, которые платят общей квотой планировщика: минимум запросов на диапазон"""
+
+        return max(1, sum(1 for s in self.etl_service.registry.sources if s.rate_limiter is self.rate_limiter))
+
+    def _run_date_ranges(
+        self,
+        date_ranges: list[tuple[date, date]],
+        workers: int = scheduler_config.ETL_WORKERS,
+        job_timeout: float = scheduler_config.JOB_TIMEOUT_SECONDS,
+    ) -> dict[str, Any]:
+        """
+        Выполнить ETL для диапазонов дат на пуле воркеров.
+
+        Каждый воркер перед запуском атомарно занимает слот в RateLimiter,
+        поэтому параллельные задачи не превышают дневную квоту. Режим shard:
+        даты диапазона забираются в date_claims непосредственно перед загрузкой
+        и освобождаются, когда поток загрузки завершился; диапазон, часть дат
+        которого занята другой репликой, пропускается.
+        Зависшие дольше `job_timeout` задачи считаются таймаутом и не ожидаются, но их
+        диапазон остаётся занятым (см. _inflight_dates), пока поток не завершится:
+        повтор и плановый запуск не загружают те же даты параллельно.
+        """
+
+        stats: dict[str, Any] = {
+            "ranges": len(date_ranges),
+            "succeeded": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "skipped": 0,
+            "claimed_elsewhere": 0,
+            "records": 0,
+            "duration_seconds": 0.0,
+            "failed_ranges": [],
+        }
+
+        if not date_ranges:
+            return stats
+
+        started_at = time.monotonic()
+        poll_interval = min(1.0, job_timeout / 4)
+        job_started: dict[tuple[date, date], float] = {}
+        executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="etl-worker")
+
+        def run_range(range_start: date, range_end: date) -> int | None:
+            job_started[(range_start, range_end)] = time.monotonic()
+
+            with self._claim_range(range_start, range_end):
+                return load_range(range_start, range_end)
+
+        def load_range(range_start: date, range_end: date) -> int | None:
+            # Слоты квоты атомарно занимают источники (файл — чтение, HTTP — каждый запрос);
+            # здесь — только быстрая проверка без списания. Кэш ответов квоту не тратит
+            if not self.etl_service.is_cached(range_start, range_end) and not self.rate_limiter.can_make_request():
+                return None
+
+            logger.info(f"📥 Загрузка данных за {range_start} — {range_end}...")
+            run_started = time.monotonic()
+            try:
+                # Инкрементальный запуск: даты c прежним отпечатком источников не перезаписываются
+                results = self.etl_service.run(start_date=range_start, end_date=range_end, skip_unchanged=True)
+            except QuotaExceededError as e:
+                logger.warning(f"⚠️ {range_start} — {range_end}: {e}")
+                return None
+            written = results.rows_written if isinstance(results, ETLResult) else len(results)
+            logger.info(f"✅ {range_start} — {range_end}: загружено записей: {len(results)}, записано в БД: {written}")
+            if isinstance(results, ETLResult):
+                logger.bind(etl_report=True).info(results.report.to_json())
+                if self.pacer is not None:
+                    self.pacer.record_cost(results.report.requests)
+            self._record_run_metrics(range_start, range_end, results, time.monotonic() - run_started)
+            return written
+
+        pending: dict[Future[int | None], tuple[date, date]] = {}
+        for date_range in date_ranges:
+            future = executor.submit(run_range, *date_range)
+            self._track_inflight(date_range, future)
+            pending[future] = date_range
+
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    range_start, range_end = pending.pop(future)
+                    try:
+                        records = future.result()
+                    except DatesClaimedError:
+                        stats["claimed_elsewhere"] += 1
+                        continue
+                    except Exception as e:
+                        stats["failed"] += 1
+                        stats["failed_ranges"].append((range_start, range_end, str(e)))
+                        logger.error(f"❌ Ошибка ETL за {range_start} — {range_end}: {e}")
+                        continue
+
+                    if records is None:
+                        stats["skipped"] += 1
+                    else:
+                        stats["succeeded"] += 1
+                        stats["records"] += records
+
+                now = time.monotonic()
+                for future, date_range in list(pending.items()):
+                    job_start = job_started.get(date_range)
+                    if job_start is not None and now - job_start > job_timeout:
+                        range_start, range_end = pending.pop(future)
+                        stats["timed_out"] += 1
+                        stats["failed_ranges"].append((range_start, range_end, f"timeout {job_timeout} c"))
+                        logger.error(f"⏱️ Таймаут ETL за {range_start} — {range_end} ({job_timeout} c)")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if stats["skipped"]:
+            logger.warning(f"⚠️ Лимит API исчерпан, пропущено диапазонов: {stats['skipped']}")
+
+        for status in ("succeeded", "failed", "timed_out", "skipped", "claimed_elsewhere"):
+            if stats[status]:
+                self.metrics.inc("etl_ranges_total", stats[status], {"status": status})
+
+        stats["duration_seconds"] = round(time.monotonic() - started_at, 3)
+        return stats
+
+    def _schedule_retry(
+        self,
+        date_range: tuple[date, date],
+        attempt: int,
+        error: str,
+        delay_seconds: float | None = None,
+    ) -> None:
+        """
+        Запланировать повтор диапазона отдельной разовой задачей планировщика.
+
+        Задержка растёт экспоненциально c джиттером; после MAX_RETRIES попыток
+        диапазон снимается c повторов и ждёт следующего планового запуска.
+        """
+
+        range_start, range_end = date_range
+
+        if not self.retry_policy.should_retry(attempt):
+            self.retry_backlog.resolve(date_range, succeeded=False)
+            logger.error(
+                f"🛑 {range_start} — {range_end}: попытки исчерпаны ({self.retry_policy.max_retries}), "
+                f"последняя ошибка: {error}"
+            )
+            return
+
+        if delay_seconds is None:
+            delay_seconds = self.retry_policy.delay(attempt)
+
+        run_at = self.clock.now().astimezone() + timedelta(seconds=delay_seconds)
+        self.retry_backlog.add(date_range, attempt, run_at, error)
+        self.scheduler.add_job(
+            func=self._run_retry,
+            trigger=DateTrigger(run_date=run_at),
+            args=[range_start, range_end, attempt],
+            id=f"etl_retry_{range_start}_{range_end}",
+            name=f"Повтор ETL {range_start} — {range_end} (попытка {attempt})",
+            replace_existing=True,
+            misfire_grace_time=None,
+        )
+        logger.warning(
+            f"🔁 {range_start} — {range_end}: повтор #{attempt} через {delay_seconds:.0f} c (ошибка: {error})"
+        )
+
+    def _run_retry(self, range_start: date, range_end: date, attempt: int) -> None:
+        """
+        Повторная загрузка одного диапазона.
+
+        Запрос к API списывается только если попытка реально выполнена:
+        без свободной квоты повтор переносится на ближайший слот без увеличения счётчика попыток.
+        """
+
+        date_range = (range_start, range_end)
+
+        inflight_dates = self._inflight_dates()
+        if any(range_start <= d <= range_end for d in inflight_dates):
+            # Прошлая попытка (например, после таймаута) ещё пишет эти даты
+            self._schedule_retry(
+                date_range,
+                attempt,
+                "предыдущая загрузка ещё выполняется",
+                delay_seconds=self.retry_policy.base_delay,
+            )
+            return
+
+        logger.info(f"🔁 Повтор #{attempt} ETL за {range_start} — {range_end}")
+
+        run_stats = self._run_date_ranges([date_range], workers=1)
+
+        if run_stats["succeeded"]:
+            self.retry_backlog.resolve(date_range, succeeded=True)
+            logger.info(f"✅ Повтор #{attempt} за {range_start} — {range_end} успешен")
+            return
+
+        if run_stats["claimed_elsewhere"]:
+            self._schedule_retry(
+                date_range,
+                attempt,
+                "даты загружает другая реплика",
+                delay_seconds=self.retry_policy.base_delay,
+            )
+            return
+
+        if run_stats["skipped"]:
+            next_time = self.rate_limiter.get_next_available_time()
+            delay = self.retry_policy.base_delay
+            if next_time is not None:
+                delay = max((next_time - self.clock.now(next_time.tzinfo)).total_seconds(), delay)
+            self._schedule_retry(date_range, attempt, "лимит API исчерпан", delay_seconds=delay)
+            return
+
+        _, _, error = run_stats["failed_ranges"][0]
+        self._schedule_retry(date_range, attempt + 1, error)
+
+    def _track_inflight(self, date_range: tuple[date, date], future: "Future[int | None]") -> None:
+        with self._inflight_lock:
+            self._inflight[date_range] = future
+        future.add_done_callback(lambda _: self._finish_inflight(date_range))
+
+    def _finish_inflight(self, date_range: tuple[date, date]) -> None:
+        """Поток диапазона завершился (или задача отменена до старта): даты свободны"""
+
+        with self._inflight_lock:
+            self._inflight.pop(date_range, None)
+
+    def _inflight_dates(self) -> set[date]:
+        with self._inflight_lock:
+            ranges = list(self._inflight)
+        return {d for range_start, range_end in ranges for d in self._range_dates(range_start, range_end)}
+
+    @contextmanager
+    def _claim_range(self, range_start: date, range_end: date) -> Iterator[None]:
+        """
+        Режим shard: забрать все даты диапазона на время загрузки (иначе DatesClaimedError)
+        и освободить их по её завершении, в том числе при ошибке.
+        """
+
+        if self.date_claimer is None:
+            yield
+            return
+
+        dates = self._range_dates(range_start, range_end)
+        claimed = self.date_claimer.claim(dates)
+        if len(claimed) < len(dates):
+            if claimed:
+                self.date_claimer.release(claimed)
+            logger.info(f"💤 {range_start} — {range_end}: даты уже забраны другой репликой")
+            raise DatesClaimedError(f"{range_start} — {range_end}")
+
+        try:
+            yield
+        finally:
+            self.date_claimer.release(dates)
+
+    @staticmethod
+    def _range_dates(range_start: date, range_end: date) -> list[date]:
+        return [range_start + timedelta(days=offset) for offset in range((range_end - range_start).days + 1)]
+
+    def _describe_metrics(self) -> None:
+        metrics = self.metrics
+        metrics.describe("etl_run_duration_seconds", "histogram", "Длительность ETL запуска по диапазону дат")
+        metrics.describe("etl_stage_duration_seconds", "histogram", "Длительность стадии ETL")
+        metrics.describe("etl_stage_rows_per_second", "gauge", "Пропускная способность стадии в последнем запуске")
+        metrics.describe("etl_ranges_total", "counter", "Диапазоны дат по исходу")
+        metrics.describe("etl_rows_total", "counter", "Загруженные записи")
+        metrics.describe("etl_date_last_success_timestamp_seconds", "gauge", "Время последней успешной загрузки даты")
+        metrics.describe("rate_limiter_requests", "gauge", "Состояние RateLimiter (used, available, total)")
+        metrics.describe("rate_limiter_usage_percent", "gauge", "Использование квоты API, %")
+        metrics.describe("db_pool_connections", "gauge", "Соединения пула БД по состоянию")
+        metrics.describe("db_writer_pending_rows", "gauge", "Строки в буфере фоновой записи")
+        metrics.describe("etl_retry_backlog", "gauge", "Диапазоны, ожидающие повтора")
+        metrics.describe("scheduler_pacing_interval_seconds", "gauge", "Интервал до следующего запуска (QuotaPacer)")
+        metrics.describe(
+            "scheduler_pacing_ranges", "gauge", "Последнее решение QuotaPacer (budget, available, backlog)"
+        )
+        metrics.describe("scheduler_pacing_backoff", "gauge", "1 — квота исчерпана, запуски разрежены до максимума")
+        metrics.describe(
+            "scheduler_pacing_requests_per_range", "gauge", "Оценка QuotaPacer: запросов к источникам на диапазон"
+        )
+        metrics.describe("scheduler_pacing_decisions_total", "counter", "Решения QuotaPacer")
+        metrics.describe("scheduler_pacing_ranges_deferred_total", "counter", "Диапазоны, отложенные QuotaPacer")
+        metrics.describe("scheduler_pacing_throttled_total", "counter", "Решения QuotaPacer c исчерпанной квотой")
+        metrics.describe("scheduler_job_lag_seconds", "histogram", "Задержка запуска задачи относительно расписания")
+        metrics.describe("scheduler_job_misfires_total", "counter", "Пропущенные запуски задач (misfire)")
+        metrics.describe("scheduler_job_errors_total", "counter", "Задачи, завершившиеся исключением")
+
+    def _record_run_metrics(self, range_start: date, range_end: date, results: list[Any], duration: float) -> None:
+        self.metrics.observe("etl_run_duration_seconds", duration)
+        self.metrics.inc("etl_rows_total", len(results))
+
+        if isinstance(results, ETLResult):
+            for stage in results.report.stages:
+                self.metrics.observe("etl_stage_duration_seconds", stage.wall_seconds, {"stage": stage.stage})
+                if stage.wall_seconds > 0:
+                    rows = max(stage.rows_in, stage.rows_out)
+                    self.metrics.set("etl_stage_rows_per_second", rows / stage.wall_seconds, {"stage": stage.stage})
+
+        finished_at = time.time()
+        for offset in range((range_end - range_start).days + 1):
+            day = range_start + timedelta(days=offset)
+            self.metrics.set("etl_date_last_success_timestamp_seconds", finished_at, {"date": day.isoformat()})
+
+    def _collect_metrics(self, metrics: MetricsRegistry) -> None:
+        """Снять текущие значения gauge перед отдачей /metrics"""
+
+        limiter_stats = self.rate_limiter.get_stats()
+        for key in ("used", "available", "total"):
+            metrics.set("rate_limiter_requests", limiter_stats[key], {"state": key})
+        metrics.set("rate_limiter_usage_percent", limiter_stats["usage_percent"])
+
+        if self.pacer is not None:
+            pacing = self.pacer.get_metrics()
+            for key in ("decisions_total", "ranges_deferred_total", "throttled_total"):
+                metrics.set(f"scheduler_pacing_{key}", pacing[key])
+            if self.pacer.last_decision is not None:
+                metrics.set("scheduler_pacing_interval_seconds", pacing["next_interval_seconds"])
+                metrics.set("scheduler_pacing_backoff", int(pacing["backoff"]))
+                metrics.set("scheduler_pacing_requests_per_range", pacing["requests_per_range"])
+                for key, state in (("budget", "budget"), ("available", "available"), ("backlog_ranges", "backlog")):
+                    metrics.set("scheduler_pacing_ranges", pacing[key], {"state": state})
+
+        for state, value in self.database.get_pool_stats().items():
+            metrics.set("db_pool_connections", value, {"state": state})
+
+        metrics.set("db_writer_pending_rows", self.writer.get_stats()["pending"])
+        metrics.set("etl_retry_backlog", self.retry_backlog.get_stats()["pending"])
+
+    def _on_job_event(self, event: JobEvent) -> None:
+        """Листенер APScheduler: задержка запуска, misfire и ошибки задач"""
+
+        job = "etl_retry" if event.job_id.startswith("etl_retry_") else event.job_id
+
+        if isinstance(event, JobSubmissionEvent):
+            scheduled = max(event.scheduled_run_times)
+            lag = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+            self.metrics.observe("scheduler_job_lag_seconds", max(lag, 0.0), {"job": job})
+        elif isinstance(event, JobExecutionEvent) and event.code == EVENT_JOB_MISSED:
+            self.metrics.inc("scheduler_job_misfires_total", labels={"job": job})
+        elif isinstance(event, JobExecutionEvent) and event.code == EVENT_JOB_ERROR:
+            self.metrics.inc("scheduler_job_errors_total", labels={"job": job})
 
     def _get_dates_to_load(self) -> list[date]:
         """
         Определить даты которые нужно загрузить.
+
+        Watermarks за всё окно читаются одним запросом; дата попадает
+        в загрузку, если её нет или она устарела (см. WatermarkTracker.is_stale).
         """
 
-        dates_to_check = []
-        today = date.today()
+        today = self.clock.today()
+        now = self.clock.now(UTC)
+        window_start = today - timedelta(days=scheduler_config.LOOKBACK_DAYS - 1)
 
-        for days_ago in range(7):
-            check_date = today - timedelta(days=days_ago)
-            dates_to_check.append(check_date)
+        watermarks_by_date: dict[date, list[LoadWatermark]] = defaultdict(list)
+        for watermark in self.database.get_watermarks(window_start, today):
+            watermarks_by_date[watermark.date].append(watermark)
 
         dates_to_load = []
 
-        for check_date in dates_to_check:
-            if not self._date_has_data(check_date):
+        for days_ago in range(scheduler_config.LOOKBACK_DAYS):
+            check_date = today - timedelta(days=days_ago)
+            if WatermarkTracker.is_stale(
+                check_date, watermarks_by_date[check_date], today, now, sources=self.watermark_sources
+            ):
                 dates_to_load.append(check_date)
 
         return sorted(dates_to_load)
 
-    def _date_has_data(self, check_date: date) -> bool:
+    @staticmethod
+    def _coalesce_date_ranges(dates: list[date], max_days: int) -> list[tuple[date, date]]:
         """
-        Проверить есть ли данные для указанной даты в БД.
+        Схлопнуть последовательные даты в диапазоны [start, end] длиной не более max_days.
         """
 
-        with self.database.get_session() as session:
-            from sqlalchemy import select
+        ranges: list[tuple[date, date]] = []
 
-            from src.database.models import DailyStats
+        for current in sorted(set(dates)):
+            if ranges:
+                range_start, range_end = ranges[-1]
+                if current - range_end == timedelta(days=1) and (current - range_start).days < max_days:
+                    ranges[-1] = (range_start, current)
+                    continue
+            ranges.append((current, current))
 
-            result = session.execute(select(DailyStats).where(DailyStats.date == check_date).limit(1))
-            return result.scalar_one_or_none() is not None
+        return ranges
 
     def run_manual_update(self, start_date: date | None = None, end_date: date | None = None) -> None:
         """
@@ -147,13 +629,13 @@ class SchedulerService:
 
         logger.info("🔧 Ручной запуск обновления данных...")
 
-        if not self.rate_limiter.can_make_request():
+        cached = self.etl_service.is_cached(start_date, end_date)
+        if not cached and not self.rate_limiter.can_make_request():
             stats = self.rate_limiter.get_stats()
             logger.error(f"❌ Невозможно выполнить обновление. Лимит API: {stats['used']}/{stats['total']}")
             return
 
         results = self.etl_service.run(start_date=start_date, end_date=end_date)
-        self.rate_limiter.record_request()
 
         stats = self.rate_limiter.get_stats()
         logger.info(f"✅ Обновление завершено. Обработано записей: {len(results)}")
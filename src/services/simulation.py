@@ -0,0 +1,394 @@
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from datetime import time as dt_time
+from typing import Any
+
+from loguru import logger
+
+from src.database import Database, LoadWatermark
+from src.services.etl_service import ETLService
+from src.services.http_extractor import QuotaExceededError
+from src.services.instrumentation import ETLResult, RunReport, StageMetrics
+from src.services.pacing import QuotaPacer
+from src.services.rate_limiter import RateLimiter
+from src.services.retry import RetryPolicy
+from src.services.scheduler import SchedulerService
+from src.services.watermarks import SOURCES, WatermarkTracker
+from src.settings.api import api_config
+from src.settings.scheduler import scheduler_config
+from src.utils.clock import VirtualClock
+
+AGE_BUCKETS = ("today", "recent", "old")
+
+
+class InMemoryDatabase(Database):
+    """
+    Database без PostgreSQL: watermarks и daily_stats в словарях.
+
+    Поддерживает ровно то, что нужно планировщику и симуляции; сессий нет.
+    """
+
+    def __init__(self) -> None:
+        self.watermarks: dict[tuple[date, str], dict[str, Any]] = {}
+        self.stats: dict[tuple[date, str], dict[str, Any]] = {}
+
+    def init_db(self) -> None:
+        return
+
+    def bulk_upsert_stats(self, stats_list: list[dict[str, Any]]) -> None:
+        for row in stats_list:
+            self.stats[(row["date"], row["campaign_id"])] = dict(row)
+
+    def get_watermarks(self, start_date: date, end_date: date) -> list[LoadWatermark]:
+        return [
+            LoadWatermark(**row)
+            for (record_date, _), row in self.watermarks.items()
+            if start_date <= record_date <= end_date
+        ]
+
+    def upsert_watermarks(self, watermarks: list[dict[str, Any]]) -> None:
+        for row in watermarks:
+            self.watermarks[(row["date"], row["source"])] = dict(row)
+
+    def get_pool_stats(self) -> dict[str, int]:
+        return {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
+
+    def close(self) -> None:
+        return
+
+
+class DataChangeModel:
+    """
+    Модель изменения источника: данные даты меняются каждые `change_interval_minutes`
+    c начала дня и до `settle_hours` после конца суток, потом замирают.
+    """
+
+    def __init__(self, change_interval_minutes: int = 60, settle_hours: int = 48) -> None:
+        self.change_interval = timedelta(minutes=max(change_interval_minutes, 1))
+        self.settle = timedelta(hours=settle_hours)
+
+    @staticmethod
+    def day_start(record_date: date) -> datetime:
+        """Начало суток даты (локальная полночь) в UTC"""
+
+        return datetime.combine(record_date, dt_time.min).astimezone(UTC)
+
+    def settled_at(self, record_date: date) -> datetime:
+        return self.day_start(record_date) + timedelta(days=1) + self.settle
+
+    def version(self, record_date: date, now: datetime) -> int:
+        """Номер версии данных даты на момент `now`"""
+
+        elapsed = min(now, self.settled_at(record_date)) - self.day_start(record_date)
+        return max(int(elapsed / self.change_interval), 0)
+
+    def fingerprint(self, record_date: date, source: str, now: datetime) -> str:
+        return f"{record_date}:{source}:v{self.version(record_date, now)}"
+
+    def unseen_since(self, record_date: date, loaded_at: datetime | None, now: datetime) -> datetime | None:
+        """
+        Момент первого изменения, которого нет в загруженных данных (None — данные свежие).
+        """
+
+        start = self.day_start(record_date)
+        if loaded_at is None:
+            return start
+
+        first_change = start + self.change_interval * (max(int((loaded_at - start) / self.change_interval), 0) + 1)
+        if first_change > min(now, self.settled_at(record_date)):
+            return None
+        return first_change
+
+
+class SimulatedETLService(ETLService):
+    """
+    ETL без файлов: отпечатки берутся из DataChangeModel, watermarks пишутся
+    настоящим WatermarkTracker на виртуальном времени. Каждый источник отдаёт
+    диапазон страницами по `page_size` строк: c `rate_limiter` каждая страница
+    занимает слот квоты, как запрос HTTPExtractor.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        clock: VirtualClock,
+        model: DataChangeModel,
+        failure_rate: float = 0.0,
+        rows_per_date: int = 100,
+        seed: int = 42,
+        rate_limiter: RateLimiter | None = None,
+        page_size: int = api_config.API_PAGE_SIZE,
+    ) -> None:
+        super().__init__(database=database, rate_limiter=rate_limiter)
+        self.clock = clock
+        self.model = model
+        self.failure_rate = failure_rate
+        self.rows_per_date = rows_per_date
+        self.page_size = max(page_size, 1)
+        self._rng = random.Random(seed)
+
+        self.runs = 0
+        self.failures = 0
+        self.runs_by_day: Counter[date] = Counter()
+        self.requests_by_day: Counter[date] = Counter()
+
+    def pages_per_source(self, days: int) -> int:
+        """Страниц (запросов к API) на источник для диапазона из `days` дат"""
+
+        return max(1, math.ceil(self.rows_per_date * days / self.page_size))
+
+    def run(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        skip_unchanged: bool = False,
+    ) -> ETLResult:
+        if start_date is None or end_date is None:
+            raise ValueError("Симуляция загружает только диапазоны дат")
+
+        dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        requests = len(SOURCES) * self.pages_per_source(len(dates))
+        for _ in range(requests):
+            if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+                raise QuotaExceededError("симулированный API: квота исчерпана")
+            self.requests_by_day[self.clock.today()] += 1
+
+        self.runs += 1
+        self.runs_by_day[self.clock.today()] += 1
+
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise RuntimeError("симулированная ошибка источника")
+
+        now = self.clock.now(UTC)
+        fingerprints = {
+            source: {d: (self.rows_per_date, self.model.fingerprint(d, source, now)) for d in dates}
+            for source in SOURCES
+        }
+
+        _, watermarks = WatermarkTracker.build(
+            fingerprints, self.database.get_watermarks(start_date, end_date), now=now
+        )
+        self.database.upsert_watermarks(watermarks)
+
+        report = RunReport(
+            started_at=self.clock.now(),
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            stages=[
+                StageMetrics("extract", rows_out=self.rows_per_date * len(dates) * len(SOURCES), requests=requests)
+            ],
+        )
+        return ETLResult([], report)
+
+
+@dataclass
+class _LagStats:
+    samples: int = 0
+    stale_samples: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def add(self, lag_seconds: float) -> None:
+        self.samples += 1
+        self.total_seconds += lag_seconds
+        self.max_seconds = max(self.max_seconds, lag_seconds)
+        if lag_seconds > 0:
+            self.stale_samples += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "avg_minutes": round(self.total_seconds / self.samples / 60, 1) if self.samples else 0.0,
+            "max_minutes": round(self.max_seconds / 60, 1),
+            "stale_share": round(self.stale_samples / self.samples, 3) if self.samples else 0.0,
+        }
+
+
+@dataclass
+class SimulationReport:
+    """Итоги симуляции: расход квоты, число запусков и отставание данных"""
+
+    start: datetime
+    days: int
+    adaptive: bool
+    ticks: int = 0
+    retries_run: int = 0
+    quota_blocked_ticks: int = 0
+    ranges: dict[str, int] = field(default_factory=dict)
+    requests_by_day: dict[str, int] = field(default_factory=dict)
+    quota_per_day: int = 0
+    freshness: dict[str, dict[str, Any]] = field(default_factory=dict)
+    retry: dict[str, int] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        used = list(self.requests_by_day.values())
+        return {
+            "start": self.start.isoformat(),
+            "days": self.days,
+            "adaptive": self.adaptive,
+            "ticks": self.ticks,
+            "retries_run": self.retries_run,
+            "quota_blocked_ticks": self.quota_blocked_ticks,
+            "ranges": self.ranges,
+            "quota": {
+                "per_day": self.quota_per_day,
+                "max_used": max(used, default=0),
+                "avg_used": round(sum(used) / len(used), 1) if used else 0.0,
+                "by_day": self.requests_by_day,
+            },
+            "freshness": self.freshness,
+            "retry": self.retry,
+            "wall_seconds": self.wall_seconds,
+        }
+
+
+class SchedulerSimulator:
+    """
+    Прогон настоящего SchedulerService._run_etl_job на виртуальных часах.
+
+    Время прыгает от события к событию (плановый запуск или повтор), поэтому
+    недели расписания считаются за секунды. RateLimiter (бэкенд memory),
+    QuotaPacer, watermarks и повторы работают как в проде; источник и БД — в памяти.
+    Отставание данных меряется по сетке `sample_minutes` для каждой даты окна.
+    """
+
+    def __init__(
+        self,
+        days: int = 7,
+        start: datetime | None = None,
+        adaptive: bool = scheduler_config.ADAPTIVE_SCHEDULING,
+        max_requests: int | None = None,
+        failure_rate: float = 0.0,
+        change_interval_minutes: int = 60,
+        settle_hours: int = 48,
+        sample_minutes: int = 15,
+        seed: int = 42,
+    ) -> None:
+        self.days = days
+        self.start = start or datetime.combine(date.today(), dt_time.min).astimezone()
+        self.clock = VirtualClock(self.start)
+        self.database = InMemoryDatabase()
+        self.model = DataChangeModel(change_interval_minutes, settle_hours)
+        self.sample_step = timedelta(minutes=max(sample_minutes, 1))
+
+        rate_limiter = RateLimiter(
+            max_requests=max_requests,
+            backend="memory",
+            clock=self.clock.monotonic,
+            now=self.clock.now,
+        )
+        self.service = SchedulerService(self.database, metrics_port=0, clock=self.clock, rate_limiter=rate_limiter)
+        self.service.leader_elector = None
+        self.service.date_claimer = None
+        self.service.job_queue = None
+        self.service.retry_policy = RetryPolicy(rng=random.Random(seed).random)
+        self.etl = SimulatedETLService(
+            self.database, self.clock, self.model, failure_rate=failure_rate, seed=seed, rate_limiter=rate_limiter
+        )
+        self.service.etl_service = self.etl
+        # Стартовая оценка пейсера — диапазон из одной даты; дальше её уточняют отчёты запусков
+        self.service.pacer = (
+            QuotaPacer(rate_limiter, now=self.clock.now, requests_per_range=len(SOURCES) * self.etl.pages_per_source(1))
+            if adaptive
+            else None
+        )
+
+        self._lag = {bucket: _LagStats() for bucket in AGE_BUCKETS}
+        self._next_sample = self.clock.now(UTC)
+
+    def run(self, quiet: bool = True) -> SimulationReport:
+        """
+        Прогнать `days` суток. При `quiet` логи сервисов на время прогона отключаются.
+        """
+
+        report = SimulationReport(start=self.start, days=self.days, adaptive=self.service.pacer is not None)
+        end = self.clock.now(UTC) + timedelta(days=self.days)
+        next_tick = self.clock.now(UTC)
+        started = time.perf_counter()
+
+        if quiet:
+            logger.disable("src")
+
+        try:
+            while True:
+                retry = self._next_retry()
+                retry_at = retry["next_run_at"].astimezone(UTC) if retry else None
+                event_at = min(next_tick, retry_at) if retry_at else next_tick
+
+                if event_at >= end:
+                    self._sample_until(end)
+                    self.clock.advance_to(end)
+                    break
+
+                self._sample_until(event_at)
+                self.clock.advance_to(event_at)
+
+                if retry is not None and retry_at is not None and retry_at <= next_tick:
+                    self.service._run_retry(retry["start_date"], retry["end_date"], retry["attempt"])
+                    report.retries_run += 1
+                    continue
+
+                if not self.service.rate_limiter.can_make_request():
+                    report.quota_blocked_ticks += 1
+
+                self.service._run_etl_job()
+                report.ticks += 1
+                next_tick = self.clock.now(UTC) + timedelta(seconds=self._interval_seconds())
+        finally:
+            if quiet:
+                logger.enable("src")
+
+        metrics = self.service.metrics
+        report.ranges = {
+            status: int(metrics.get("etl_ranges_total", {"status": status}) or 0)
+            for status in ("succeeded", "failed", "timed_out", "skipped")
+        }
+        report.requests_by_day = {day.isoformat(): count for day, count in sorted(self.etl.requests_by_day.items())}
+        report.quota_per_day = self.service.rate_limiter.max_requests
+        report.freshness = {bucket: stats.to_dict() for bucket, stats in self._lag.items()}
+        retry_stats = self.service.retry_backlog.get_stats()
+        report.retry = {
+            key: retry_stats[key] for key in ("pending", "scheduled_total", "succeeded_total", "exhausted_total")
+        }
+        report.wall_seconds = round(time.perf_counter() - started, 3)
+        return report
+
+    def _interval_seconds(self) -> float:
+        pacer = self.service.pacer
+        if pacer is not None and pacer.last_decision is not None:
+            return pacer.last_decision.next_interval_seconds
+        return scheduler_config.UPDATE_INTERVAL_MINUTES * 60.0
+
+    def _next_retry(self) -> dict[str, Any] | None:
+        entries = self.service.retry_backlog.get_stats()["entries"]
+        return entries[0] if entries else None
+
+    def _sample_until(self, moment: datetime) -> None:
+        while self._next_sample < moment:
+            self._sample(self._next_sample)
+            self._next_sample += self.sample_step
+
+    def _sample(self, now: datetime) -> None:
+        """Отставание каждой даты окна на момент `now` по текущим watermarks"""
+
+        today = now.astimezone().date()
+
+        for days_ago in range(scheduler_config.LOOKBACK_DAYS):
+            check_date = today - timedelta(days=days_ago)
+            loaded = [
+                self.database.watermarks[(check_date, source)]["loaded_at"]
+                for source in SOURCES
+                if (check_date, source) in self.database.watermarks
+            ]
+            loaded_at = min(loaded) if len(loaded) == len(SOURCES) else None
+
+            unseen = self.model.unseen_since(check_date, loaded_at, now)
+            lag = (now - max(unseen, self.start.astimezone(UTC))).total_seconds() if unseen else 0.0
+
+            bucket = "today" if days_ago == 0 else "recent" if days_ago <= 2 else "old"
+            self._lag[bucket].add(max(lag, 0.0))
@@ -0,0 +1,284 @@
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from src.database.db import Database
+from src.schemas import ConversionRecord, SpendRecord
+from src.services.data_loader import DataLoader
+from src.services.http_extractor import (
+    CONVERSION_ENDPOINT,
+    SPEND_ENDPOINT,
+    ExtractStats,
+    HTTPExtractor,
+    QuotaExceededError,
+)
+from src.services.rate_limiter import RateLimiter
+from src.services.watermarks import CONVERSION_SOURCE, SPEND_SOURCE
+from src.settings.api import api_config
+
+SPEND_KIND = "spend"
+CONVERSION_KIND = "conversion"
+SOURCE_KINDS = (SPEND_KIND, CONVERSION_KIND)
+SOURCE_TYPES = ("file", "http")
+ALL_SOURCES = "all"
+
+SourceRecords = list[SpendRecord] | list[ConversionRecord]
+
+
+@dataclass
+class SourceResult:
+    """Результат загрузки одного источника"""
+
+    source: str
+    kind: str
+    records: SourceRecords
+    seconds: float = 0.0
+    bytes_read: int = 0
+    requests: int = 0
+
+
+class DataSource(ABC):
+    """
+    Источник расходов или конверсий c собственной квотой запросов (`rate_limiter`).
+    """
+
+    def __init__(self, name: str, kind: str, rate_limiter: RateLimiter | None = None) -> None:
+        if kind not in SOURCE_KINDS:
+            raise ValueError(f"Неизвестный тип данных источника {name}: {kind}")
+
+        self.name = name
+        self.kind = kind
+        self.rate_limiter = rate_limiter
+
+    @abstractmethod
+    def extract(self, start_date: date | None = None, end_date: date | None = None) -> SourceResult:
+        """Загрузить записи за период"""
+
+    def stream(
+        self, start_date: date | None = None, end_date: date | None = None, batch_rows: int = 1000
+    ) -> Iterator[list[Any]]:
+        """
+        Строки за период порциями по `batch_rows` (для конвейера): записи или сырые dict,
+        которые проверяет parse(). По умолчанию — результат extract() по частям.
+        """
+
+        records = self.extract(start_date, end_date).records
+        for offset in range(0, len(records), batch_rows):
+            yield records[offset : offset + batch_rows]
+
+    def parse(self, rows: list[Any]) -> SourceRecords:
+        """Валидация порции из stream()"""
+
+        if self.kind == SPEND_KIND:
+            return [row if isinstance(row, SpendRecord) else SpendRecord(**row) for row in rows]
+        return [row if isinstance(row, ConversionRecord) else ConversionRecord(**row) for row in rows]
+
+    def is_cached(self, start_date: date | None = None, end_date: date | None = None) -> bool:
+        """Загрузка за период не обратится к API"""
+
+        return False
+
+
+class FileSource(DataSource):
+    """JSON файл в формате data/; c `rate_limiter` каждое чтение занимает один слот квоты"""
+
+    def __init__(self, name: str, kind: str, path: Path, rate_limiter: RateLimiter | None = None) -> None:
+        super().__init__(name, kind, rate_limiter)
+        self.path = path
+
+    def extract(self, start_date: date | None = None, end_date: date | None = None) -> SourceResult:
+        self._acquire_quota()
+
+        started_at = time.perf_counter()
+        records: SourceRecords
+        if self.kind == SPEND_KIND:
+            records = DataLoader.load_spend_data(self.path)
+        else:
+            records = DataLoader.load_conversion_data(self.path)
+
+        try:
+            bytes_read = self.path.stat().st_size
+        except OSError:
+            bytes_read = 0
+
+        requests = 1 if self.rate_limiter is not None else 0
+        return SourceResult(self.name, self.kind, records, time.perf_counter() - started_at, bytes_read, requests)
+
+    def stream(
+        self, start_date: date | None = None, end_date: date | None = None, batch_rows: int = 1000
+    ) -> Iterator[list[Any]]:
+        """Сырые строки файла порциями: файл читается блоками, без json.load целиком"""
+
+        self._acquire_quota()
+        yield from DataLoader.iter_rows(self.path, batch_rows)
+
+    def _acquire_quota(self) -> None:
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            raise QuotaExceededError(f"{self.name}: квота источника исчерпана")
+
+
+class HTTPSource(DataSource):
+    """Эндпоинт HTTP API через HTTPExtractor; квота — RateLimiter экстрактора"""
+
+    def __init__(self, name: str, kind: str, extractor: HTTPExtractor, endpoint: str | None = None) -> None:
+        super().__init__(name, kind, extractor.rate_limiter)
+        self.extractor = extractor
+        self.endpoint = endpoint or name
+
+    def extract(self, start_date: date | None = None, end_date: date | None = None) -> SourceResult:
+        stats = ExtractStats()
+        started_at = time.perf_counter()
+        records: SourceRecords
+        if self.kind == SPEND_KIND:
+            records = self.extractor.fetch(self.endpoint, SpendRecord, start_date, end_date, stats)
+        else:
+            records = self.extractor.fetch(self.endpoint, ConversionRecord, start_date, end_date, stats)
+
+        return SourceResult(
+            self.name,
+            self.kind,
+            records,
+            time.perf_counter() - started_at,
+            stats.bytes_read,
+            stats.requests,
+        )
+
+    def is_cached(self, start_date: date | None = None, end_date: date | None = None) -> bool:
+        return self.extractor.is_cached(start_date, end_date, endpoints=(self.endpoint,))
+
+
+class SourceRegistry:
+    """
+    Реестр источников расходов и конверсий.
+
+    По умолчанию — fb_spend и network_conv (файлы или HTTP по API_SOURCE).
+    DATA_SOURCES в .env (JSON список) задаёт произвольный набор, например:
+    [{"name": "fb_spend", "kind": "spend", "type": "http", "max_requests": 80},
+     {"name": "tiktok_spend", "kind": "spend", "type": "file", "path": "data/tiktok.json"},
+     {"name": "network_conv", "kind": "conversion", "type": "http"}]
+    """
+
+    def __init__(self, sources: Iterable[DataSource] = ()) -> None:
+        self._sources: dict[str, DataSource] = {}
+        for source in sources:
+            self.register(source)
+
+    def register(self, source: DataSource) -> None:
+        if source.name in self._sources:
+            raise ValueError(f"Источник {source.name} уже зарегистрирован")
+        self._sources[source.name] = source
+
+    @property
+    def sources(self) -> list[DataSource]:
+        return list(self._sources.values())
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._sources)
+
+    def select(self, names: str | Iterable[str]) -> "SourceRegistry":
+        """
+        Реестр из части источников: имена через запятую или список; "all" — все.
+        Неизвестное имя — ValueError.
+        """
+
+        if isinstance(names, str):
+            if names.strip() == ALL_SOURCES:
+                return self
+            names = [name.strip() for name in names.split(",") if name.strip()]
+
+        selected = list(dict.fromkeys(names))
+        unknown = [name for name in selected if name not in self._sources]
+        if unknown:
+            raise ValueError(f"Неизвестные источники: {', '.join(unknown)}")
+        if not selected:
+            raise ValueError("Список источников пуст")
+
+        return SourceRegistry(self._sources[name] for name in selected)
+
+    def by_kind(self, kind: str) -> list[DataSource]:
+        return [source for source in self._sources.values() if source.kind == kind]
+
+    def is_cached(self, start_date: date | None = None, end_date: date | None = None) -> bool:
+        """Каждый источник за период обслуживается из кэша"""
+
+        return bool(self._sources) and all(s.is_cached(start_date, end_date) for s in self._sources.values())
+
+    @classmethod
+    def from_config(
+        cls,
+        database: Database | None = None,
+        extractor: HTTPExtractor | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> "SourceRegistry":
+        """
+        Реестр из настроек. `extractor` используется HTTP источниками без своего base_url;
+        без DATA_SOURCES переданный `extractor` переключает источники по умолчанию на HTTP.
+        `rate_limiter` — общая квота API для источников без собственного max_requests:
+        файл занимает слот на каждое чтение, HTTPExtractor, создаваемый здесь, — на каждый
+        HTTP запрос, включая повторы после 429. Слоты берутся атомарно (try_acquire), поэтому
+        параллельные загрузки не превышают квоту.
+        """
+
+        specs = api_config.DATA_SOURCES or cls._default_specs(
+            http=extractor is not None or api_config.API_SOURCE == "http"
+        )
+        if extractor is None and any(spec.get("type", "file") == "http" for spec in specs):
+            extractor = HTTPExtractor(rate_limiter=rate_limiter)
+
+        return cls(cls._build(spec, database, extractor, rate_limiter) for spec in specs)
+
+    @staticmethod
+    def _default_specs(http: bool) -> list[dict[str, Any]]:
+        if http:
+            return [
+                {"name": SPEND_SOURCE, "kind": SPEND_KIND, "type": "http", "endpoint": SPEND_ENDPOINT},
+                {"name": CONVERSION_SOURCE, "kind": CONVERSION_KIND, "type": "http", "endpoint": CONVERSION_ENDPOINT},
+            ]
+        return [
+            {"name": SPEND_SOURCE, "kind": SPEND_KIND, "type": "file", "path": api_config.fb_spend_path},
+            {"name": CONVERSION_SOURCE, "kind": CONVERSION_KIND, "type": "file", "path": api_config.network_conv_path},
+        ]
+
+    @staticmethod
+    def _build(
+        spec: dict[str, Any],
+        database: Database | None,
+        extractor: HTTPExtractor | None,
+        shared_limiter: RateLimiter | None = None,
+    ) -> DataSource:
+        name = spec["name"]
+        kind = spec["kind"]
+        source_type = spec.get("type", "file")
+        if source_type not in SOURCE_TYPES:
+            raise ValueError(f"Неизвестный вид источника {name}: {source_type}")
+
+        rate_limiter = None
+        if spec.get("max_requests") is not None:
+            rate_limiter = RateLimiter(
+                max_requests=int(spec["max_requests"]),
+                backend=api_config.RATE_LIMIT_BACKEND,
+                database=database,
+                scope=f"source:{name}",
+            )
+
+        if source_type == "file":
+            path = Path(spec.get("path") or api_config.DATA_DIR / f"{name}.json")
+            return FileSource(name, kind, path, rate_limiter or shared_limiter)
+
+        if extractor is None:
+            raise ValueError(f"Для HTTP источника {name} нужен HTTPExtractor")
+        if spec.get("base_url") or rate_limiter is not None:
+            # Свой хост или своя квота: отдельный пул соединений, общий кэш ответов
+            extractor = HTTPExtractor(
+                base_url=spec.get("base_url"),
+                page_size=extractor.page_size,
+                concurrency=extractor.concurrency,
+                rate_limiter=rate_limiter or extractor.rate_limiter,
+                cache=extractor.cache,
+            )
+        return HTTPSource(name, kind, extractor, spec.get("endpoint"))
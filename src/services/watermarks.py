@@ -0,0 +1,154 @@
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from src.database.models import LoadWatermark
+from src.schemas import ConversionRecord, SpendRecord
+from src.settings.scheduler import scheduler_config
+
+SPEND_SOURCE = "fb_spend"
+CONVERSION_SOURCE = "network_conv"
+SOURCES = (SPEND_SOURCE, CONVERSION_SOURCE)
+EMPTY_FINGERPRINT = (0, hashlib.sha256(b"").hexdigest())
+
+
+class WatermarkTracker:
+    """
+    Watermarks загрузки: по каждой дате и источнику — время последней загрузки,
+    число строк и отпечаток входных данных.
+    """
+
+    @staticmethod
+    def fingerprint_by_date(
+        records: Iterable[SpendRecord | ConversionRecord],
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> dict[date, tuple[int, str]]:
+        """
+        Посчитать (row_count, sha256) входных строк источника по каждой дате.
+        """
+
+        lines: dict[date, list[str]] = defaultdict(list)
+
+        for record in records:
+            if start_date and record.date < start_date:
+                continue
+            if end_date and record.date > end_date:
+                continue
+
+            value = record.spend if isinstance(record, SpendRecord) else record.conversions
+            lines[record.date].append(f"{record.campaign_id}|{value}")
+
+        return {
+            record_date: (len(rows), hashlib.sha256("\n".join(sorted(rows)).encode()).hexdigest())
+            for record_date, rows in lines.items()
+        }
+
+    @classmethod
+    def fingerprint_sources(
+        cls,
+        records_by_source: dict[str, Iterable[SpendRecord | ConversionRecord]],
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> dict[str, dict[date, tuple[int, str]]]:
+        """
+        Отпечатки всех источников по каждой дате периода.
+
+        Дата без строк источника получает отпечаток пустого набора, поэтому для каждой пары
+        (дата, источник) есть watermark, и дата без конверсий не остаётся «незагруженной».
+        Без границ периода берётся период от первой до последней даты c данными.
+        """
+
+        fingerprints = {
+            source: cls.fingerprint_by_date(records, start_date, end_date)
+            for source, records in records_by_source.items()
+        }
+        seen = {record_date for by_date in fingerprints.values() for record_date in by_date}
+        if not seen and (start_date is None or end_date is None):
+            return fingerprints
+
+        first = start_date or min(seen)
+        last = end_date or max(seen)
+        for by_date in fingerprints.values():
+            for offset in range((last - first).days + 1):
+                by_date.setdefault(first + timedelta(days=offset), EMPTY_FINGERPRINT)
+
+        return fingerprints
+
+    @staticmethod
+    def build(
+        fingerprints: dict[str, dict[date, tuple[int, str]]],
+        existing: list[LoadWatermark],
+        now: datetime | None = None,
+    ) -> tuple[set[date], list[dict[str, Any]]]:
+        """
+        Сравнить новые отпечатки c сохранёнными.
+
+        Возвращает даты, данные которых изменились (их нужно записать),
+        и строки watermarks для upsert.
+        """
+
+        now = now or datetime.now(UTC)
+        existing_map = {(w.date, w.source): w for w in existing}
+        changed_dates: set[date] = set()
+        watermarks: list[dict[str, Any]] = []
+
+        for source, by_date in fingerprints.items():
+            for record_date, (row_count, fingerprint) in by_date.items():
+                previous = existing_map.get((record_date, source))
+                changed = previous is None or previous.fingerprint != fingerprint
+
+                if changed:
+                    changed_dates.add(record_date)
+
+                watermarks.append(
+                    {
+                        "date": record_date,
+                        "source": source,
+                        "loaded_at": now,
+                        "changed_at": now if changed or previous is None else previous.changed_at,
+                        "row_count": row_count,
+                        "fingerprint": fingerprint,
+                    }
+                )
+
+        return changed_dates, watermarks
+
+    @staticmethod
+    def is_stale(
+        check_date: date,
+        watermarks: list[LoadWatermark],
+        today: date,
+        now: datetime | None = None,
+        sources: Iterable[str] = SOURCES,
+    ) -> bool:
+        """
+        Нужно ли перезагрузить дату.
+
+        Дата устарела, если нет watermark хотя бы одного из `sources` или c последней
+        загрузки прошло больше TTL. TTL зависит от возраста даты; если последняя
+        загрузка обнаружила изменение отпечатка, дата считается «живой» и
+        проверяется c коротким TTL.
+        """
+
+        now = now or datetime.now(UTC)
+        loaded_sources = {w.source for w in watermarks}
+
+        if any(source not in loaded_sources for source in sources):
+            return True
+
+        age_days = (today - check_date).days
+        if age_days <= 0:
+            ttl = timedelta(minutes=scheduler_config.WATERMARK_TTL_TODAY_MINUTES)
+        elif age_days <= 2:
+            ttl = timedelta(hours=scheduler_config.WATERMARK_TTL_RECENT_HOURS)
+        else:
+            ttl = timedelta(hours=scheduler_config.WATERMARK_TTL_OLD_HOURS)
+
+        if any(w.changed_at >= w.loaded_at for w in watermarks):
+            ttl = min(ttl, timedelta(hours=scheduler_config.WATERMARK_TTL_RECENT_HOURS))
+
+        last_loaded = min(w.loaded_at for w in watermarks)
+        return now - last_loaded >= ttl
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from loguru import logger
+
+from src.database.db import Database
+from src.services.coordination import default_worker_id
+from src.services.etl_service import ETLService
+from src.services.http_extractor import QuotaExceededError
+from src.services.instrumentation import ETLResult
+from src.services.job_queue import JobQueue
+from src.services.rate_limiter import RateLimiter
+from src.services.sources import ALL_SOURCES
+from src.settings.scheduler import scheduler_config
+
+
+class QueueWorker:
+    """
+    Воркер очереди ETL задач: забирает задачи из etl_jobs, выполняет их
+    через ETLService и записывает статус, длительность и число строк.
+
+    Задача загружает только свои источники (`sources`, "all" — весь реестр):
+    строки daily_stats за период считаются по ним.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        worker_id: str | None = None,
+        poll_interval: float | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.database = database
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval if poll_interval is not None else scheduler_config.WORKER_POLL_SECONDS
+        self.queue = JobQueue(database)
+        self.rate_limiter = rate_limiter or RateLimiter(database=database)
+        # Квоту расходуют источники: по слоту на чтение файла или HTTP запрос
+        self.etl_service = ETLService(database=database, rate_limiter=self.rate_limiter)
+        self._services: dict[str, ETLService] = {ALL_SOURCES: self.etl_service}
+        self._stop = threading.Event()
+
+        self.jobs_done = 0
+        self.jobs_failed = 0
+
+    def run_once(self) -> bool:
+        """
+        Выполнить одну задачу. Возвращает False, если задачу взять не удалось.
+        """
+
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+
+        try:
+            etl_service = self._service_for(job.sources)
+        except ValueError as e:
+            self.queue.fail(job.id, str(e), 0.0)
+            self.jobs_failed += 1
+            logger.error(f"❌ Задача #{job.id}: {e}")
+            return True
+
+        if not etl_service.is_cached(job.start_date, job.end_date) and not self.rate_limiter.can_make_request():
+            self.queue.release(job.id)
+            logger.warning(f"⚠️ Лимит API исчерпан, задача #{job.id} возвращена в очередь")
+            return False
+
+        logger.info(f"📥 [{self.worker_id}] Задача #{job.id}: {job.start_date} — {job.end_date} ({job.sources})")
+        started_at = time.monotonic()
+
+        try:
+            results = etl_service.run(start_date=job.start_date, end_date=job.end_date)
+        except QuotaExceededError as e:
+            self.queue.release(job.id)
+            logger.warning(f"⚠️ Задача #{job.id} возвращена в очередь: {e}")
+            return False
+        except Exception as e:
+            self.queue.fail(job.id, str(e), time.monotonic() - started_at)
+            self.jobs_failed += 1
+            logger.error(f"❌ Задача #{job.id} завершилась ошибкой: {e}")
+            return True
+
+        duration = time.monotonic() - started_at
+        rows = results.rows_written if isinstance(results, ETLResult) else len(results)
+        self.queue.complete(job.id, rows=rows, duration_seconds=duration)
+        self.jobs_done += 1
+        logger.info(f"✅ Задача #{job.id}: записей {len(results)}, записано в БД {rows} за {duration:.2f} c")
+        if isinstance(results, ETLResult):
+            logger.bind(etl_report=True).info(results.report.to_json())
+        return True
+
+    def _service_for(self, sources: str) -> ETLService:
+        """ETLService c реестром из источников задачи (создаётся один раз на набор)"""
+
+        if sources not in self._services:
+            registry = self.etl_service.registry.select(sources)
+            self._services[sources] = ETLService(database=self.database, registry=registry)
+        return self._services[sources]
+
+    def run_forever(self) -> None:
+        """Основной цикл: брать задачи, пока не вызван stop()"""
+
+        logger.info(f"👷 Воркер {self.worker_id} запущен")
+
+        while not self._stop.is_set():
+            requeued = self.queue.requeue_stale(scheduler_config.JOB_TIMEOUT_SECONDS * 2)
+            if requeued:
+                logger.warning(f"♻️ Возвращено в очередь зависших задач: {requeued}")
+
+            if not self.run_once():
+                self._stop.wait(self.poll_interval)
+
+        logger.info(f"✅ Воркер {self.worker_id} остановлен (выполнено: {self.jobs_done}, ошибок: {self.jobs_failed})")
+
+    def stop(self) -> None:
+        """Остановить цикл после текущей задачи"""
+
+        self._stop.set()
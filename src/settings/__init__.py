@@ -1,5 +1,8 @@
 from .api import api_config
 from .database import db_config
+from .etl import etl_config
+from .log import log_config
+from .report import report_config
 from .scheduler import scheduler_config
 
-__all__ = ["api_config", "db_config", "scheduler_config"]
+__all__ = ["api_config", "db_config", "etl_config", "log_config", "report_config", "scheduler_config"]
@@ -1,19 +1,41 @@
 from pathlib import Path
+from typing import Any
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field
 
+from src.settings.base import EnvSettings
 
-class APIConfig(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
+class APIConfig(EnvSettings):
     DATA_DIR: Path = Path(__file__).parent.parent.parent / "data"
     FB_SPEND_FILE: str = "fb_spend.json"
     NETWORK_CONV_FILE: str = "network_conv.json"
 
+    API_SOURCE: str = "file"
+    DATA_SOURCES: list[dict[str, Any]] = Field(default_factory=list)
+    API_BASE_URL: str = "http://127.0.0.1:8081"
+    API_PAGE_SIZE: int = 1_000
+    API_CONCURRENCY: int = 4
+    API_TIMEOUT_SECONDS: float = 30.0
+    API_MAX_THROTTLE_RETRIES: int = 5
+
+    API_CACHE_ENABLED: bool = False
+    API_CACHE_DIR: Path = Path(__file__).parent.parent.parent / ".cache" / "api"
+    API_CACHE_MAX_MB: int = 256
+    API_CACHE_TTL_TODAY_MINUTES: int = 15
+    API_CACHE_TTL_RECENT_HOURS: int = 6
+    API_CACHE_IMMUTABLE_AFTER_DAYS: int = 3
+    API_CACHE_INDEX_FLUSH_SECONDS: int = 60
+
     API_DAILY_LIMIT: int = 100
     API_SAFETY_MARGIN: float = 0.2
     API_MAX_REQUESTS_PER_DAY: int = int(API_DAILY_LIMIT * (1 - API_SAFETY_MARGIN))
 
+    RATE_LIMIT_MODE: str = "sliding_window"
+    RATE_LIMIT_BURST: int = 4
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SCOPE: str = "default"
+
     @property
     def fb_spend_path(self) -> Path:
         return self.DATA_DIR / self.FB_SPEND_FILE
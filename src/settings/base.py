@@ -0,0 +1,47 @@
+from collections.abc import Mapping
+from functools import cache
+
+from dotenv import dotenv_values
+from pydantic_settings import BaseSettings, EnvSettingsSource, PydanticBaseSettingsSource, SettingsConfigDict
+
+ENV_FILE = ".env"
+
+
+@cache
+def load_env_file(path: str = ENV_FILE) -> Mapping[str, str]:
+    """
+    Прочитать .env один раз на процесс. Окружение процесса не меняется:
+    значения отдаются конфигам через EnvFileSettingsSource.
+    """
+
+    return {key: value for key, value in dotenv_values(path, encoding="utf-8").items() if value is not None}
+
+
+class EnvFileSettingsSource(EnvSettingsSource):
+    """Переменные из .env (load_env_file) c теми же правилами разбора, что и окружение"""
+
+    def _load_env_vars(self) -> Mapping[str, str | None]:
+        values = load_env_file()
+        if self.case_sensitive:
+            return values
+        return {key.lower(): value for key, value in values.items()}
+
+
+class EnvSettings(BaseSettings):
+    """
+    База конфигов: .env читается один раз (load_env_file) и общий для всех
+    конфигов; переменные окружения важнее файла.
+    """
+
+    model_config = SettingsConfigDict(extra="ignore")
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return init_settings, env_settings, EnvFileSettingsSource(settings_cls), file_secret_settings
@@ -1,9 +1,7 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from src.settings.base import EnvSettings
 
 
-class DatabaseConfig(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
-
+class DatabaseConfig(EnvSettings):
     POSTGRES_DB: str = "salesbrush_test"
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
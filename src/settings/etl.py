@@ -0,0 +1,21 @@
+from src.settings.base import EnvSettings
+
+
+class ETLConfig(EnvSettings):
+    WRITER_QUEUE_SIZE: int = 10_000
+    WRITER_FLUSH_ROWS: int = 1_000
+    WRITER_FLUSH_INTERVAL_SECONDS: float = 2.0
+    WRITER_PUT_TIMEOUT_SECONDS: float = 30.0
+
+    PIPELINE_CHUNK_ROWS: int = 5_000
+    PIPELINE_QUEUE_SIZE: int = 4
+
+    BACKFILL_CHUNK: str = "week"
+    BACKFILL_WORKERS: int = 2
+
+    MERGE_DUPLICATES: str = "sum"
+
+    EXPORT_PARQUET_ROW_GROUP_ROWS: int = 100_000
+
+
+etl_config = ETLConfig()
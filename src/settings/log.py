@@ -0,0 +1,11 @@
+from src.settings.base import EnvSettings
+
+
+class LogConfig(EnvSettings):
+    LOG_LEVEL: str = "DEBUG"
+    LOG_FORMAT: str = "text"
+    LOG_ENQUEUE: bool = False
+    LOG_SAMPLE_PER_MINUTE: int = 0
+
+
+log_config = LogConfig()
@@ -0,0 +1,12 @@
+from src.settings.base import EnvSettings
+
+
+class ReportConfig(EnvSettings):
+    REPORT_HOST: str = "127.0.0.1"
+    REPORT_PORT: int = 8082
+    REPORT_CACHE_ENTRIES: int = 256
+    REPORT_CACHE_MAX_BODY_KB: int = 1024
+    REPORT_TOP_MAX: int = 1000
+
+
+report_config = ReportConfig()
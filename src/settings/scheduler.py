@@ -1,15 +1,40 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from src.settings.base import EnvSettings
 
 
-class SchedulerConfig(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
-
+class SchedulerConfig(EnvSettings):
     UPDATE_INTERVAL_MINUTES: int = 30
 
+    ADAPTIVE_SCHEDULING: bool = False
+    MIN_INTERVAL_MINUTES: int = 5
+    MAX_INTERVAL_MINUTES: int = 120
+
     MAX_UPDATES_PER_DAY: int = 80
 
+    MAX_RANGE_DAYS: int = 7
+
+    LOOKBACK_DAYS: int = 7
+    WATERMARK_TTL_TODAY_MINUTES: int = 30
+    WATERMARK_TTL_RECENT_HOURS: int = 6
+    WATERMARK_TTL_OLD_HOURS: int = 24
+
+    ETL_WORKERS: int = 1
+    JOB_TIMEOUT_SECONDS: int = 300
+
+    COORDINATION_MODE: str = "none"
+    WORKER_ID: str = ""
+    LEADER_LOCK_KEY: int = 724_001
+    CLAIM_LEASE_SECONDS: int = 600
+
+    USE_JOB_QUEUE: bool = False
+    WORKER_POLL_SECONDS: float = 5.0
+
     MAX_RETRIES: int = 3
     RETRY_DELAY_SECONDS: int = 60
+    RETRY_MAX_DELAY_SECONDS: int = 3600
+    RETRY_JITTER: float = 0.2
+
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 0
 
 
 scheduler_config = SchedulerConfig()
@@ -0,0 +1,196 @@
+import json
+import platform
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, TypeVar
+
+from loguru import logger
+from sqlalchemy import delete
+
+from src.database.db import Database
+from src.database.models import DailyStats
+from src.services.calculator import CPACalculator
+from src.services.data_loader import DataLoader
+from src.utils.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+BENCH_CAMPAIGN_PREFIX = "BENCH-"
+DEFAULT_THRESHOLD = 0.2
+
+T = TypeVar("T")
+
+
+@dataclass
+class BenchmarkResult:
+    """Результат одного кейса: лучшее время из повторов"""
+
+    case: str
+    size: int
+    rows: int
+    seconds: float
+    rows_per_second: float
+
+
+class BenchmarkRunner:
+    """
+    Бенчмарк горячих путей ETL на синтетических данных: load, merge, filter, upsert.
+
+    Для каждого размера генерируются файлы (SyntheticDataGenerator), каждый кейс
+    повторяется `repeat` раз, в отчёт идёт лучшее время. Upsert выполняется только
+    c `database`, в daily_stats под кампаниями BENCH-*, которые удаляются после прогона.
+    """
+
+    def __init__(
+        self,
+        sizes: list[int],
+        repeat: int = 3,
+        database: Database | None = None,
+        days: int = 30,
+        upsert_chunk: int = 5_000,
+        seed: int = 42,
+        work_dir: Path | None = None,
+    ) -> None:
+        self.sizes = sizes
+        self.repeat = max(repeat, 1)
+        self.database = database
+        self.days = days
+        self.upsert_chunk = max(upsert_chunk, 1)
+        self.seed = seed
+        self.work_dir = work_dir
+
+    def run(self) -> dict[str, Any]:
+        """
+        Прогнать все размеры. Возвращает отчёт c метаданными окружения и результатами.
+        """
+
+        results: list[BenchmarkResult] = []
+
+        with tempfile.TemporaryDirectory(prefix="etl-bench-") as tmp:
+            base_dir = self.work_dir or Path(tmp)
+            for rows in self.sizes:
+                results.extend(self._run_size(rows, base_dir / f"rows-{rows}"))
+
+        return {
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": self.repeat,
+                "database": self.database is not None,
+            },
+            "results": [asdict(result) for result in results],
+        }
+
+    def _run_size(self, rows: int, output_dir: Path) -> list[BenchmarkResult]:
+        config = SyntheticConfig(rows=rows, days=self.days, seed=self.seed, campaign_prefix=BENCH_CAMPAIGN_PREFIX)
+        files = SyntheticDataGenerator(config).generate(output_dir)
+        input_rows = files.spend_rows + files.conversion_rows
+        logger.info(f"🧪 Бенчмарк {rows} строк: spend {files.spend_rows}, conversions {files.conversion_rows}")
+
+        results = []
+
+        seconds, (spend, conversions) = self._measure(
+            lambda: (
+                DataLoader.load_spend_data(files.spend_path),
+                DataLoader.load_conversion_data(files.conversion_path),
+            )
+        )
+        results.append(self._result("load", rows, input_rows, seconds))
+
+        seconds, merged = self._measure(lambda: CPACalculator.merge_data(spend, conversions))
+        results.append(self._result("merge", rows, input_rows, seconds))
+
+        filter_start = files.start_date + timedelta(days=self.days // 4)
+        filter_end = files.end_date - timedelta(days=self.days // 4)
+        seconds, _ = self._measure(lambda: CPACalculator.filter_by_date_range(merged, filter_start, filter_end))
+        results.append(self._result("filter", rows, len(merged), seconds))
+
+        if self.database is not None:
+            stats_list = [record.model_dump() for record in merged]
+            try:
+                seconds, _ = self._measure(lambda: self._upsert(stats_list))
+                results.append(self._result("upsert", rows, len(stats_list), seconds))
+            finally:
+                self._cleanup()
+
+        return results
+
+    def _measure(self, func: Callable[[], T]) -> tuple[float, T]:
+        best = float("inf")
+        value: T | None = None
+
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            value = func()
+            best = min(best, time.perf_counter() - started)
+
+        return best, value  # type: ignore[return-value]
+
+    def _upsert(self, stats_list: list[dict[str, Any]]) -> None:
+        assert self.database is not None
+        for offset in range(0, len(stats_list), self.upsert_chunk):
+            self.database.bulk_upsert_stats(stats_list[offset : offset + self.upsert_chunk])
+
+    def _cleanup(self) -> None:
+        assert self.database is not None
+        with self.database.get_session() as session:
+            session.execute(delete(DailyStats).where(DailyStats.campaign_id.startswith(BENCH_CAMPAIGN_PREFIX)))
+
+    @staticmethod
+    def _result(case: str, size: int, rows: int, seconds: float) -> BenchmarkResult:
+        return BenchmarkResult(
+            case=case,
+            size=size,
+            rows=rows,
+            seconds=round(seconds, 6),
+            rows_per_second=round(rows / seconds, 1) if seconds > 0 else 0.0,
+        )
+
+
+def save_report(report: dict[str, Any], path: Path) -> None:
+    """Сохранить отчёт бенчмарка в JSON"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_report(path: Path) -> dict[str, Any]:
+    """Прочитать отчёт бенчмарка из JSON"""
+
+    report: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    return report
+
+
+def compare_reports(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """
+    Сравнить c baseline. Регрессия — кейс (case, size), ставший медленнее больше чем на `threshold`.
+    """
+
+    baseline_by_key = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in current.get("results", []):
+        previous = baseline_by_key.get((result["case"], result["size"]))
+        if previous is None or previous["seconds"] <= 0:
+            continue
+
+        ratio = result["seconds"] / previous["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "case": result["case"],
+                    "size": result["size"],
+                    "baseline_seconds": previous["seconds"],
+                    "seconds": result["seconds"],
+                    "ratio": round(ratio, 3),
+                }
+            )
+
+    return regressions
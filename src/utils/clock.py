@@ -0,0 +1,64 @@
+import time
+from datetime import UTC, date, datetime, timedelta, tzinfo
+from typing import Protocol
+
+
+class Clock(Protocol):
+    """Источник времени: монотонные часы, настенное время и текущая дата"""
+
+    def monotonic(self) -> float: ...
+
+    def now(self, tz: tzinfo | None = None) -> datetime: ...
+
+    def today(self) -> date: ...
+
+
+class SystemClock:
+    """Реальное время процесса"""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self, tz: tzinfo | None = None) -> datetime:
+        return datetime.now(tz)
+
+    def today(self) -> date:
+        return date.today()
+
+
+class VirtualClock:
+    """
+    Виртуальное время для симуляции: стоит на месте до вызова advance().
+
+    `now()` ведёт себя как `datetime.now()`: без tz — локальное naive время,
+    c tz — aware в указанной зоне.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        self._wall = start if start.tzinfo is not None else start.astimezone()
+        self._monotonic = 0.0
+
+    def monotonic(self) -> float:
+        return self._monotonic
+
+    def now(self, tz: tzinfo | None = None) -> datetime:
+        if tz is None:
+            return self._wall.astimezone().replace(tzinfo=None)
+        return self._wall.astimezone(tz)
+
+    def today(self) -> date:
+        return self.now().date()
+
+    def advance(self, seconds: float) -> None:
+        """Сдвинуть время вперёд"""
+
+        if seconds < 0:
+            raise ValueError("Виртуальное время не идёт назад")
+        self._wall += timedelta(seconds=seconds)
+        self._monotonic += seconds
+
+    def advance_to(self, moment: datetime) -> None:
+        """Сдвинуть время до `moment` (naive — локальное время)"""
+
+        target = moment if moment.tzinfo is not None else moment.astimezone()
+        self.advance((target.astimezone(UTC) - self._wall.astimezone(UTC)).total_seconds())
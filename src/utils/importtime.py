@@ -0,0 +1,68 @@
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+HEAVY_MODULES = ("sqlalchemy", "apscheduler", "psycopg2", "pydantic_settings")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportTiming:
+    """Строка вывода `python -X importtime`: время в микросекундах"""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Разобрать stderr `python -X importtime`"""
+
+    timings = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        timings.append(ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings
+
+
+def measure_imports(args: list[str]) -> list[ImportTiming]:
+    """
+    Запустить интерпретатор c `-X importtime` и вернуть импорты. Пример: ["run.py", "--help"].
+    """
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def heavy_imports(timings: list[ImportTiming], heavy: tuple[str, ...] = HEAVY_MODULES) -> list[str]:
+    """Верхнеуровневые тяжёлые пакеты среди импортов"""
+
+    return sorted({t.module for t in timings if t.module in heavy})
+
+
+def main(args: list[str]) -> None:
+    timings = measure_imports(args or ["run.py", "--help"])
+    total_ms = sum(t.self_us for t in timings) / 1000
+
+    print(f"Импортов: {len(timings)}, всего {total_ms:.1f} мс")
+    print(f"Тяжёлые пакеты: {', '.join(heavy_imports(timings)) or 'нет'}")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:20]:
+        print(f"{timing.cumulative_us / 1000:9.1f} мс  {'  ' * timing.depth}{timing.module}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,24 +1,173 @@
+import json
+import os
 import sys
+import threading
+import time
+import traceback
+import zipfile
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO, cast
 
 from loguru import logger
 
+if TYPE_CHECKING:
+    from loguru import Record
 
-def setup_logger(log_file: str = "etl.log", level: str = "DEBUG") -> None:
+LOG_FORMATS = ("text", "json")
+
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>"
+)
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}"
+
+WARNING_LEVEL_NO = 30
+
+
+class LogSampler:
+    """
+    Фильтр loguru: не больше `per_minute` записей DEBUG/INFO в минуту c одной строки кода
+    (например, «загружено за <дату>» в цикле по датам). WARNING и выше проходят всегда.
+
+    Число подавленных записей дописывается к первой пропущенной записи следующего окна.
+    Решение принимается один раз на запись и общее для всех sink.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.per_minute = per_minute
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._windows: dict[tuple[str, int], list[float]] = {}
+        self.suppressed_total = 0
+
+    def __call__(self, record: "Record") -> bool:
+        if self.per_minute <= 0 or record["level"].no >= WARNING_LEVEL_NO:
+            return True
+
+        raw = cast(dict[str, Any], record)
+        decision = raw.get("_sampled")
+        if decision is None:
+            decision = raw["_sampled"] = self._decide(record)
+        return bool(decision)
+
+    def _decide(self, record: "Record") -> bool:
+        key = (record["file"].path, record["line"])
+        now = self._clock()
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.WINDOW_SECONDS:
+                suppressed = int(window[2]) if window is not None else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record["extra"]["suppressed"] = suppressed
+                    record["message"] += f" (подавлено похожих: {suppressed})"
+
+            if window[1] >= self.per_minute:
+                window[2] += 1
+                self.suppressed_total += 1
+                return False
+
+            window[1] += 1
+            return True
+
+
+def json_format(record: "Record") -> str:
+    """
+    Формат sink для LOG_FORMAT=json: одна JSON строка на запись.
+    Отчёт ETL (extra.etl_report) кладётся объектом в поле `report`.
+    """
+
+    extra = {key: value for key, value in record["extra"].items() if not key.startswith("_")}
+    payload: dict[str, Any] = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+
+    if extra.pop("etl_report", False):
+        try:
+            payload["report"] = json.loads(record["message"])
+            payload["message"] = "etl_report"
+        except ValueError:
+            pass
+
+    if extra:
+        payload["extra"] = extra
+
+    exception = record["exception"]
+    if exception is not None:
+        payload["exception"] = "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+
+    record["extra"]["_json"] = json.dumps(payload, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+def compress_in_background(path: str) -> None:
+    """
+    Сжатие ротированного файла в отдельном потоке: ротация не ждёт zip.
+    """
+
+    threading.Thread(target=_zip_and_remove, args=(path,), name="log-compress").start()
+
+
+def _zip_and_remove(path: str) -> None:
+    try:
+        with zipfile.ZipFile(f"{path}.zip", "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(path, arcname=Path(path).name)
+        os.remove(path)
+    except OSError as e:
+        sys.stderr.write(f"⚠️ Ошибка сжатия лога {path}: {e}\n")
+
+
+def setup_logger(
+    log_file: str = "etl.log",
+    level: str | None = None,
+    log_format: str | None = None,
+    enqueue: bool | None = None,
+    sample_per_minute: int | None = None,
+    stream: TextIO | None = None,
+) -> None:
     """
     Настройка логирования c помощью loguru.
+
+    Параметры по умолчанию берутся из LogConfig (LOG_*):
+    - log_format: text (цветной stdout + текстовый файл) или json (одна JSON строка на запись)
+    - enqueue: запись в sink из фонового потока — ETL не ждёт stdout, диск и ротацию
+    - sample_per_minute: ограничение частых DEBUG/INFO сообщений (см. LogSampler)
+    - stream: консольный sink (по умолчанию stdout; stderr, когда stdout занят данными)
+
+    Ротированные файлы сжимаются в фоне.
     """
 
+    from src.settings.log import log_config
+
+    level = level or log_config.LOG_LEVEL
+    log_format = log_format or log_config.LOG_FORMAT
+    enqueue = log_config.LOG_ENQUEUE if enqueue is None else enqueue
+    sample_per_minute = log_config.LOG_SAMPLE_PER_MINUTE if sample_per_minute is None else sample_per_minute
+
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Неизвестный формат логов: {log_format}")
+
+    sampler = LogSampler(sample_per_minute) if sample_per_minute > 0 else None
+    is_json = log_format == "json"
+
     logger.remove()
 
     logger.add(
-        sys.stdout,
-        colorize=True,
-        format=(
-            "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
-            "<cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>"
-        ),
+        stream or sys.stdout,
+        colorize=not is_json,
+        format=json_format if is_json else CONSOLE_FORMAT,
         level=level,
+        filter=sampler,
+        enqueue=enqueue,
     )
 
     log_path = Path(__file__).parent.parent.parent / "logs" / log_file
@@ -28,10 +177,9 @@ def setup_logger(log_file: str = "etl.log", level: str = "DEBUG") -> None:
         log_path,
         rotation="10 MB",
         retention="30 days",
-        compression="zip",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
+        compression=compress_in_background,
+        format=json_format if is_json else FILE_FORMAT,
         level=level,
+        filter=sampler,
+        enqueue=enqueue,
     )
-
-
-__all__ = ["logger", "setup_logger"]
@@ -0,0 +1,195 @@
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from loguru import logger
+
+from src.services.http_extractor import CONVERSION_ENDPOINT, NDJSON_CONTENT_TYPE, SPEND_ENDPOINT, TOTAL_PAGES_HEADER
+
+ROWS_PER_CHUNK = 500
+
+
+@dataclass
+class MockAPIStats:
+    """Что видел сервер: запросы, ответы 429 и TCP соединения"""
+
+    requests: int = 0
+    throttled: int = 0
+    connections: int = 0
+    rows_sent: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class _Dataset:
+    """Строки одного эндпоинта, отсортированные по дате и заранее сериализованные в NDJSON"""
+
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        rows = sorted(rows, key=lambda row: (str(row["date"]), str(row["campaign_id"])))
+        self.dates = [str(row["date"]) for row in rows]
+        self.lines = [(json.dumps(row, default=str, separators=(",", ":")) + "\n").encode("utf-8") for row in rows]
+
+    def select(self, start_date: str | None, end_date: str | None) -> tuple[int, int]:
+        lo = bisect.bisect_left(self.dates, start_date) if start_date else 0
+        hi = bisect.bisect_right(self.dates, end_date) if end_date else len(self.dates)
+        return lo, max(hi, lo)
+
+
+class MockAPIServer:
+    """
+    Локальная замена API рекламных платформ для HTTPExtractor.
+
+    GET /fb_spend и /network_conv: параметры start_date, end_date, page, page_size;
+    ответ — NDJSON c chunked передачей, число страниц в заголовке X-Total-Pages.
+
+    - latency_ms: задержка перед каждым ответом
+    - max_page_size: верхняя граница page_size
+    - max_rps: больше запросов за последнюю секунду — ответ 429 c Retry-After
+      (в секундах, дробное значение); 0 — без ограничения
+    """
+
+    def __init__(
+        self,
+        spend_rows: list[dict[str, Any]],
+        conversion_rows: list[dict[str, Any]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        max_page_size: int = 1_000,
+        max_rps: int = 0,
+    ) -> None:
+        self.datasets = {SPEND_ENDPOINT: _Dataset(spend_rows), CONVERSION_ENDPOINT: _Dataset(conversion_rows)}
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.max_page_size = max(max_page_size, 1)
+        self.max_rps = max_rps
+        self.stats = MockAPIStats()
+
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_files(cls, spend_path: Path, conversion_path: Path, **kwargs: Any) -> "MockAPIServer":
+        """Сервер поверх файлов в формате data/ (например, из run.py generate)"""
+
+        with open(spend_path, encoding="utf-8") as f:
+            spend_rows = json.load(f)
+        with open(conversion_path, encoding="utf-8") as f:
+            conversion_rows = json.load(f)
+        return cls(spend_rows, conversion_rows, **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Запуск сервера в фоновом потоке (port=0 — свободный порт, см. self.port после старта)"""
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                api._count(connections=1)
+
+            def do_GET(self) -> None:
+                api._handle(self)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 Mock API доступен на {self.base_url}")
+
+    def stop(self) -> None:
+        """Остановка сервера"""
+
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlsplit(handler.path)
+        dataset = self.datasets.get(url.path.strip("/"))
+        if dataset is None:
+            handler.send_error(404)
+            return
+
+        self._count(requests=1)
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+        retry_after = self._throttle()
+        if retry_after is not None:
+            self._count(throttled=1)
+            handler.send_response(429)
+            handler.send_header("Retry-After", f"{retry_after:.3f}")
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            page = max(int(query.get("page", 1)), 1)
+            page_size = min(max(int(query.get("page_size", self.max_page_size)), 1), self.max_page_size)
+        except ValueError:
+            handler.send_error(400, "page и page_size должны быть числами")
+            return
+
+        lo, hi = dataset.select(query.get("start_date"), query.get("end_date"))
+        total_pages = max((hi - lo + page_size - 1) // page_size, 1)
+        first = lo + (page - 1) * page_size
+        lines = dataset.lines[first : min(first + page_size, hi)]
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", NDJSON_CONTENT_TYPE)
+        handler.send_header(TOTAL_PAGES_HEADER, str(total_pages))
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        for i in range(0, len(lines), ROWS_PER_CHUNK):
+            body = b"".join(lines[i : i + ROWS_PER_CHUNK])
+            handler.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+        handler.wfile.write(b"0\r\n\r\n")
+        self._count(rows_sent=len(lines))
+
+    def _throttle(self) -> float | None:
+        """Секунды до освобождения слота, если лимит max_rps превышен"""
+
+        if self.max_rps <= 0:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_rps:
+                return 1.0 - (now - self._recent[0])
+            self._recent.append(now)
+        return None
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                setattr(self.stats, key, getattr(self.stats, key) + value)
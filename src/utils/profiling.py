@@ -0,0 +1,178 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from types import FrameType, TracebackType
+from typing import Any
+
+from loguru import logger
+
+PROFILE_MODES = ("cpu", "sampling", "memory")
+
+
+def parse_profile_modes(value: str) -> set[str]:
+    """
+    Разбор списка режимов профилирования: "cpu,memory", "all".
+    """
+
+    modes = {mode.strip().lower() for mode in value.split(",") if mode.strip()}
+    if "all" in modes:
+        return set(PROFILE_MODES)
+
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Неизвестные режимы профилирования: {', '.join(sorted(unknown))}")
+
+    return modes
+
+
+class StackSampler:
+    """
+    Сэмплирующий профайлер: c заданным интервалом снимает стек целевого потока
+    и копит счётчики в формате collapsed stacks (flamegraph.pl, speedscope).
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None) -> None:
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_collapsed(self, path: Path) -> None:
+        """Записать стеки: одна строка `frame;frame;frame count` на уникальный стек"""
+
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class ProfileSession:
+    """
+    Сессия профилирования запуска ETL.
+
+    - cpu: cProfile по каждой стадии ETL → `<stage>.prof` и `<stage>.txt`
+    - sampling: сэмплирующий профайлер всего запуска → `stacks.collapsed`
+    - memory: tracemalloc → пиковые аллокации по стадиям и `memory_top.txt`
+
+    Итоги по стадиям пишутся в `summary.json`.
+    """
+
+    TOP_LINES = 30
+
+    def __init__(self, output_dir: Path, modes: set[str], sample_interval: float = 0.005) -> None:
+        self.output_dir = output_dir / datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.modes = modes
+        self.sampler = StackSampler(sample_interval) if "sampling" in modes else None
+        self.stages: list[dict[str, Any]] = []
+        self._memory_peak = 0
+
+    def __enter__(self) -> "ProfileSession":
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if "memory" in self.modes:
+            tracemalloc.start(25)
+        if self.sampler is not None:
+            self.sampler.start()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        summary: dict[str, Any] = {"modes": sorted(self.modes), "stages": self.stages}
+
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.write_collapsed(self.output_dir / "stacks.collapsed")
+            summary["samples"] = self.sampler.samples
+
+        if "memory" in self.modes:
+            snapshot = tracemalloc.take_snapshot()
+            self._memory_peak = max(self._memory_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            summary["memory_peak_kb"] = round(self._memory_peak / 1024, 1)
+            with open(self.output_dir / "memory_top.txt", "w", encoding="utf-8") as f:
+                for stat in snapshot.statistics("lineno")[: self.TOP_LINES]:
+                    f.write(f"{stat}\n")
+
+        with open(self.output_dir / "summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"🔬 Профили сохранены в {self.output_dir}")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Хук стадии для RunReport: отдельный cProfile и пик памяти на стадию.
+        """
+
+        profiler = cProfile.Profile() if "cpu" in self.modes else None
+        record: dict[str, Any] = {"stage": name}
+
+        if "memory" in self.modes:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._dump_profile(profiler, name)
+                record["profile"] = f"{name}.prof"
+            if "memory" in self.modes:
+                current, peak = tracemalloc.get_traced_memory()
+                self._memory_peak = max(self._memory_peak, peak)
+                record["memory_delta_kb"] = round((current - memory_before) / 1024, 1)
+                record["memory_peak_kb"] = round((peak - memory_before) / 1024, 1)
+            self.stages.append(record)
+
+    def _dump_profile(self, profiler: cProfile.Profile, name: str) -> None:
+        profiler.dump_stats(self.output_dir / f"{name}.prof")
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(self.TOP_LINES)
+        (self.output_dir / f"{name}.txt").write_text(stream.getvalue(), encoding="utf-8")
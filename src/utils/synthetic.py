@@ -0,0 +1,135 @@
+import json
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, TextIO
+
+CAMPAIGN_PREFIX = "SYN-"
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    Параметры синтетических данных.
+
+    - rows: примерное число ключей (date, campaign_id) до дублей
+    - overlap: доля ключей, которые есть в обоих файлах; остальные делятся
+      поровну между «только расходы» и «только конверсии»
+    - skew: показатель Zipf для объёма кампаний (0 — равномерно)
+    - duplicates: доля строк, которые повторяются c другим значением
+    """
+
+    rows: int = 10_000
+    days: int = 30
+    start_date: date = date(2025, 1, 1)
+    overlap: float = 0.8
+    skew: float = 1.1
+    duplicates: float = 0.0
+    seed: int = 42
+    campaign_prefix: str = CAMPAIGN_PREFIX
+
+    @property
+    def campaigns(self) -> int:
+        return max(math.ceil(self.rows / max(self.days, 1)), 1)
+
+
+@dataclass
+class SyntheticFiles:
+    """Сгенерированные файлы и фактическое число строк"""
+
+    spend_path: Path
+    conversion_path: Path
+    spend_rows: int
+    conversion_rows: int
+    start_date: date
+    end_date: date
+
+
+class SyntheticDataGenerator:
+    """
+    Детерминированный генератор файлов fb_spend / network_conv того же формата, что и в data/.
+
+    Файлы пишутся потоково, поэтому объём ограничен диском, не памятью.
+    """
+
+    def __init__(self, config: SyntheticConfig) -> None:
+        self.config = config
+
+    def generate(self, output_dir: Path) -> SyntheticFiles:
+        """
+        Записать `fb_spend.json` и `network_conv.json` в `output_dir`.
+        """
+
+        config = self.config
+        rng = random.Random(config.seed)
+        weights = [1 / (rank + 1) ** config.skew for rank in range(config.campaigns)]
+        scale = config.campaigns / sum(weights)
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        spend_path = output_dir / "fb_spend.json"
+        conversion_path = output_dir / "network_conv.json"
+        spend_rows = conversion_rows = 0
+
+        with (
+            open(spend_path, "w", encoding="utf-8") as spend_file,
+            open(conversion_path, "w", encoding="utf-8") as conversion_file,
+        ):
+            spend_writer = _JsonArrayWriter(spend_file)
+            conversion_writer = _JsonArrayWriter(conversion_file)
+
+            for day in range(config.days):
+                record_date = (config.start_date + timedelta(days=day)).isoformat()
+
+                for rank, weight in enumerate(weights):
+                    campaign_id = f"{config.campaign_prefix}{rank:07d}"
+                    volume = weight * scale
+                    roll = rng.random()
+                    has_spend = roll < config.overlap + (1 - config.overlap) / 2
+                    has_conversions = roll < config.overlap or not has_spend
+
+                    if has_spend:
+                        for _ in range(self._copies(rng)):
+                            spend = round(rng.lognormvariate(math.log(50 * volume + 1), 0.6), 2)
+                            spend_writer.write({"date": record_date, "campaign_id": campaign_id, "spend": spend})
+                            spend_rows += 1
+
+                    if has_conversions:
+                        for _ in range(self._copies(rng)):
+                            conversions = int(rng.expovariate(1 / (5 * volume + 0.5)))
+                            conversion_writer.write(
+                                {"date": record_date, "campaign_id": campaign_id, "conversions": conversions}
+                            )
+                            conversion_rows += 1
+
+            spend_writer.close()
+            conversion_writer.close()
+
+        return SyntheticFiles(
+            spend_path=spend_path,
+            conversion_path=conversion_path,
+            spend_rows=spend_rows,
+            conversion_rows=conversion_rows,
+            start_date=config.start_date,
+            end_date=config.start_date + timedelta(days=config.days - 1),
+        )
+
+    def _copies(self, rng: random.Random) -> int:
+        return 2 if self.config.duplicates > 0 and rng.random() < self.config.duplicates else 1
+
+
+class _JsonArrayWriter:
+    def __init__(self, file: TextIO) -> None:
+        self.file = file
+        self.first = True
+        file.write("[\n")
+
+    def write(self, row: dict[str, Any]) -> None:
+        if not self.first:
+            self.file.write(",\n")
+        self.file.write(json.dumps(row, separators=(", ", ": ")))
+        self.first = False
+
+    def close(self) -> None:
+        self.file.write("\n]\n")
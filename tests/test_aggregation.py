@@ -0,0 +1,86 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.schemas import ConversionRecord, SpendRecord
+from src.services.aggregation import AggregateStats, HashAggregator
+from src.services.calculator import CPACalculator
+
+DAY = date(2025, 6, 4)
+
+
+def spend(campaign_id: str, value: str, day: date = DAY) -> SpendRecord:
+    return SpendRecord(date=day, campaign_id=campaign_id, spend=Decimal(value))
+
+
+def conversions(campaign_id: str, value: int, day: date = DAY) -> ConversionRecord:
+    return ConversionRecord(date=day, campaign_id=campaign_id, conversions=value)
+
+
+class TestHashAggregator:
+    """Тесты для HashAggregator и CPACalculator.merge_data c повторами ключей"""
+
+    def test_repeated_keys_summed(self):
+        """Почасовые строки одного ключа складываются, повторы считаются"""
+
+        stats = AggregateStats()
+
+        result = CPACalculator.merge_data(
+            [spend("C1", "10.00"), spend("C1", "5.50"), spend("C2", "3.00")],
+            [conversions("C1", 2), conversions("C1", 1), conversions("C1", 0)],
+            policy="sum",
+            stats=stats,
+        )
+
+        assert [(r.campaign_id, r.spend, r.conversions, r.cpa) for r in result] == [
+            ("C1", Decimal("15.50"), 3, Decimal("5.17")),
+            ("C2", Decimal("3.00"), 0, None),
+        ]
+        assert stats.spend_duplicates == 1
+        assert stats.conversion_duplicates == 2
+        assert stats.duplicates == 3
+        assert stats.spend_rows == 3
+        assert stats.keys == 2
+
+    def test_last_policy_keeps_last_row(self):
+        """Политика last сохраняет прежнее поведение: последняя строка заменяет предыдущие"""
+
+        stats = AggregateStats()
+
+        result = CPACalculator.merge_data(
+            [spend("C1", "10.00"), spend("C1", "5.50")],
+            [conversions("C1", 2), conversions("C1", 1)],
+            policy="last",
+            stats=stats,
+        )
+
+        assert (result[0].spend, result[0].conversions) == (Decimal("5.50"), 1)
+        assert stats.duplicates == 2
+
+    def test_sources_summed_without_counting_duplicates(self):
+        """Один ключ в разных источниках — не повтор; при last повтор заменяет только вклад своего источника"""
+
+        aggregator = HashAggregator(policy="last")
+        aggregator.add_spend([spend("C1", "10.00")])
+        aggregator.add_spend([spend("C1", "1.00"), spend("C1", "4.00")])
+
+        assert list(aggregator.totals()) == [(DAY, "C1", Decimal("14.00"), 0)]
+        assert aggregator.stats.spend_duplicates == 1
+
+    def test_accepts_generators(self):
+        """Записи читаются из генератора за один проход"""
+
+        rows = (spend(f"C{i % 3}", "1.00", date(2025, 6, 1 + i % 2)) for i in range(600))
+
+        result = CPACalculator.merge_sources([rows], [])
+
+        assert len(result) == 6
+        assert sum(r.spend for r in result) == Decimal("600.00")
+        assert [(r.date, r.campaign_id) for r in result] == sorted((r.date, r.campaign_id) for r in result)
+
+    def test_unknown_policy_rejected(self):
+        """Неизвестная политика — ошибка"""
+
+        with pytest.raises(ValueError):
+            HashAggregator(policy="first")
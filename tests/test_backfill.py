@@ -0,0 +1,162 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import delete
+
+from src.database import BackfillChunk, Database
+from src.services.backfill import BackfillCheckpoints, BackfillRunner, split_range
+from src.services.etl_service import ETLService
+
+
+def make_runner(checkpoints, etl_service, **kwargs):
+    return BackfillRunner(
+        database=MagicMock(spec=Database),
+        start_date=date(2025, 6, 1),
+        end_date=date(2025, 6, 30),
+        chunk="week",
+        workers=kwargs.pop("workers", 2),
+        etl_service=etl_service,
+        checkpoints=checkpoints,
+        **kwargs,
+    )
+
+
+class TestSplitRange:
+    """Тесты разбиения периода на чанки"""
+
+    def test_weeks_aligned_to_monday(self):
+        """Тест что недели режутся по понедельникам и обрезаются границами периода"""
+
+        chunks = split_range(date(2025, 6, 1), date(2025, 6, 18), "week")
+
+        assert chunks == [
+            (date(2025, 6, 1), date(2025, 6, 1)),
+            (date(2025, 6, 2), date(2025, 6, 8)),
+            (date(2025, 6, 9), date(2025, 6, 15)),
+            (date(2025, 6, 16), date(2025, 6, 18)),
+        ]
+
+    def test_months_across_year(self):
+        """Тест разбиения по месяцам через границу года"""
+
+        chunks = split_range(date(2024, 11, 15), date(2025, 2, 10), "month")
+
+        assert chunks == [
+            (date(2024, 11, 15), date(2024, 11, 30)),
+            (date(2024, 12, 1), date(2024, 12, 31)),
+            (date(2025, 1, 1), date(2025, 1, 31)),
+            (date(2025, 2, 1), date(2025, 2, 10)),
+        ]
+
+    def test_invalid_arguments(self):
+        """Тест ошибок на неизвестный чанк и перевёрнутый период"""
+
+        with pytest.raises(ValueError):
+            split_range(date(2025, 6, 1), date(2025, 6, 2), "day")
+        with pytest.raises(ValueError):
+            split_range(date(2025, 6, 2), date(2025, 6, 1), "week")
+
+
+class TestBackfillRunner:
+    """Тесты для BackfillRunner"""
+
+    def test_skips_done_chunks_and_reports_failures(self):
+        """Тест что завершённые чанки пропускаются и упавший чанк не останавливает остальные"""
+
+        checkpoints = MagicMock(spec=BackfillCheckpoints)
+        checkpoints.done_chunks.return_value = {(date(2025, 6, 1), date(2025, 6, 1))}
+        etl_service = MagicMock(spec=ETLService)
+
+        def run(start_date, end_date):
+            if start_date == date(2025, 6, 9):
+                raise RuntimeError("boom")
+            return [object()] * 3
+
+        etl_service.run.side_effect = run
+        done = []
+        runner = make_runner(checkpoints, etl_service, on_chunk_done=done.append)
+
+        result = runner.run()
+
+        assert result.chunks_total == 6
+        assert result.skipped == 1
+        assert result.succeeded == 4
+        assert result.failed == 1
+        assert result.rows == 12
+        assert result.failed_chunks[0].error == "boom"
+        assert len(done) == 5
+        assert checkpoints.mark_done.call_count == 4
+        checkpoints.mark_failed.assert_called_once()
+        assert etl_service.run.call_count == 5
+
+    def test_chunks_charge_shared_quota(self):
+        """Тест что чанки расходуют общую квоту источников и сверх неё помечаются failed"""
+
+        from src.services.rate_limiter import RateLimiter
+
+        checkpoints = MagicMock(spec=BackfillCheckpoints)
+        checkpoints.done_chunks.return_value = set()
+        limiter = RateLimiter(max_requests=4, backend="memory")
+        runner = make_runner(checkpoints, None, rate_limiter=limiter)
+
+        result = runner.run()
+
+        assert runner.etl_service.rate_limiter is limiter
+        assert result.succeeded == 2
+        assert result.failed == 4
+        assert limiter.get_stats()["used"] == 4
+
+
+@pytest.mark.integration
+class TestBackfillCheckpoints:
+    """Интеграционные тесты чекпоинтов backfill"""
+
+    BACKFILL_ID = "test-backfill"
+
+    @pytest.fixture
+    def database(self):
+        """Создаёт тестовую базу данных без чекпоинтов тестового backfill"""
+
+        db = Database()
+        db.init_db()
+        with db.get_session() as session:
+            session.execute(delete(BackfillChunk).where(BackfillChunk.backfill_id == self.BACKFILL_ID))
+        yield db
+        with db.get_session() as session:
+            session.execute(delete(BackfillChunk).where(BackfillChunk.backfill_id == self.BACKFILL_ID))
+        db.close()
+
+    def test_resume_after_crash(self, database):
+        """Тест что после падения повторный запуск выполняет только незавершённые чанки"""
+
+        checkpoints = BackfillCheckpoints(database, self.BACKFILL_ID)
+        chunks = split_range(date(2025, 6, 1), date(2025, 6, 30), "week")
+        checkpoints.register(chunks)
+        for chunk in chunks[:2]:
+            checkpoints.mark_running(chunk)
+            checkpoints.mark_done(chunk, rows=1, duration_seconds=0.1)
+        checkpoints.mark_running(chunks[2])
+        checkpoints.mark_failed(chunks[3], "boom", duration_seconds=0.1)
+
+        etl_service = MagicMock(spec=ETLService)
+        etl_service.run.return_value = [object()]
+        result = make_runner(checkpoints, etl_service, workers=2).run()
+
+        started = sorted(call.kwargs["start_date"] for call in etl_service.run.call_args_list)
+        assert started == [start for start, _ in chunks[2:]]
+        assert result.skipped == 2
+        assert result.succeeded == 4
+        assert checkpoints.get_stats() == {"pending": 0, "running": 0, "done": 6, "failed": 0}
+
+    def test_register_is_idempotent(self, database):
+        """Тест что повторная регистрация не сбрасывает статус чанков"""
+
+        checkpoints = BackfillCheckpoints(database, self.BACKFILL_ID)
+        chunks = split_range(date(2025, 6, 1), date(2025, 6, 8), "week")
+
+        checkpoints.register(chunks)
+        checkpoints.mark_done(chunks[0], rows=5, duration_seconds=0.1)
+        checkpoints.register(chunks)
+
+        assert checkpoints.done_chunks() == {chunks[0]}
@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock
+
+from src.database import Database
+from src.utils.benchmark import BenchmarkRunner, compare_reports, load_report, save_report
+
+
+class TestBenchmarkRunner:
+    """Тесты для BenchmarkRunner"""
+
+    def test_run_without_database(self, tmp_path):
+        """Без БД измеряются load, merge и filter для каждого размера"""
+
+        report = BenchmarkRunner([200, 400], repeat=1, days=4, work_dir=tmp_path).run()
+
+        cases = [(r["case"], r["size"]) for r in report["results"]]
+        assert cases == [
+            ("load", 200),
+            ("merge", 200),
+            ("filter", 200),
+            ("load", 400),
+            ("merge", 400),
+            ("filter", 400),
+        ]
+        assert all(r["seconds"] > 0 and r["rows"] > 0 for r in report["results"])
+        assert report["meta"]["database"] is False
+
+    def test_upsert_chunks_and_cleanup(self, tmp_path):
+        """C БД upsert идёт пачками, после прогона BENCH-строки удаляются"""
+
+        database = MagicMock(spec=Database)
+        report = BenchmarkRunner([200], repeat=2, days=4, database=database, upsert_chunk=50, work_dir=tmp_path).run()
+
+        upsert = next(r for r in report["results"] if r["case"] == "upsert")
+        assert database.bulk_upsert_stats.call_count == 2 * -(-upsert["rows"] // 50)
+        assert all(len(call.args[0]) <= 50 for call in database.bulk_upsert_stats.call_args_list)
+        database.get_session.assert_called_once()
+
+    def test_save_and_load(self, tmp_path):
+        """Отчёт сохраняется и читается как JSON"""
+
+        report = {"meta": {}, "results": [{"case": "merge", "size": 10, "rows": 10, "seconds": 0.1}]}
+        path = tmp_path / "out" / "results.json"
+
+        save_report(report, path)
+
+        assert load_report(path) == report
+
+
+class TestCompareReports:
+    """Тесты для compare_reports"""
+
+    def test_flags_regressions(self):
+        """Замедление больше порога — регрессия, новые кейсы игнорируются"""
+
+        baseline = {
+            "results": [
+                {"case": "merge", "size": 1000, "seconds": 1.0},
+                {"case": "load", "size": 1000, "seconds": 1.0},
+            ]
+        }
+        current = {
+            "results": [
+                {"case": "merge", "size": 1000, "seconds": 1.5},
+                {"case": "load", "size": 1000, "seconds": 1.1},
+                {"case": "upsert", "size": 1000, "seconds": 9.0},
+            ]
+        }
+
+        regressions = compare_reports(current, baseline, threshold=0.2)
+
+        assert regressions == [
+            {"case": "merge", "size": 1000, "baseline_seconds": 1.0, "seconds": 1.5, "ratio": 1.5},
+        ]
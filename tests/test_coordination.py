@@ -0,0 +1,160 @@
+import multiprocessing
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import text
+
+from src.database import Database
+from src.services.coordination import DateClaimer, LeaderElector
+from src.services.scheduler import SchedulerService
+
+
+def claim_in_process(worker_id, dates, queue):
+    """Забирает даты в отдельном процессе и возвращает результат через очередь"""
+
+    db = Database()
+    claimed = DateClaimer(db, worker_id=worker_id, lease_seconds=60).claim(dates)
+    db.close()
+    queue.put((worker_id, claimed))
+
+
+def leader_in_process(barrier, queue):
+    """Пытается стать лидером в отдельном процессе"""
+
+    db = Database()
+    elector = LeaderElector(db, lock_key=991_001)
+    barrier.wait()
+    queue.put(elector.try_acquire())
+    barrier.wait()
+    elector.release()
+    db.close()
+
+
+class TestSchedulerCoordination:
+    """Тесты режимов координации планировщика"""
+
+    def test_non_leader_skips_run(self):
+        """Тест что не-лидер не запускает ETL"""
+
+        service = SchedulerService(database=MagicMock(spec=Database))
+        service.leader_elector = MagicMock()
+        service.leader_elector.try_acquire.return_value = False
+
+        with patch.object(service, "_get_dates_to_load") as mock_dates:
+            service._run_etl_job()
+
+        mock_dates.assert_not_called()
+
+    def test_shard_runs_only_claimed_dates(self):
+        """Тест что в режиме shard загружаются только забранные даты, аренда снимается после загрузки"""
+
+        service = SchedulerService(database=MagicMock(spec=Database))
+        service.date_claimer = MagicMock()
+        service.date_claimer.claim.side_effect = lambda dates: [d for d in dates if d.day == 3]
+        service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+
+        def run(**kwargs):
+            assert service.rate_limiter.try_acquire()
+            return []
+
+        service.etl_service.run.side_effect = run
+
+        with patch.object(service, "_get_dates_to_load", return_value=[date(2025, 6, 1), date(2025, 6, 3)]):
+            service._run_etl_job()
+
+        service.etl_service.run.assert_called_once_with(
+            start_date=date(2025, 6, 3), end_date=date(2025, 6, 3), skip_unchanged=True
+        )
+        service.date_claimer.release.assert_called_once_with([date(2025, 6, 3)])
+        assert service.rate_limiter.get_stats()["used"] == 1
+
+    def test_shard_claim_released_after_error(self):
+        """Тест что аренда снимается и при ошибке загрузки"""
+
+        service = SchedulerService(database=MagicMock(spec=Database))
+        service.date_claimer = MagicMock()
+        service.date_claimer.claim.side_effect = lambda dates: dates
+        service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        service.etl_service.run.side_effect = ValueError("boom")
+
+        stats = service._run_date_ranges([(date(2025, 6, 1), date(2025, 6, 2))], workers=1, job_timeout=10)
+
+        assert stats["failed"] == 1
+        service.date_claimer.release.assert_called_once_with([date(2025, 6, 1), date(2025, 6, 2)])
+
+
+@pytest.mark.integration
+class TestCoordinationIntegration:
+    """Интеграционные тесты координации нескольких процессов через PostgreSQL"""
+
+    @pytest.fixture
+    def database(self):
+        """Создаёт тестовую базу данных"""
+
+        db = Database()
+        db.init_db()
+        yield db
+        db.close()
+
+    def test_processes_claim_disjoint_dates(self, database):
+        """Тест что несколько процессов делят бэклог без пересечений"""
+
+        dates = [date(2000, 1, 1) + timedelta(days=i) for i in range(30)]
+        with database.get_session() as session:
+            from sqlalchemy import delete
+
+            from src.database.models import DateClaim
+
+            session.execute(delete(DateClaim).where(DateClaim.date.in_(dates)))
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        processes = [ctx.Process(target=claim_in_process, args=(f"w{i}", dates, queue)) for i in range(4)]
+        for process in processes:
+            process.start()
+        results = [queue.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join()
+
+        claimed = [d for _, worker_dates in results for d in worker_dates]
+        assert len(claimed) == len(set(claimed))
+        assert set(claimed) == set(dates)
+
+    def test_leader_heartbeat_detects_lost_lock(self, database):
+        """Тест что лидер держит сессию вне транзакции и замечает потерю лока"""
+
+        leader = LeaderElector(database, lock_key=991_002)
+        other = LeaderElector(database, lock_key=991_002)
+
+        try:
+            assert leader.try_acquire() is True
+            assert leader.try_acquire() is True
+            pid = leader._connection.execute(text("SELECT pg_backend_pid()")).scalar_one()
+            with database.engine.connect() as conn:
+                state = conn.execute(text("SELECT state FROM pg_stat_activity WHERE pid = :pid"), {"pid": pid}).scalar()
+            assert state == "idle"
+
+            leader._connection.execute(text("SELECT pg_advisory_unlock(991002)"))
+            assert other.try_acquire() is True
+
+            assert leader.try_acquire() is False
+            assert leader.is_leader is False
+        finally:
+            leader.release()
+            other.release()
+
+    def test_single_leader_among_processes(self, database):
+        """Тест что лидером становится ровно один процесс"""
+
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(3)
+        queue = ctx.Queue()
+        processes = [ctx.Process(target=leader_in_process, args=(barrier, queue)) for _ in range(3)]
+        for process in processes:
+            process.start()
+        results = [queue.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join()
+
+        assert sum(results) == 1
@@ -122,3 +122,24 @@ class TestDataLoader:
 
         with pytest.raises(Exception):
             DataLoader.load_conversion_data(file_path)
+
+    def test_iter_rows_streams_in_batches(self, tmp_path):
+        """Тест что строки читаются порциями и совпадают c json.load при любом размере блока"""
+
+        data = [{"date": "2025-06-04", "campaign_id": f"C{i}", "note": "x]},"} for i in range(7)]
+        file_path = tmp_path / "rows.json"
+        file_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+        for read_size in (1, 5, 4096):
+            batches = list(DataLoader.iter_rows(file_path, batch_rows=3, read_size=read_size))
+            assert [len(batch) for batch in batches] == [3, 3, 1]
+            assert [row for batch in batches for row in batch] == data
+
+    def test_iter_rows_truncated_file(self, tmp_path):
+        """Тест что обрезанный файл даёт ошибку"""
+
+        file_path = tmp_path / "truncated.json"
+        file_path.write_text('[{"date": "2025-06-04"}, {"date": ', encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            list(DataLoader.iter_rows(file_path, batch_rows=10, read_size=4))
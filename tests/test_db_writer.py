@@ -0,0 +1,104 @@
+import time
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database import Database
+from src.services.db_writer import BufferedWriter
+
+
+def make_row(day: int, campaign_id: str, spend: str = "10") -> dict:
+    return {
+        "date": date(2025, 6, day),
+        "campaign_id": campaign_id,
+        "spend": Decimal(spend),
+        "conversions": 1,
+        "cpa": Decimal(spend),
+    }
+
+
+class TestBufferedWriter:
+    """Тесты для BufferedWriter"""
+
+    @pytest.fixture
+    def mock_database(self):
+        """Мок базы данных"""
+
+        return MagicMock(spec=Database)
+
+    def test_flush_on_close(self, mock_database):
+        """Тест что close() записывает все накопленные строки"""
+
+        writer = BufferedWriter(mock_database, queue_size=100, flush_rows=50, flush_interval=60)
+        writer.start()
+
+        writer.submit([make_row(4, "C1"), make_row(4, "C2")])
+        writer.close()
+
+        mock_database.bulk_upsert_stats.assert_called_once()
+        assert len(mock_database.bulk_upsert_stats.call_args[0][0]) == 2
+        assert writer.get_stats()["written"] == 2
+
+    def test_coalesce_same_key(self, mock_database):
+        """Тест схлопывания строк c одинаковым (date, campaign_id)"""
+
+        writer = BufferedWriter(mock_database, queue_size=100, flush_rows=50, flush_interval=60)
+        writer.start()
+
+        writer.submit([make_row(4, "C1", "10"), make_row(4, "C1", "20")])
+        writer.close()
+
+        rows = mock_database.bulk_upsert_stats.call_args[0][0]
+        assert len(rows) == 1
+        assert rows[0]["spend"] == Decimal("20")
+        assert writer.get_stats()["coalesced"] == 1
+
+    def test_flush_on_size_threshold(self, mock_database):
+        """Тест записи буфера при достижении порога по размеру"""
+
+        writer = BufferedWriter(mock_database, queue_size=100, flush_rows=2, flush_interval=60)
+        writer.start()
+
+        writer.submit([make_row(4, "C1"), make_row(4, "C2")])
+
+        assert writer.flush(timeout=5) is True
+        mock_database.bulk_upsert_stats.assert_called_once()
+        writer.close()
+
+    def test_backpressure_timeout(self, mock_database):
+        """Тест что переполненный буфер блокирует submit"""
+
+        mock_database.bulk_upsert_stats.side_effect = Exception("db down")
+        writer = BufferedWriter(mock_database, queue_size=1, flush_rows=1, flush_interval=60, put_timeout=0.1)
+        writer.start()
+
+        writer.submit([make_row(4, "C1")])
+
+        with pytest.raises(TimeoutError):
+            writer.submit([make_row(4, "C2")])
+
+        writer.close(timeout=1)
+
+    def test_full_buffer_triggers_flush(self, mock_database):
+        """Тест что полный буфер сбрасывается сразу, не дожидаясь flush_interval"""
+
+        writer = BufferedWriter(mock_database, queue_size=2, flush_rows=2, flush_interval=60, put_timeout=5)
+        writer.start()
+
+        started_at = time.monotonic()
+        writer.submit([make_row(4, "C1"), make_row(4, "C2"), make_row(4, "C3")])
+
+        assert time.monotonic() - started_at < 1
+        assert mock_database.bulk_upsert_stats.call_count >= 1
+        writer.close()
+        assert writer.get_stats()["written"] == 3
+
+    def test_submit_requires_start(self, mock_database):
+        """Тест что submit без start() — ошибка"""
+
+        writer = BufferedWriter(mock_database)
+
+        with pytest.raises(RuntimeError):
+            writer.submit([make_row(4, "C1")])
@@ -1,7 +1,7 @@
 from datetime import date
 
 import pytest
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select
 
 from src.database import Database
 from src.database.models import DailyStats
@@ -61,3 +61,19 @@ class TestETLIntegration:
         with database.get_session() as session:
             total = session.execute(select(func.count()).select_from(DailyStats)).scalar()
             assert total == count1
+
+    def test_etl_restores_deleted_rows(self, database):
+        """Тест что ручной запуск пишет даты c прежним отпечатком (таблицу очистили после загрузки)"""
+
+        etl = ETLService(database=database)
+        results = etl.run()
+
+        with database.get_session() as session:
+            session.execute(delete(DailyStats).where(DailyStats.date.in_({r.date for r in results})))
+
+        rerun = etl.run()
+
+        assert rerun.rows_written == len(results)
+        with database.get_session() as session:
+            total = session.execute(select(func.count()).select_from(DailyStats)).scalar()
+            assert total == len(results)
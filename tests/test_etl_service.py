@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.database import Database
+from src.database import Database, LoadWatermark
 from src.schemas import ConversionRecord, MergedRecord, SpendRecord
 from src.services import ETLService
 
@@ -60,6 +60,72 @@ class TestETLService:
         assert len(results) == 1
         assert results[0].date == date(2025, 6, 4)
 
+    @patch("src.services.data_loader.DataLoader.load_conversion_data")
+    @patch("src.services.data_loader.DataLoader.load_spend_data")
+    def test_run_report_stages(self, mock_load_spend, mock_load_conv, etl_service):
+        """Тест что run возвращает отчёт по стадиям"""
+
+        mock_load_spend.return_value = [
+            SpendRecord(date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("100")),
+            SpendRecord(date=date(2025, 6, 6), campaign_id="C2", spend=Decimal("200")),
+        ]
+        mock_load_conv.return_value = [
+            ConversionRecord(date=date(2025, 6, 4), campaign_id="C1", conversions=10),
+        ]
+
+        results = etl_service.run(start_date=date(2025, 6, 4), end_date=date(2025, 6, 5))
+
+        stages = {s.stage: s for s in results.report.stages}
+        assert list(stages) == ["load_spend", "load_conversions", "merge", "filter", "watermarks", "upsert"]
+        assert stages["load_spend"].rows_out == 2
+        assert stages["load_spend"].bytes_read > 0
+        assert stages["merge"].rows_in == 3
+        assert stages["merge"].rows_out == 2
+        assert stages["filter"].rows_out == 1
+        assert stages["upsert"].rows_out == 1
+        assert results.report.to_dict()["start_date"] == "2025-06-04"
+
+    @patch("src.services.data_loader.DataLoader.load_conversion_data")
+    @patch("src.services.data_loader.DataLoader.load_spend_data")
+    def test_run_skips_unchanged_dates(self, mock_load_spend, mock_load_conv, etl_service, mock_database):
+        """Тест что даты c неизменившимся отпечатком не перезаписываются"""
+
+        spend = [SpendRecord(date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("100"))]
+        conversions = [ConversionRecord(date=date(2025, 6, 4), campaign_id="C1", conversions=10)]
+        mock_load_spend.return_value = spend
+        mock_load_conv.return_value = conversions
+
+        etl_service.run()
+        watermarks = mock_database.upsert_watermarks.call_args[0][0]
+        mock_database.get_watermarks.return_value = [LoadWatermark(**w) for w in watermarks]
+        mock_database.bulk_upsert_stats.reset_mock()
+
+        results = etl_service.run(skip_unchanged=True)
+
+        assert len(results) == 1
+        assert results.rows_written == 0
+        mock_database.bulk_upsert_stats.assert_not_called()
+        assert mock_database.upsert_watermarks.call_count == 2
+
+    @patch("src.services.data_loader.DataLoader.load_conversion_data")
+    @patch("src.services.data_loader.DataLoader.load_spend_data")
+    def test_run_rewrites_unchanged_dates_by_default(self, mock_load_spend, mock_load_conv, etl_service, mock_database):
+        """Тест что обычный запуск пишет даты даже при неизменившемся отпечатке (например, после очистки таблицы)"""
+
+        mock_load_spend.return_value = [SpendRecord(date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("100"))]
+        mock_load_conv.return_value = []
+
+        etl_service.run()
+        watermarks = mock_database.upsert_watermarks.call_args[0][0]
+        mock_database.get_watermarks.return_value = [LoadWatermark(**w) for w in watermarks]
+        mock_database.bulk_upsert_stats.reset_mock()
+
+        results = etl_service.run()
+
+        assert results.rows_written == 1
+        mock_database.bulk_upsert_stats.assert_called_once()
+        assert {(w["source"], w["row_count"]) for w in watermarks} == {("fb_spend", 1), ("network_conv", 0)}
+
     def test_save_to_database_with_records(self, etl_service, mock_database):
         """Тест сохранения записей в БД"""
 
@@ -106,3 +172,20 @@ class TestETLService:
 
         captured = capsys.readouterr()
         assert "Нет данных для отображения" in captured.out
+
+    def test_save_to_database_with_writer(self, mock_database):
+        """Тест что при запущенном писателе запись идёт через буфер"""
+
+        writer = MagicMock()
+        writer.is_running = True
+        etl_service = ETLService(database=mock_database, writer=writer)
+        records = [
+            MergedRecord(
+                date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("100"), conversions=10, cpa=Decimal("10")
+            ),
+        ]
+
+        etl_service._save_to_database(records)
+
+        writer.submit.assert_called_once()
+        mock_database.bulk_upsert_stats.assert_not_called()
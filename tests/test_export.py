@@ -0,0 +1,122 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+
+from src.database import Database
+from src.database.models import DailyStats
+from src.services.export import StatsExporter
+
+START = date(2099, 1, 1)
+END = date(2099, 1, 3)
+CAMPAIGN_PREFIX = "EXPORT-"
+
+
+@pytest.fixture
+def database():
+    """Тестовые строки за 2099 год, удаляются после теста"""
+
+    db = Database()
+    db.init_db()
+    rows = [
+        {
+            "date": date(2099, 1, day),
+            "campaign_id": f"{CAMPAIGN_PREFIX}{n}",
+            "spend": Decimal("10.50") * n,
+            "conversions": n,
+            "cpa": Decimal("10.50"),
+        }
+        for day in range(1, 4)
+        for n in range(1, 4)
+    ]
+    rows.append(
+        {
+            "date": END,
+            "campaign_id": f'{CAMPAIGN_PREFIX}"q",\\x',
+            "spend": Decimal("1.00"),
+            "conversions": 0,
+            "cpa": None,
+        }
+    )
+    db.bulk_upsert_stats(rows)
+    yield db
+    with db.get_session() as session:
+        session.execute(delete(DailyStats).where(DailyStats.campaign_id.startswith(CAMPAIGN_PREFIX)))
+    db.close()
+
+
+class TestStatsExporter:
+    """Тесты для StatsExporter (COPY TO STDOUT в локальный PostgreSQL)"""
+
+    def test_csv_export(self, database):
+        """CSV c заголовком, только строки периода, по порядку (date, campaign_id)"""
+
+        output = io.BytesIO()
+
+        stats = StatsExporter(database).export(output, "csv", date(2099, 1, 2), END)
+
+        rows = list(csv.DictReader(io.StringIO(output.getvalue().decode())))
+        assert stats.rows == len(rows) == 7
+        assert stats.bytes_written == len(output.getvalue())
+        assert rows[0] == {
+            "date": "2099-01-02",
+            "campaign_id": "EXPORT-1",
+            "spend": "10.50",
+            "conversions": "1",
+            "cpa": "10.50",
+        }
+        assert [(r["date"], r["campaign_id"]) for r in rows] == sorted((r["date"], r["campaign_id"]) for r in rows)
+
+    def test_ndjson_gzip_export(self, database):
+        """NDJSON из row_to_json: кавычки и обратные слэши в значениях не портят JSON"""
+
+        output = io.BytesIO()
+
+        stats = StatsExporter(database).export(output, "ndjson", START, END, compression="gzip")
+
+        lines = gzip.decompress(output.getvalue()).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        assert stats.rows == len(records) == 10
+        assert records[-1]["date"] == "2099-01-03"
+        assert next(r for r in records if r["campaign_id"].startswith('EXPORT-"')) == {
+            "date": "2099-01-03",
+            "campaign_id": 'EXPORT-"q",\\x',
+            "spend": 1.0,
+            "conversions": 0,
+            "cpa": None,
+        }
+
+    def test_parquet_export_in_row_groups(self, database):
+        """Parquet пишется группами по row_group_rows строк"""
+
+        pq = pytest.importorskip("pyarrow.parquet")
+        output = io.BytesIO()
+
+        stats = StatsExporter(database, row_group_rows=4).export(output, "parquet", START, END)
+
+        parquet_file = pq.ParquetFile(io.BytesIO(output.getvalue()))
+        table = parquet_file.read()
+        assert stats.rows == table.num_rows == 10
+        assert parquet_file.num_row_groups == 3
+        assert table.column("spend").to_pylist()[2] == Decimal("31.50")
+        assert table.column("cpa").null_count == 1
+
+    def test_export_to_path_is_atomic(self, database, tmp_path):
+        """Файл появляется только после успешной выгрузки"""
+
+        exporter = StatsExporter(database)
+        path = tmp_path / "stats.csv"
+
+        with pytest.raises(ValueError):
+            exporter.export_to_path(path, "xml", START, END)
+        assert list(tmp_path.iterdir()) == []
+
+        stats = exporter.export_to_path(path, "csv", START, END)
+
+        assert path.stat().st_size == stats.bytes_written
+        assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,156 @@
+import json
+import time
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database import Database
+from src.services.etl_service import ETLService
+from src.services.http_extractor import HTTPExtractor, QuotaExceededError
+from src.services.rate_limiter import RateLimiter
+from src.services.scheduler import SchedulerService
+from src.settings.api import api_config
+from src.utils.mock_api import MockAPIServer
+
+START = date(2025, 6, 1)
+
+
+def make_rows(days: int, campaigns: int) -> tuple[list[dict], list[dict]]:
+    spend, conversions = [], []
+    for day in range(days):
+        for campaign in range(campaigns):
+            key = {"date": (START + timedelta(days=day)).isoformat(), "campaign_id": f"C{campaign:03d}"}
+            spend.append({**key, "spend": round(10 + campaign * 0.5, 2)})
+            conversions.append({**key, "conversions": campaign % 7})
+    return spend, conversions
+
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def factory(days: int = 10, campaigns: int = 20, **kwargs) -> MockAPIServer:
+        server = MockAPIServer(*make_rows(days, campaigns), **kwargs)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield factory
+
+    for server in servers:
+        server.stop()
+
+
+class TestHTTPExtractor:
+    """Тесты для HTTPExtractor на локальном MockAPIServer"""
+
+    def test_pages_fetched_concurrently_over_pooled_connections(self, make_server):
+        """Страницы загружаются по порядку, соединений не больше concurrency"""
+
+        server = make_server(days=10, campaigns=20)
+        extractor = HTTPExtractor(server.base_url, page_size=15, concurrency=4)
+
+        records = extractor.fetch_spend()
+
+        assert len(records) == 200
+        assert [(r.date, r.campaign_id) for r in records] == sorted((r.date, r.campaign_id) for r in records)
+        assert extractor.stats.pages == 14
+        assert extractor.stats.requests == 14
+        assert server.stats.connections <= 4
+        assert extractor.stats.connections_opened == server.stats.connections
+        extractor.close()
+
+    def test_date_range_is_passed_to_api(self, make_server):
+        """Период фильтруется на стороне API"""
+
+        server = make_server(days=10, campaigns=5)
+        extractor = HTTPExtractor(server.base_url, page_size=100)
+
+        records = extractor.fetch_conversions(START + timedelta(days=2), START + timedelta(days=3))
+
+        assert len(records) == 10
+        assert {r.date for r in records} == {START + timedelta(days=2), START + timedelta(days=3)}
+        assert server.stats.rows_sent == 10
+
+    def test_throttled_pages_are_retried(self, make_server):
+        """Ответы 429 повторяются после Retry-After и тоже считаются запросами"""
+
+        server = make_server(days=10, campaigns=8, max_rps=5)
+        extractor = HTTPExtractor(server.base_url, page_size=10, concurrency=8)
+
+        records = extractor.fetch_spend()
+
+        assert len(records) == 80
+        assert extractor.stats.throttled == server.stats.throttled > 0
+        assert extractor.stats.requests == extractor.stats.pages + extractor.stats.throttled
+
+    def test_quota_checked_before_fetching_pages(self, make_server):
+        """Если квоты на все страницы не хватает, остальные страницы не запрашиваются"""
+
+        server = make_server(days=10, campaigns=10)
+        limiter = RateLimiter(max_requests=3, mode="sliding_window", backend="memory")
+        extractor = HTTPExtractor(server.base_url, page_size=10, rate_limiter=limiter)
+
+        with pytest.raises(QuotaExceededError):
+            extractor.fetch_spend()
+
+        assert server.stats.requests == 1
+        assert limiter.get_stats()["used"] == 1
+
+    def test_concurrency_hides_latency(self, make_server):
+        """Параллельные страницы при задержке API загружаются быстрее последовательных"""
+
+        server = make_server(days=16, campaigns=10, latency_ms=20)
+
+        timings = {}
+        for concurrency in (1, 8):
+            extractor = HTTPExtractor(server.base_url, page_size=10, concurrency=concurrency)
+            started_at = time.perf_counter()
+            extractor.fetch_spend()
+            timings[concurrency] = time.perf_counter() - started_at
+            extractor.close()
+
+        assert timings[8] < timings[1] / 2
+
+
+class TestETLServiceHTTPSource:
+    """Тесты ETLService c HTTP источником"""
+
+    def test_same_result_as_file_source(self):
+        """Через mock API данные data/ дают тот же результат, что и чтение файлов"""
+
+        server = MockAPIServer.from_files(api_config.fb_spend_path, api_config.network_conv_path, max_page_size=2)
+        server.start()
+        try:
+            database = MagicMock(get_watermarks=MagicMock(return_value=[]))
+            expected = ETLService(database=database).run()
+            result = ETLService(database=database, extractor=HTTPExtractor(server.base_url, page_size=2)).run()
+        finally:
+            server.stop()
+
+        assert [r.model_dump() for r in result] == [r.model_dump() for r in expected]
+        load_stages = [s for s in result.report.stages if s.stage.startswith("load_")]
+        assert all(s.requests > 0 and s.bytes_read > 0 for s in load_stages)
+
+        with open(api_config.fb_spend_path, encoding="utf-8") as f:
+            assert load_stages[0].requests == (len(json.load(f)) + 1) // 2
+
+    def test_scheduler_limiter_charged_per_http_request(self, make_server, monkeypatch):
+        """Квота планировщика списывается за каждый HTTP запрос (включая 429), без доплаты за диапазон"""
+
+        server = make_server(days=4, campaigns=8, max_rps=5)
+        monkeypatch.setattr(api_config, "API_SOURCE", "http")
+        monkeypatch.setattr(api_config, "API_BASE_URL", server.base_url)
+        monkeypatch.setattr(api_config, "API_PAGE_SIZE", 8)
+        monkeypatch.setattr(api_config, "API_CACHE_ENABLED", False)
+        limiter = RateLimiter(max_requests=100, mode="sliding_window", backend="memory")
+        database = MagicMock(spec=Database)
+        database.get_watermarks.return_value = []
+
+        service = SchedulerService(database=database, metrics_port=0, rate_limiter=limiter)
+        stats = service._run_date_ranges([(START, START + timedelta(days=3))], workers=1, job_timeout=30)
+
+        assert stats["succeeded"] == 1
+        assert server.stats.throttled > 0
+        assert limiter.get_stats()["used"] == server.stats.requests
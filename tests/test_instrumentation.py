@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.schemas import MergedRecord
+from src.services.instrumentation import ETLResult, RunReport, peak_rss_mb
+
+
+class TestRunReport:
+    """Тесты для RunReport"""
+
+    def test_stage_records_metrics(self):
+        """Стадия фиксирует время, строки и байты"""
+
+        report = RunReport()
+
+        with report.stage("merge", rows_in=10, bytes_read=100) as stage:
+            time.sleep(0.01)
+            stage.rows_out = 4
+
+        [metrics] = report.stages
+        assert metrics.stage == "merge"
+        assert metrics.rows_in == 10
+        assert metrics.rows_out == 4
+        assert metrics.bytes_read == 100
+        assert metrics.wall_seconds >= 0.01
+        assert metrics.cpu_seconds >= 0
+        assert metrics.process_cpu_seconds >= 0
+        assert metrics.peak_rss_mb == pytest.approx(peak_rss_mb(), abs=50)
+
+    def test_stage_counts_cpu_of_worker_threads(self):
+        """CPU процесса за стадию включает потоки (источники читаются в extract-*), CPU потока — нет"""
+
+        def burn() -> None:
+            deadline = time.perf_counter() + 0.2
+            while time.perf_counter() < deadline:
+                pass
+
+        report = RunReport()
+
+        with report.stage("load_spend"):
+            worker = threading.Thread(target=burn)
+            worker.start()
+            worker.join()
+
+        assert report.stages[0].process_cpu_seconds >= 0.1
+        assert report.stages[0].cpu_seconds < 0.1
+        assert report.cpu_seconds == report.stages[0].cpu_seconds
+
+    def test_stage_recorded_on_error(self):
+        """Упавшая стадия тоже попадает в отчёт"""
+
+        report = RunReport()
+
+        with pytest.raises(ValueError), report.stage("upsert"):
+            raise ValueError("db down")
+
+        assert [s.stage for s in report.stages] == ["upsert"]
+
+    def test_to_json_single_line(self):
+        """Отчёт сериализуется в одну строку JSON"""
+
+        report = RunReport(start_date="2025-06-04")
+        with report.stage("load_spend"):
+            pass
+        with report.stage("merge"):
+            time.sleep(0.01)
+
+        line = report.to_json()
+        payload = json.loads(line)
+
+        assert "\n" not in line
+        assert payload["start_date"] == "2025-06-04"
+        assert payload["slowest_stage"] == "merge"
+        assert [s["stage"] for s in payload["stages"]] == ["load_spend", "merge"]
+
+
+class TestETLResult:
+    """Тесты для ETLResult"""
+
+    def test_behaves_like_list(self):
+        """ETLResult — список записей c отчётом"""
+
+        record = MergedRecord(
+            date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("10"), conversions=1, cpa=Decimal("10")
+        )
+        report = RunReport()
+
+        result = ETLResult([record], report)
+
+        assert result == [record]
+        assert len(result) == 1
+        assert result.report is report
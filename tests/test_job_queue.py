@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import delete
+
+from src.database import Database, EtlJob
+from src.services.http_extractor import QuotaExceededError
+from src.services.job_queue import JobQueue
+from src.services.rate_limiter import RateLimiter
+from src.services.worker import QueueWorker
+from src.settings.scheduler import scheduler_config
+
+
+@pytest.mark.integration
+class TestJobQueue:
+    """Интеграционные тесты очереди ETL задач"""
+
+    @pytest.fixture
+    def database(self):
+        """Создаёт тестовую базу данных c пустой очередью"""
+
+        db = Database()
+        db.init_db()
+        with db.get_session() as session:
+            session.execute(delete(EtlJob))
+        yield db
+        db.close()
+
+    def test_enqueue_dedupe(self, database):
+        """Тест что повторная постановка того же диапазона не создаёт дубликат"""
+
+        queue = JobQueue(database)
+
+        first = queue.enqueue(date(2025, 6, 4), date(2025, 6, 5))
+        second = queue.enqueue(date(2025, 6, 4), date(2025, 6, 5))
+
+        assert first is not None
+        assert second is None
+        assert queue.get_stats()["queued"] == 1
+
+    def test_concurrent_claims_are_unique(self, database):
+        """Тест что параллельные воркеры не забирают одну задачу дважды"""
+
+        queue = JobQueue(database)
+        for day in range(1, 21):
+            queue.enqueue(date(2025, 5, day), date(2025, 5, day))
+
+        def claim_all(worker_id):
+            claimed = []
+            while (job := queue.claim(worker_id)) is not None:
+                claimed.append(job.id)
+            return claimed
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(claim_all, [f"w{i}" for i in range(4)]))
+
+        claimed = [job_id for worker_ids in results for job_id in worker_ids]
+        assert len(claimed) == 20
+        assert len(set(claimed)) == 20
+        assert queue.get_stats()["running"] == 20
+
+    def test_worker_records_result(self, database):
+        """Тест что воркер записывает статус, длительность и число строк"""
+
+        queue = JobQueue(database)
+        job_id = queue.enqueue(date(2025, 6, 4), date(2025, 6, 4))
+        worker = QueueWorker(database, worker_id="test", rate_limiter=RateLimiter(max_requests=10))
+
+        assert worker.run_once() is True
+
+        with database.get_session() as session:
+            job = session.get(EtlJob, job_id)
+            assert job.status == "done"
+            assert job.rows > 0
+            assert job.duration_seconds is not None
+            assert job.worker_id == "test"
+
+    def test_worker_failure_recorded(self, database):
+        """Тест что ошибка ETL сохраняется в задаче"""
+
+        queue = JobQueue(database)
+        job_id = queue.enqueue(date(2025, 6, 4), date(2025, 6, 4))
+        worker = QueueWorker(database, worker_id="test", rate_limiter=RateLimiter(max_requests=10))
+
+        with patch.object(worker.etl_service, "run", side_effect=ValueError("boom")):
+            worker.run_once()
+
+        with database.get_session() as session:
+            job = session.get(EtlJob, job_id)
+            assert job.status == "failed"
+            assert job.error == "boom"
+
+    def test_worker_releases_job_without_quota(self, database):
+        """Тест что без квоты API задача возвращается в очередь"""
+
+        queue = JobQueue(database)
+        queue.enqueue(date(2025, 6, 4), date(2025, 6, 4))
+        limiter = MagicMock()
+        limiter.can_make_request.return_value = False
+        worker = QueueWorker(database, worker_id="test", rate_limiter=limiter)
+
+        assert worker.run_once() is False
+        assert queue.get_stats()["queued"] == 1
+
+    def test_worker_releases_job_when_quota_runs_out(self, database):
+        """Тест что задача возвращается в очередь, если квота кончилась во время загрузки"""
+
+        queue = JobQueue(database)
+        queue.enqueue(date(2025, 6, 4), date(2025, 6, 4))
+        worker = QueueWorker(database, worker_id="test", rate_limiter=RateLimiter(max_requests=10))
+
+        with patch.object(worker.etl_service, "run", side_effect=QuotaExceededError("fb_spend: квота API исчерпана")):
+            assert worker.run_once() is False
+
+        assert queue.get_stats()["queued"] == 1
+
+    def test_worker_runs_only_job_sources(self, database):
+        """Тест что задача загружает только указанные в ней источники"""
+
+        queue = JobQueue(database)
+        queue.enqueue(date(2025, 6, 4), date(2025, 6, 4), sources="fb_spend")
+        worker = QueueWorker(database, worker_id="test", rate_limiter=RateLimiter(max_requests=10))
+
+        assert worker.run_once() is True
+
+        service = worker._services["fb_spend"]
+        assert service.registry.names == ["fb_spend"]
+        assert queue.get_stats()["done"] == 1
+
+    def test_worker_fails_job_with_unknown_source(self, database):
+        """Тест что задача c неизвестным источником помечается упавшей"""
+
+        queue = JobQueue(database)
+        job_id = queue.enqueue(date(2025, 6, 4), date(2025, 6, 4), sources="fb_spend,unknown")
+        worker = QueueWorker(database, worker_id="test", rate_limiter=RateLimiter(max_requests=10))
+
+        assert worker.run_once() is True
+
+        with database.get_session() as session:
+            job = session.get(EtlJob, job_id)
+            assert job.status == "failed"
+            assert "unknown" in job.error
+
+    def test_worker_poll_interval_defaults_to_setting(self, database):
+        """Тест что без явной паузы воркер берёт WORKER_POLL_SECONDS"""
+
+        worker = QueueWorker(database, worker_id="test", rate_limiter=RateLimiter(max_requests=10))
+
+        assert worker.poll_interval == scheduler_config.WORKER_POLL_SECONDS
@@ -0,0 +1,117 @@
+import json
+import sys
+import zipfile
+
+import pytest
+from loguru import logger
+
+from src.utils.logger import LogSampler, _zip_and_remove, json_format, setup_logger
+
+
+@pytest.fixture
+def captured():
+    """Перехват сообщений loguru в список"""
+
+    messages = []
+    yield messages
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLogSampler:
+    """Тесты для LogSampler"""
+
+    def test_limits_repeated_info_and_keeps_warnings(self, captured):
+        """Тест что частые INFO c одной строки подавляются (один раз на все sink), WARNING проходят всегда"""
+
+        sampler = LogSampler(per_minute=2, clock=FakeClock())
+        logger.remove()
+        logger.add(captured.append, format="{message}", filter=sampler)
+        logger.add(lambda _: None, filter=sampler)
+
+        for day in range(5):
+            logger.info(f"дата {day}")
+            logger.warning(f"предупреждение {day}")
+
+        infos = [m for m in captured if m.startswith("дата")]
+        assert len([m for m in captured if m.startswith("предупреждение")]) == 5
+        assert infos[:2] == ["дата 0\n", "дата 1\n"]
+        assert sampler.suppressed_total == 3
+
+    def test_suppressed_count_reported_in_next_window(self, captured):
+        """Тест что число подавленных дописывается к первой записи следующего окна"""
+
+        clock = FakeClock()
+        sampler = LogSampler(per_minute=1, clock=clock)
+        logger.remove()
+        logger.add(captured.append, format="{message}", filter=sampler)
+
+        def emit(text):
+            logger.info(text)
+
+        for day in range(3):
+            emit(f"дата {day}")
+        clock.now = 60.0
+        emit("дата 3")
+
+        assert captured == ["дата 0\n", "дата 3 (подавлено похожих: 2)\n"]
+
+
+class TestJsonFormat:
+    """Тесты JSON формата логов"""
+
+    def test_json_lines_with_report_and_extra(self, captured):
+        """Тест что запись — валидный JSON, отчёт ETL разворачивается в объект"""
+
+        logger.remove()
+        logger.add(captured.append, format=json_format)
+
+        logger.bind(etl_report=True).info(json.dumps({"wall_seconds": 1.5}))
+        logger.bind(job_id=7).info("готово")
+
+        report, plain = (json.loads(line) for line in captured)
+        assert report["message"] == "etl_report"
+        assert report["report"] == {"wall_seconds": 1.5}
+        assert plain["message"] == "готово"
+        assert plain["extra"] == {"job_id": 7}
+        assert plain["level"] == "INFO"
+
+    def test_setup_logger_console_stream(self, captured, capsys):
+        """Тест что консольный sink можно перенести в stderr (stdout занят выгрузкой)"""
+
+        setup_logger(enqueue=False, sample_per_minute=0, stream=sys.stderr)
+        logger.info("в stderr")
+
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert "в stderr" in err
+
+    def test_setup_logger_rejects_unknown_format(self, captured):
+        """Тест ошибки на неизвестный формат"""
+
+        with pytest.raises(ValueError):
+            setup_logger(log_format="xml")
+
+
+class TestCompression:
+    """Тесты фонового сжатия ротированных логов"""
+
+    def test_zip_and_remove(self, tmp_path):
+        """Тест что ротированный файл упаковывается в zip и удаляется"""
+
+        rotated = tmp_path / "etl.2025-06-01.log"
+        rotated.write_text("строка лога\n", encoding="utf-8")
+
+        _zip_and_remove(str(rotated))
+
+        assert not rotated.exists()
+        with zipfile.ZipFile(f"{rotated}.zip") as archive:
+            assert archive.read(rotated.name).decode("utf-8") == "строка лога\n"
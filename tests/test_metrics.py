@@ -0,0 +1,100 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.services.metrics import MetricsRegistry, MetricsServer
+
+
+class TestMetricsRegistry:
+    """Тесты для MetricsRegistry"""
+
+    def test_counter_and_gauge(self):
+        """Счётчики суммируются, gauge перезаписывается"""
+
+        registry = MetricsRegistry()
+        registry.describe("etl_rows_total", "counter", "Загруженные записи")
+        registry.describe("limiter", "gauge", "Квота")
+
+        registry.inc("etl_rows_total", 3)
+        registry.inc("etl_rows_total", 2)
+        registry.set("limiter", 10, {"state": "used"})
+        registry.set("limiter", 7, {"state": "used"})
+
+        text = registry.render()
+
+        assert "# TYPE etl_rows_total counter" in text
+        assert "etl_rows_total 5" in text
+        assert 'limiter{state="used"} 7' in text
+
+    def test_histogram_buckets_cumulative(self):
+        """Бакеты гистограммы кумулятивные, есть _sum и _count"""
+
+        registry = MetricsRegistry()
+        registry.describe("latency", "histogram", "Задержка", buckets=(1.0, 5.0))
+
+        for value in (0.5, 1.0, 3.0, 10.0):
+            registry.observe("latency", value, {"stage": "merge"})
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_bucket{stage="merge",le="1"} 2' in lines
+        assert 'latency_bucket{stage="merge",le="5"} 3' in lines
+        assert 'latency_bucket{stage="merge",le="+Inf"} 4' in lines
+        assert 'latency_sum{stage="merge"} 14.5' in lines
+        assert 'latency_count{stage="merge"} 4' in lines
+
+    def test_label_escaping(self):
+        """Кавычки и переводы строк в метках экранируются"""
+
+        registry = MetricsRegistry()
+        registry.describe("errors", "counter", "Ошибки")
+        registry.inc("errors", labels={"error": 'bad "value"\n'})
+
+        assert 'errors{error="bad \\"value\\"\\n"} 1' in registry.render()
+
+    def test_collectors_run_on_render(self):
+        """Коллекторы обновляют gauge перед отдачей, ошибка коллектора не ломает вывод"""
+
+        registry = MetricsRegistry()
+        registry.describe("pending", "gauge", "Очередь")
+
+        def broken(_):
+            raise RuntimeError("boom")
+
+        registry.add_collector(broken)
+        registry.add_collector(lambda r: r.set("pending", 42))
+
+        assert "pending 42" in registry.render()
+
+
+class TestMetricsServer:
+    """Тесты для MetricsServer"""
+
+    @pytest.fixture
+    def server(self):
+        registry = MetricsRegistry()
+        registry.describe("up", "gauge", "Процесс жив")
+        registry.set("up", 1)
+        server = MetricsServer(registry, port=0)
+        server.start()
+        yield server
+        server.stop()
+
+    def test_metrics_endpoint(self, server):
+        """GET /metrics отдаёт текстовый формат Prometheus"""
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert "up 1" in body
+
+    def test_unknown_path(self, server):
+        """Другие пути — 404"""
+
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/", timeout=5)
+
+        assert exc_info.value.code == 404
@@ -0,0 +1,146 @@
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.pacing import QuotaPacer
+from src.services.rate_limiter import RateLimiter
+
+
+def make_pacer(available_used: int = 0, now: datetime = datetime(2025, 6, 10, 12, 0)) -> QuotaPacer:
+    limiter = RateLimiter(max_requests=80)
+    for _ in range(available_used):
+        limiter.record_request()
+    return QuotaPacer(
+        limiter,
+        base_interval_minutes=30,
+        min_interval_minutes=5,
+        max_interval_minutes=120,
+        now=lambda: now,
+    )
+
+
+class TestQuotaPacer:
+    """Тесты для QuotaPacer"""
+
+    def test_rank_today_and_yesterday_first(self):
+        """Тест что сегодня и вчера ранжируются выше старых дат"""
+
+        pacer = make_pacer()
+        today = date(2025, 6, 10)
+        ranges = [
+            (date(2025, 6, 3), date(2025, 6, 4)),
+            (date(2025, 6, 10), date(2025, 6, 10)),
+            (date(2025, 6, 9), date(2025, 6, 9)),
+        ]
+
+        result = pacer.rank_ranges(ranges, today)
+
+        assert result[0] == (date(2025, 6, 10), date(2025, 6, 10))
+        assert result[1] == (date(2025, 6, 9), date(2025, 6, 9))
+
+    def test_budget_paced_across_day(self):
+        """Тест что бюджет запуска распределяет квоту по оставшимся часам"""
+
+        pacer = make_pacer()
+        ranges = [(date(2025, 5, d), date(2025, 5, d)) for d in range(1, 30, 2)]
+
+        decision = pacer.plan(ranges)
+
+        assert decision.available == 80
+        assert decision.budget == 4
+        assert decision.backlog_ranges == len(ranges) - 4
+        assert decision.next_interval_seconds < 30 * 60
+
+    def test_budget_counts_requests_per_range(self):
+        """Тест что бюджет в диапазонах делится на стоимость диапазона в запросах"""
+
+        pacer = make_pacer()
+        pacer.requests_per_range = 4
+        ranges = [(date(2025, 5, d), date(2025, 5, d)) for d in range(1, 30, 2)]
+
+        decision = pacer.plan(ranges)
+
+        assert decision.available == 80
+        assert decision.budget == 1
+        assert decision.requests_per_range == 4
+
+    def test_record_cost_smooths_estimate(self):
+        """Тест что фактическая стоимость диапазона сглаживается, a запуск из кэша её не меняет"""
+
+        pacer = make_pacer()
+
+        pacer.record_cost(11)
+        assert pacer.requests_per_range == pytest.approx(4)
+        pacer.record_cost(0)
+        assert pacer.requests_per_range == pytest.approx(4)
+
+    def test_no_backlog_keeps_base_interval(self):
+        """Тест что без бэклога интервал не короче штатного"""
+
+        pacer = make_pacer()
+
+        decision = pacer.plan([(date(2025, 6, 10), date(2025, 6, 10))])
+
+        assert decision.budget == 1
+        assert decision.next_interval_seconds >= 30 * 60
+
+    def test_exhausted_quota_stretches_interval(self):
+        """Тест что при исчерпанной квоте интервал растягивается до максимума"""
+
+        pacer = make_pacer(available_used=80)
+
+        decision = pacer.plan([(date(2025, 6, 10), date(2025, 6, 10))])
+
+        assert decision.budget == 0
+        assert decision.ranges == []
+        assert decision.next_interval_seconds == 120 * 60
+
+    def test_metrics(self):
+        """Тест экспорта решений как метрик"""
+
+        pacer = make_pacer()
+        pacer.plan([(date(2025, 6, 10), date(2025, 6, 10))])
+
+        metrics = pacer.get_metrics()
+
+        assert metrics["decisions_total"] == 1
+        assert metrics["budget"] == 1
+        assert metrics["ranges"] == 1
+        assert metrics["throttled_total"] == 0
+        assert metrics["backoff"] is False
+        assert "next_interval_seconds" in metrics
+
+    def test_scheduler_reschedules_job(self):
+        """Тест что планировщик перенастраивает интервал по решению пейсера"""
+
+        from src.database import Database
+        from src.services.scheduler import SchedulerService
+
+        service = SchedulerService(database=MagicMock(spec=Database))
+        service.pacer = make_pacer()
+        service.scheduler = MagicMock()
+
+        selected = service._apply_pacing([(date(2025, 6, 10), date(2025, 6, 10))])
+
+        assert selected == [(date(2025, 6, 10), date(2025, 6, 10))]
+        service.scheduler.reschedule_job.assert_called_once()
+
+    def test_scheduler_exports_pacing_metrics(self):
+        """Тест что /metrics планировщика отдаёт интервал, backoff и счётчики пейсера"""
+
+        from src.database import Database
+        from src.services.scheduler import SchedulerService
+
+        service = SchedulerService(database=MagicMock(spec=Database))
+        service.database.get_pool_stats.return_value = {}
+        service.pacer = make_pacer(available_used=80)
+        service.scheduler = MagicMock()
+
+        service._apply_pacing([(date(2025, 6, 10), date(2025, 6, 10))])
+        text = service.metrics.render()
+
+        assert "scheduler_pacing_interval_seconds 7200" in text
+        assert "scheduler_pacing_backoff 1" in text
+        assert "scheduler_pacing_throttled_total 1" in text
+        assert 'scheduler_pacing_ranges{state="backlog"} 1' in text
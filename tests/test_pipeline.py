@@ -0,0 +1,212 @@
+import json
+import time
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database import Database
+from src.services import ETLService
+from src.services.pipeline import PipelinedETL
+from src.services.sources import CONVERSION_KIND, SPEND_KIND, FileSource, SourceRegistry
+
+
+class RecordingSource(FileSource):
+    """FileSource, который отмечает каждую разобранную порцию в общем журнале событий"""
+
+    def __init__(self, name, kind, path, events):
+        super().__init__(name, kind, path)
+        self.events = events
+
+    def parse(self, rows):
+        self.events.append("parse")
+        return super().parse(rows)
+
+
+def daily_registry(tmp_path, events, days=10, reverse_spend=False):
+    dates = [(date(2025, 6, 1) + timedelta(days=offset)).isoformat() for offset in range(days)]
+    spend_dates = list(reversed(dates)) if reverse_spend else dates
+    spend = tmp_path / "spend.json"
+    spend.write_text(json.dumps([{"date": d, "campaign_id": "C1", "spend": 10} for d in spend_dates]), encoding="utf-8")
+    conv = tmp_path / "conv.json"
+    conv.write_text(json.dumps([{"date": d, "campaign_id": "C1", "conversions": 2} for d in dates]), encoding="utf-8")
+    return SourceRegistry(
+        [
+            RecordingSource("fb_spend", SPEND_KIND, spend, events),
+            RecordingSource("network_conv", CONVERSION_KIND, conv, events),
+        ]
+    )
+
+
+class TestPipelinedETL:
+    """Тесты для конвейерного ETL"""
+
+    @pytest.fixture
+    def mock_database(self):
+        """Мок базы данных без сохранённых watermarks"""
+
+        database = MagicMock(spec=Database)
+        database.get_watermarks.return_value = []
+        return database
+
+    def test_results_match_sequential_etl(self, mock_database):
+        """Конвейер возвращает те же записи, что и последовательный ETLService"""
+
+        expected = ETLService(database=MagicMock(get_watermarks=MagicMock(return_value=[]))).run()
+        results = PipelinedETL(database=mock_database, chunk_rows=2, queue_size=1).run()
+
+        assert results == expected
+
+    def test_date_range_filter(self, mock_database):
+        """Фильтрация по датам совпадает c последовательным ETL"""
+
+        start, end = date(2025, 6, 5), date(2025, 6, 5)
+        expected = ETLService(database=MagicMock(get_watermarks=MagicMock(return_value=[]))).run(start, end)
+        results = PipelinedETL(database=mock_database, chunk_rows=1).run(start, end)
+
+        assert results == expected
+        assert {r.date for r in results} == {start}
+
+    def test_sources_from_registry(self, mock_database, tmp_path):
+        """Конвейер читает все источники реестра и сводит их как ETLService"""
+
+        extra = tmp_path / "tiktok.json"
+        extra.write_text(
+            json.dumps([{"date": "2025-06-04", "campaign_id": "CAMP-123", "spend": 10}]),
+            encoding="utf-8",
+        )
+        registry = SourceRegistry.from_config()
+        registry.register(FileSource("tiktok_spend", SPEND_KIND, extra))
+
+        expected = ETLService(database=MagicMock(get_watermarks=MagicMock(return_value=[])), registry=registry).run()
+        results = PipelinedETL(database=mock_database, chunk_rows=2, registry=registry).run()
+
+        assert results == expected
+        sources = {row["source"] for call in mock_database.upsert_watermarks.call_args_list for row in call.args[0]}
+        assert sources == {"fb_spend", "network_conv", "tiktok_spend"}
+
+    def test_empty_dates_get_watermarks(self, mock_database):
+        """Даты периода без строк получают watermarks всех источников"""
+
+        start, end = date(2025, 5, 30), date(2025, 6, 1)
+        PipelinedETL(database=mock_database, registry=SourceRegistry.from_config()).run(start, end)
+
+        rows = [row for call in mock_database.upsert_watermarks.call_args_list for row in call.args[0]]
+        assert {(row["date"], row["source"]) for row in rows} == {
+            (start + timedelta(days=offset), source) for offset in range(3) for source in ("fb_spend", "network_conv")
+        }
+        mock_database.bulk_upsert_stats.assert_not_called()
+
+    def test_chunks_written_separately(self, mock_database):
+        """Каждый чанк пишется отдельным upsert, watermarks — после статистики"""
+
+        pipeline = PipelinedETL(database=mock_database, chunk_rows=1, queue_size=1)
+        results = pipeline.run()
+
+        dates = {r.date for r in results}
+        assert mock_database.bulk_upsert_stats.call_count == len(dates)
+        assert mock_database.upsert_watermarks.call_count == len(dates)
+
+        written = [row for call in mock_database.bulk_upsert_stats.call_args_list for row in call.args[0]]
+        assert len(written) == len(results)
+
+    def test_unchanged_dates_are_not_written(self, mock_database):
+        """Повторный запуск c теми же данными не пишет статистику"""
+
+        pipeline = PipelinedETL(database=mock_database, chunk_rows=1)
+        pipeline.run()
+
+        saved = [MagicMock(**row) for call in mock_database.upsert_watermarks.call_args_list for row in call.args[0]]
+        mock_database.reset_mock()
+        mock_database.get_watermarks.side_effect = lambda start, end: [w for w in saved if start <= w.date <= end]
+
+        results = pipeline.run(skip_unchanged=True)
+
+        assert results
+        mock_database.bulk_upsert_stats.assert_not_called()
+
+    def test_stage_stats(self, mock_database):
+        """Статистика по стадиям: строки, пропускная способность, глубина очередей"""
+
+        pipeline = PipelinedETL(database=mock_database, chunk_rows=1, queue_size=2)
+        results = pipeline.run()
+
+        stats = {stage["stage"]: stage for stage in pipeline.get_stats()}
+
+        assert list(stats) == ["extract", "parse", "merge", "load"]
+        assert stats["parse"]["rows_in"] == stats["extract"]["rows_out"]
+        assert stats["merge"]["rows_out"] == len(results)
+        assert stats["load"]["rows_out"] == len(results)
+        assert stats["load"]["chunks"] == stats["parse"]["chunks"]
+        for stage in stats.values():
+            assert stage["max_queue_depth"] <= 2
+            assert stage["rows_per_second"] >= 0
+
+    def test_backpressure_with_slow_load(self, mock_database):
+        """Медленная запись не даёт очередям расти выше лимита"""
+
+        mock_database.bulk_upsert_stats.side_effect = lambda rows: time.sleep(0.05)
+        pipeline = PipelinedETL(database=mock_database, chunk_rows=1, queue_size=1)
+        pipeline.run()
+
+        stats = {stage["stage"]: stage for stage in pipeline.get_stats()}
+
+        assert stats["merge"]["max_queue_depth"] == 1
+        assert stats["load"]["busy_seconds"] > stats["parse"]["busy_seconds"]
+
+    def test_stage_error_is_raised(self, mock_database):
+        """Ошибка стадии прерывает конвейер"""
+
+        mock_database.bulk_upsert_stats.side_effect = RuntimeError("db down")
+        pipeline = PipelinedETL(database=mock_database, chunk_rows=1, queue_size=1)
+
+        with pytest.raises(ExceptionGroup) as exc_info:
+            pipeline.run()
+
+        assert exc_info.group_contains(RuntimeError, match="db down")
+
+    def test_load_overlaps_parse(self, mock_database, tmp_path):
+        """Чанк записывается, пока parse ещё разбирает следующие даты"""
+
+        events = []
+        mock_database.bulk_upsert_stats.side_effect = lambda rows: events.append("upsert")
+        pipeline = PipelinedETL(
+            database=mock_database, chunk_rows=1, queue_size=1, registry=daily_registry(tmp_path, events)
+        )
+
+        results = pipeline.run()
+
+        last_parse = len(events) - 1 - events[::-1].index("parse")
+        assert events.index("upsert") < last_parse
+        assert len(results) == 10
+        assert mock_database.bulk_upsert_stats.call_count > 1
+
+    def test_unordered_source_dates_rewritten(self, mock_database, tmp_path):
+        """Источник c датами не по порядку: выданные даты пересобираются и записываются повторно"""
+
+        events = []
+        pipeline = PipelinedETL(
+            database=mock_database,
+            chunk_rows=1,
+            queue_size=1,
+            registry=daily_registry(tmp_path, events, days=4, reverse_spend=True),
+        )
+
+        results = pipeline.run()
+
+        assert [(r.date.day, r.spend, r.conversions) for r in results] == [(day, 10, 2) for day in range(1, 5)]
+        written = [row for call in mock_database.bulk_upsert_stats.call_args_list for row in call.args[0]]
+        last_written = {row["date"]: row for row in written}
+        assert all(row["spend"] == 10 and row["conversions"] == 2 for row in last_written.values())
+
+    def test_stage_hook_wraps_run(self, mock_database):
+        """stage_hook (профайлер) оборачивает запуск конвейера"""
+
+        hook = MagicMock()
+        pipeline = PipelinedETL(database=mock_database, chunk_rows=1, stage_hook=hook)
+
+        results = pipeline.run()
+
+        hook.assert_called_once_with("pipeline")
+        hook.return_value.__enter__.assert_called_once()
+        assert results
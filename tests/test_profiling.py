@@ -0,0 +1,92 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database import Database
+from src.services import ETLService
+from src.utils.profiling import PROFILE_MODES, ProfileSession, StackSampler, parse_profile_modes
+
+
+class TestParseProfileModes:
+    """Тесты для parse_profile_modes"""
+
+    def test_all(self):
+        """all включает все режимы"""
+
+        assert parse_profile_modes("all") == set(PROFILE_MODES)
+
+    def test_list(self):
+        """Список через запятую"""
+
+        assert parse_profile_modes("cpu, Memory") == {"cpu", "memory"}
+
+    def test_unknown_mode(self):
+        """Неизвестный режим — ошибка"""
+
+        with pytest.raises(ValueError):
+            parse_profile_modes("cpu,gpu")
+
+
+class TestStackSampler:
+    """Тесты для StackSampler"""
+
+    def test_collects_collapsed_stacks(self, tmp_path):
+        """Сэмплер собирает стеки текущего потока в формате collapsed"""
+
+        def busy_loop():
+            deadline = time.perf_counter() + 0.1
+            while time.perf_counter() < deadline:
+                pass
+
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        busy_loop()
+        sampler.stop()
+
+        output = tmp_path / "stacks.collapsed"
+        sampler.write_collapsed(output)
+        lines = output.read_text().splitlines()
+
+        assert sampler.samples > 0
+        assert any("test_profiling:busy_loop" in line for line in lines)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+class TestProfileSession:
+    """Тесты для ProfileSession"""
+
+    def test_profiles_etl_stages(self, tmp_path):
+        """Запуск ETL под профилированием пишет профили стадий, стеки и снимок памяти"""
+
+        database = MagicMock(spec=Database)
+        database.get_watermarks.return_value = []
+
+        with ProfileSession(tmp_path, set(PROFILE_MODES), sample_interval=0.001) as session:
+            ETLService(database=database, stage_hook=session.stage).run()
+
+        output_dir = session.output_dir
+        summary = json.loads((output_dir / "summary.json").read_text())
+        stages = [s["stage"] for s in summary["stages"]]
+
+        assert stages == ["load_spend", "load_conversions", "merge", "watermarks", "upsert"]
+        assert (output_dir / "merge.prof").exists()
+        assert "cumulative" in (output_dir / "merge.txt").read_text()
+        assert (output_dir / "stacks.collapsed").exists()
+        assert (output_dir / "memory_top.txt").read_text()
+        assert summary["memory_peak_kb"] > 0
+        assert all("memory_peak_kb" in s for s in summary["stages"])
+
+    def test_cpu_only(self, tmp_path):
+        """Без memory/sampling пишутся только профили cProfile"""
+
+        database = MagicMock(spec=Database)
+        database.get_watermarks.return_value = []
+
+        with ProfileSession(tmp_path, {"cpu"}) as session:
+            ETLService(database=database, stage_hook=session.stage).run()
+
+        assert not (session.output_dir / "stacks.collapsed").exists()
+        assert not (session.output_dir / "memory_top.txt").exists()
+        assert (session.output_dir / "load_spend.prof").exists()
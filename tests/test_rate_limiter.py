@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 
+import pytest
+
 from src.services.rate_limiter import RateLimiter
 
 
@@ -99,3 +101,105 @@ class TestRateLimiter:
         assert next_time is not None
         assert isinstance(next_time, datetime)
         assert next_time > datetime.now()
+
+    def test_try_acquire_concurrent(self):
+        """Тест что try_acquire атомарен при конкурентном доступе"""
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        limiter = RateLimiter()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda _: limiter.try_acquire(), range(200)))
+
+        assert sum(results) == 80
+        assert limiter.get_available_requests() == 0
+
+    def test_window_expires_with_monotonic_clock(self):
+        """Тест очистки окна по монотонным часам"""
+
+        now = [1000.0]
+        limiter = RateLimiter(max_requests=2, clock=lambda: now[0])
+
+        limiter.record_request()
+        now[0] += 60
+        limiter.record_request()
+
+        assert limiter.can_make_request() is False
+
+        now[0] += RateLimiter.WINDOW_SECONDS - 30
+
+        assert limiter.get_available_requests() == 1
+        assert limiter.can_make_request() is True
+
+    def test_token_bucket_spreads_requests(self):
+        """Тест что token_bucket не даёт потратить квоту одной пачкой"""
+
+        now = [0.0]
+        limiter = RateLimiter(max_requests=80, mode="token_bucket", burst=2, clock=lambda: now[0])
+
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+        assert limiter.get_next_available_time() is not None
+
+        now[0] += RateLimiter.WINDOW_SECONDS / 80
+
+        assert limiter.try_acquire() is True
+        assert limiter.get_available_requests() == 77
+
+    def test_invalid_mode(self):
+        """Тест ошибки при неизвестном режиме"""
+
+        with pytest.raises(ValueError):
+            RateLimiter(mode="unknown")
+
+    def test_postgres_backend_requires_database(self):
+        """Тест что бэкенд postgres без БД — ошибка"""
+
+        with pytest.raises(ValueError):
+            RateLimiter(backend="postgres")
+
+
+@pytest.mark.integration
+class TestPostgresRateLimiter:
+    """Интеграционные тесты общего лимита в PostgreSQL"""
+
+    @pytest.fixture
+    def database(self):
+        """Создаёт тестовую базу данных"""
+
+        from src.database import Database
+
+        db = Database()
+        db.init_db()
+        yield db
+        db.close()
+
+    def test_state_survives_new_instance(self, database):
+        """Тест что журнал запросов переживает пересоздание лимитера (рестарт)"""
+
+        limiter = RateLimiter(max_requests=5, backend="postgres", database=database, scope="test-restart")
+        limiter.requests_log = []
+
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is True
+
+        restarted = RateLimiter(max_requests=5, backend="postgres", database=database, scope="test-restart")
+
+        assert restarted.get_available_requests() == 3
+
+    def test_concurrent_limiters_share_quota(self, database):
+        """Тест что несколько лимитеров (как разные процессы) не превышают общую квоту"""
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        RateLimiter(max_requests=10, backend="postgres", database=database, scope="test-shared").requests_log = []
+        limiters = [
+            RateLimiter(max_requests=10, backend="postgres", database=database, scope="test-shared") for _ in range(4)
+        ]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda i: limiters[i % 4].try_acquire(), range(40)))
+
+        assert sum(results) == 10
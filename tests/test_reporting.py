@@ -0,0 +1,146 @@
+import http.client
+import json
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+
+from src.database import Database
+from src.database.models import DailyStats, LoadWatermark
+from src.services.reporting import ReportingServer, ReportService
+
+START = date(2098, 1, 1)
+END = date(2098, 1, 5)
+CAMPAIGN_PREFIX = "REPORT-"
+RANGE = f"start_date={START}&end_date={END}"
+
+
+def watermarks(changed_at: datetime) -> list[dict]:
+    return [
+        {
+            "date": START + timedelta(days=day),
+            "source": "fb_spend",
+            "loaded_at": changed_at,
+            "changed_at": changed_at,
+            "row_count": 3,
+            "fingerprint": "0" * 64,
+        }
+        for day in range(5)
+    ]
+
+
+@pytest.fixture
+def database():
+    """Кампании REPORT-A/B/C за 2098-01-01..05 c watermarks, удаляются после теста"""
+
+    db = Database()
+    db.init_db()
+    rows = []
+    for day in range(5):
+        record_date = START + timedelta(days=day)
+        rows += [
+            {"date": record_date, "campaign_id": "REPORT-A", "spend": Decimal("10.00"), "conversions": 2, "cpa": None},
+            {"date": record_date, "campaign_id": "REPORT-B", "spend": Decimal("30.00"), "conversions": 1, "cpa": None},
+            {"date": record_date, "campaign_id": "REPORT-C", "spend": Decimal("5.00"), "conversions": 0, "cpa": None},
+        ]
+    db.bulk_upsert_stats(rows)
+    db.upsert_watermarks(watermarks(datetime(2098, 1, 6, tzinfo=UTC)))
+    yield db
+    with db.get_session() as session:
+        session.execute(delete(DailyStats).where(DailyStats.campaign_id.startswith(CAMPAIGN_PREFIX)))
+        session.execute(delete(LoadWatermark).where(LoadWatermark.date.between(START, END)))
+    db.close()
+
+
+@pytest.fixture
+def server(database):
+    server = ReportingServer(database, port=0, service=ReportService(database, cache_max_body_bytes=1024))
+    server.start()
+    yield server
+    server.stop()
+
+
+def get(server: ReportingServer, path: str, etag: str | None = None) -> tuple[int, dict, bytes]:
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    connection.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, dict(response.getheaders()), body
+
+
+class TestReportingServer:
+    """Тесты API отчётов на локальном PostgreSQL"""
+
+    def test_campaign_totals(self, server):
+        """Итоги по кампаниям c CPA; кампания без конверсий — cpa null"""
+
+        status, _, body = get(server, f"/campaigns?{RANGE}")
+
+        assert status == 200
+        campaigns = {c["campaign_id"]: c for c in json.loads(body)["campaigns"]}
+        assert campaigns["REPORT-A"] == {
+            "campaign_id": "REPORT-A",
+            "spend": 50.0,
+            "conversions": 10,
+            "days": 5,
+            "cpa": 5.0,
+        }
+        assert campaigns["REPORT-C"]["cpa"] is None
+
+    def test_top_by_cpa(self, server):
+        """Top-N по CPA (самые дешёвые и самые дорогие), без кампаний без конверсий"""
+
+        _, _, cheapest = get(server, f"/top?{RANGE}&n=1")
+        _, _, most_expensive = get(server, f"/top?{RANGE}&n=5&order=desc")
+
+        assert [c["campaign_id"] for c in json.loads(cheapest)["campaigns"]] == ["REPORT-A"]
+        assert [c["campaign_id"] for c in json.loads(most_expensive)["campaigns"]] == ["REPORT-B", "REPORT-A"]
+
+    def test_conditional_get_and_cache(self, server, database):
+        """304 пока watermarks не изменились; новый changed_at — новый ETag и свежие данные"""
+
+        _, headers, first = get(server, f"/campaigns?{RANGE}")
+        etag = headers["ETag"]
+
+        status, _, body = get(server, f"/campaigns?end_date={END}&start_date={START}", etag)
+        assert (status, body) == (304, b"")
+
+        _, _, cached = get(server, f"/campaigns?{RANGE}")
+        assert cached == first
+        assert server.stats.cache_hits == 1
+
+        database.bulk_upsert_stats(
+            [{"date": START, "campaign_id": "REPORT-A", "spend": Decimal("20.00"), "conversions": 2, "cpa": None}]
+        )
+        database.upsert_watermarks(watermarks(datetime(2098, 1, 7, tzinfo=UTC)))
+
+        status, headers, body = get(server, f"/campaigns?{RANGE}", etag)
+        assert status == 200
+        assert headers["ETag"] != etag
+        assert json.loads(body)["campaigns"][0]["spend"] == 60.0
+
+    def test_stats_streamed_as_json_array(self, server):
+        """Строки за период отдаются chunked JSON массивом; большие ответы не кэшируются"""
+
+        status, headers, body = get(server, f"/stats?{RANGE}&campaign_id=REPORT-B")
+        assert status == 200
+        assert headers["Transfer-Encoding"] == "chunked"
+        rows = json.loads(body)
+        assert [r["date"] for r in rows] == [(START + timedelta(days=d)).isoformat() for d in range(5)]
+        assert rows[0]["spend"] == 30.0
+
+        _, _, all_rows = get(server, f"/stats?{RANGE}")
+        get(server, f"/stats?{RANGE}")
+        assert len(json.loads(all_rows)) == 15
+        assert server.stats.streamed == 3
+        assert server.stats.cache_hits == 0
+
+    def test_bad_request(self, server):
+        """Неверные параметры — 400 c описанием"""
+
+        status, _, body = get(server, "/top?n=0")
+
+        assert status == 400
+        assert "n" in json.loads(body)["error"]
@@ -0,0 +1,181 @@
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database import Database
+from src.services.http_extractor import HTTPExtractor
+from src.services.rate_limiter import RateLimiter
+from src.services.response_cache import BLOBS_DIR, INDEX_FILE, ResponseCache
+from src.services.scheduler import SchedulerService
+from src.utils.mock_api import MockAPIServer
+
+NOW = datetime(2025, 6, 20, 12, 0)
+TODAY = NOW.date()
+
+
+class FakeNow:
+    def __init__(self, moment: datetime) -> None:
+        self.moment = moment
+
+    def __call__(self) -> datetime:
+        return self.moment
+
+
+@pytest.fixture
+def now():
+    return FakeNow(NOW)
+
+
+@pytest.fixture
+def cache(tmp_path, now):
+    return ResponseCache(
+        tmp_path,
+        max_bytes=10_000,
+        ttl_today=timedelta(minutes=15),
+        ttl_recent=timedelta(hours=6),
+        immutable_after_days=3,
+        now=now,
+    )
+
+
+class TestResponseCache:
+    """Тесты для ResponseCache"""
+
+    def test_sub_range_served_from_super_range(self, cache):
+        """Запрос за часть периода обслуживается записью за весь период"""
+
+        cache.put("fb_spend", date(2025, 6, 1), date(2025, 6, 10), b"payload\n")
+
+        assert cache.get("fb_spend", date(2025, 6, 3), date(2025, 6, 4)) == b"payload\n"
+        assert cache.get("fb_spend", date(2025, 5, 31), date(2025, 6, 4)) is None
+        assert cache.get("network_conv", date(2025, 6, 3), date(2025, 6, 4)) is None
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 2
+
+    def test_ttl_depends_on_date_age(self, cache, now):
+        """Сегодняшние данные живут TTL_TODAY, недавние — TTL_RECENT, старые не истекают"""
+
+        cache.put("fb_spend", TODAY, TODAY, b"today\n")
+        cache.put("fb_spend", TODAY - timedelta(days=1), TODAY - timedelta(days=1), b"recent\n")
+        cache.put("fb_spend", date(2025, 6, 1), date(2025, 6, 10), b"old\n")
+
+        now.moment = NOW + timedelta(minutes=20)
+        assert cache.get("fb_spend", TODAY, TODAY) is None
+        assert cache.get("fb_spend", TODAY - timedelta(days=1), TODAY - timedelta(days=1)) == b"recent\n"
+
+        now.moment = NOW + timedelta(days=30)
+        assert cache.get("fb_spend", TODAY - timedelta(days=1), TODAY - timedelta(days=1)) is None
+        assert cache.get("fb_spend", date(2025, 6, 2), date(2025, 6, 5)) == b"old\n"
+
+    def test_old_part_of_fresh_range_stays_cached(self, cache, now):
+        """Старые даты из периода, загруженного вместе c сегодняшним днём, не истекают вместе c ним"""
+
+        cache.put("fb_spend", date(2025, 6, 1), TODAY, b"all\n")
+        now.moment = NOW + timedelta(days=2)
+
+        assert cache.get("fb_spend", date(2025, 6, 1), TODAY) is None
+        assert cache.get("fb_spend", date(2025, 6, 1), date(2025, 6, 10)) == b"all\n"
+
+    def test_identical_payloads_share_blob(self, cache, tmp_path):
+        """Одинаковое содержимое хранится одним файлом"""
+
+        cache.put("fb_spend", date(2025, 6, 1), date(2025, 6, 1), b"same\n")
+        cache.put("network_conv", date(2025, 6, 1), date(2025, 6, 1), b"same\n")
+
+        assert len(list((tmp_path / BLOBS_DIR).iterdir())) == 1
+        assert cache.size_bytes == 5
+
+    def test_lru_eviction(self, tmp_path, now):
+        """При превышении лимита вытесняются давно не читавшиеся записи"""
+
+        cache = ResponseCache(tmp_path, max_bytes=250, now=now)
+        for day in range(1, 4):
+            cache.put("fb_spend", date(2025, 6, day), date(2025, 6, day), bytes([day]) * 100)
+            now.moment += timedelta(seconds=1)
+
+        cache.get("fb_spend", date(2025, 6, 2), date(2025, 6, 2))
+        now.moment += timedelta(seconds=1)
+        cache.put("fb_spend", date(2025, 6, 4), date(2025, 6, 4), b"x" * 100)
+
+        assert cache.stats.evictions == 2
+        assert cache.contains("fb_spend", date(2025, 6, 2), date(2025, 6, 2))
+        assert cache.contains("fb_spend", date(2025, 6, 4), date(2025, 6, 4))
+        assert len(list((tmp_path / BLOBS_DIR).iterdir())) == 2
+
+    def test_index_survives_restart(self, cache, tmp_path, now):
+        """Записи читаются новым экземпляром из того же каталога"""
+
+        cache.put("fb_spend", date(2025, 6, 1), date(2025, 6, 10), b"payload\n")
+
+        reopened = ResponseCache(tmp_path, now=now)
+
+        assert reopened.get("fb_spend", date(2025, 6, 5), date(2025, 6, 5)) == b"payload\n"
+
+    def test_hits_do_not_rewrite_index_every_time(self, cache, tmp_path, now):
+        """Время чтения копится в памяти: индекс пишется не чаще интервала и в flush()"""
+
+        cache.put("fb_spend", date(2025, 6, 1), date(2025, 6, 10), b"payload\n")
+        index = (tmp_path / INDEX_FILE).read_bytes()
+
+        now.moment += timedelta(seconds=10)
+        cache.get("fb_spend", date(2025, 6, 5), date(2025, 6, 5))
+        assert (tmp_path / INDEX_FILE).read_bytes() == index
+
+        now.moment += cache.index_flush_interval
+        cache.get("fb_spend", date(2025, 6, 5), date(2025, 6, 5))
+        throttled = (tmp_path / INDEX_FILE).read_bytes()
+        assert throttled != index
+
+        now.moment += timedelta(seconds=1)
+        cache.get("fb_spend", date(2025, 6, 5), date(2025, 6, 5))
+        assert (tmp_path / INDEX_FILE).read_bytes() == throttled
+
+        cache.flush()
+        reopened = ResponseCache(tmp_path, now=now)
+        assert reopened._entries[0].last_access == now.moment
+
+
+class TestCachedExtraction:
+    """Тесты кэша в HTTPExtractor и учёта квоты"""
+
+    @pytest.fixture
+    def server(self):
+        rows = [
+            {"date": f"2025-06-{day:02d}", "campaign_id": f"C{campaign}", "spend": 1.5, "conversions": 2}
+            for day in range(1, 11)
+            for campaign in range(5)
+        ]
+        server = MockAPIServer(rows, rows)
+        server.start()
+        yield server
+        server.stop()
+
+    def test_cache_hit_skips_http_and_quota(self, server, cache):
+        """Повторный запрос за под-период не обращается к API и не тратит квоту"""
+
+        limiter = RateLimiter(max_requests=10, mode="sliding_window", backend="memory")
+        extractor = HTTPExtractor(server.base_url, page_size=20, rate_limiter=limiter, cache=cache)
+
+        first = extractor.fetch_spend(date(2025, 6, 1), date(2025, 6, 10))
+        requests_after_first = server.stats.requests
+        second = extractor.fetch_spend(date(2025, 6, 3), date(2025, 6, 4))
+
+        assert len(first) == 50
+        assert len(second) == 10
+        assert {r.date for r in second} == {date(2025, 6, 3), date(2025, 6, 4)}
+        assert server.stats.requests == requests_after_first == 3
+        assert limiter.get_stats()["used"] == 3
+        assert extractor.stats.cache_hits == 1
+
+    def test_scheduler_does_not_spend_quota_on_cached_range(self):
+        """Планировщик не занимает слот RateLimiter, если период целиком в кэше"""
+
+        scheduler_service = SchedulerService(database=MagicMock(spec=Database))
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=True))
+        scheduler_service.etl_service.run.return_value = []
+
+        stats = scheduler_service._run_date_ranges([(date(2025, 6, 1), date(2025, 6, 7))])
+
+        assert stats["succeeded"] == 1
+        assert scheduler_service.rate_limiter.get_stats()["used"] == 0
@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+from src.services.retry import RetryBacklog, RetryPolicy
+
+
+class TestRetryPolicy:
+    """Тесты для RetryPolicy"""
+
+    def test_exponential_delay_without_jitter(self):
+        """Задержка удваивается c каждой попыткой"""
+
+        policy = RetryPolicy(max_retries=5, base_delay_seconds=60, max_delay_seconds=3600, jitter=0)
+
+        assert [policy.delay(attempt) for attempt in (1, 2, 3, 4)] == [60, 120, 240, 480]
+
+    def test_delay_capped(self):
+        """Задержка не превышает max_delay"""
+
+        policy = RetryPolicy(base_delay_seconds=60, max_delay_seconds=300, jitter=0)
+
+        assert policy.delay(10) == 300
+
+    def test_jitter_bounds(self):
+        """Джиттер разбрасывает задержку в пределах ±jitter"""
+
+        low = RetryPolicy(base_delay_seconds=100, jitter=0.2, rng=lambda: 0.0)
+        high = RetryPolicy(base_delay_seconds=100, jitter=0.2, rng=lambda: 1.0)
+
+        assert low.delay(1) == 80
+        assert high.delay(1) == 120
+
+    def test_should_retry(self):
+        """Попытки ограничены max_retries"""
+
+        policy = RetryPolicy(max_retries=3)
+
+        assert policy.should_retry(3)
+        assert not policy.should_retry(4)
+
+
+class TestRetryBacklog:
+    """Тесты для RetryBacklog"""
+
+    def test_add_and_resolve(self):
+        """Бэклог хранит ожидающие повторы и считает исходы"""
+
+        backlog = RetryBacklog()
+        now = datetime.now()
+        backlog.add((date(2025, 6, 1), date(2025, 6, 3)), 1, now + timedelta(minutes=2), "boom")
+        backlog.add((date(2025, 6, 5), date(2025, 6, 5)), 2, now + timedelta(minutes=1), "timeout")
+
+        stats = backlog.get_stats()
+        assert stats["pending"] == 2
+        assert stats["entries"][0]["start_date"] == date(2025, 6, 5)
+        assert backlog.pending_dates() == {date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3), date(2025, 6, 5)}
+
+        backlog.resolve((date(2025, 6, 1), date(2025, 6, 3)), succeeded=True)
+        backlog.resolve((date(2025, 6, 5), date(2025, 6, 5)), succeeded=False)
+
+        stats = backlog.get_stats()
+        assert stats["pending"] == 0
+        assert stats["scheduled_total"] == 2
+        assert stats["succeeded_total"] == 1
+        assert stats["exhausted_total"] == 1
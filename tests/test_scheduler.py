@@ -0,0 +1,337 @@
+import time
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.database import Database, LoadWatermark
+from src.services.http_extractor import QuotaExceededError
+from src.services.scheduler import SchedulerService
+from src.services.watermarks import SOURCES
+
+
+def charging_run(limiter, result):
+    """run() для мока ETL: как HTTPExtractor, занимает слот квоты на запрос к API"""
+
+    def run(**kwargs):
+        if not limiter.try_acquire():
+            raise QuotaExceededError("квота API исчерпана")
+        return result
+
+    return run
+
+
+class TestSchedulerService:
+    """Тесты для SchedulerService"""
+
+    @pytest.fixture
+    def scheduler_service(self):
+        """Создаёт SchedulerService c моком БД"""
+
+        return SchedulerService(database=MagicMock(spec=Database))
+
+    def test_coalesce_consecutive_dates(self):
+        """Тест схлопывания последовательных дат в один диапазон"""
+
+        dates = [date(2025, 6, d) for d in range(1, 8)]
+
+        result = SchedulerService._coalesce_date_ranges(dates, max_days=7)
+
+        assert result == [(date(2025, 6, 1), date(2025, 6, 7))]
+
+    def test_coalesce_with_gaps(self):
+        """Тест что разрыв между датами начинает новый диапазон"""
+
+        dates = [date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 5)]
+
+        result = SchedulerService._coalesce_date_ranges(dates, max_days=7)
+
+        assert result == [(date(2025, 6, 1), date(2025, 6, 2)), (date(2025, 6, 5), date(2025, 6, 5))]
+
+    def test_coalesce_respects_max_days(self):
+        """Тест ограничения длины диапазона"""
+
+        dates = [date(2025, 6, d) for d in range(1, 6)]
+
+        result = SchedulerService._coalesce_date_ranges(dates, max_days=2)
+
+        assert result == [
+            (date(2025, 6, 1), date(2025, 6, 2)),
+            (date(2025, 6, 3), date(2025, 6, 4)),
+            (date(2025, 6, 5), date(2025, 6, 5)),
+        ]
+
+    def test_run_etl_job_one_request_per_range(self, scheduler_service):
+        """Тест что 7 пропущенных дат подряд — один запуск ETL и один запрос API"""
+
+        dates = [date(2025, 6, d) for d in range(1, 8)]
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = charging_run(scheduler_service.rate_limiter, [])
+
+        with patch.object(scheduler_service, "_get_dates_to_load", return_value=dates):
+            scheduler_service._run_etl_job()
+
+        scheduler_service.etl_service.run.assert_called_once_with(
+            start_date=date(2025, 6, 1),
+            end_date=date(2025, 6, 7),
+            skip_unchanged=True,
+        )
+        assert scheduler_service.rate_limiter.get_stats()["used"] == 1
+
+    def test_run_date_ranges_parallel(self, scheduler_service):
+        """Тест параллельного выполнения диапазонов c агрегированной статистикой"""
+
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = charging_run(
+            scheduler_service.rate_limiter, [MagicMock(), MagicMock()]
+        )
+        ranges = [(date(2025, 6, d), date(2025, 6, d)) for d in (1, 3, 5, 7)]
+
+        stats = scheduler_service._run_date_ranges(ranges, workers=4, job_timeout=10)
+
+        assert stats["succeeded"] == 4
+        assert stats["records"] == 8
+        assert scheduler_service.etl_service.run.call_count == 4
+        assert scheduler_service.rate_limiter.get_stats()["used"] == 4
+
+    def test_run_date_ranges_respects_quota(self, scheduler_service):
+        """Тест что параллельные воркеры не превышают квоту"""
+
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = charging_run(scheduler_service.rate_limiter, [])
+        for _ in range(scheduler_service.rate_limiter.max_requests - 2):
+            scheduler_service.rate_limiter.record_request()
+        ranges = [(date(2025, 6, d), date(2025, 6, d)) for d in (1, 3, 5, 7, 9)]
+
+        stats = scheduler_service._run_date_ranges(ranges, workers=5, job_timeout=10)
+
+        assert stats["succeeded"] == 2
+        assert stats["skipped"] == 3
+        assert scheduler_service.rate_limiter.get_available_requests() == 0
+
+    def test_file_sources_charge_shared_quota(self):
+        """Тест что файловые источники реестра по умолчанию занимают слоты общей квоты"""
+
+        from src.services.rate_limiter import RateLimiter
+
+        database = MagicMock(spec=Database)
+        database.get_watermarks.return_value = []
+        limiter = RateLimiter(max_requests=3, backend="memory")
+        service = SchedulerService(database=database, rate_limiter=limiter)
+        ranges = [(date(2025, 6, d), date(2025, 6, d)) for d in range(1, 8)]
+
+        stats = service._run_date_ranges(ranges, workers=4, job_timeout=30)
+
+        assert service.etl_service.registry.sources[0].rate_limiter is limiter
+        assert stats["skipped"] > 0
+        assert stats["succeeded"] <= 1
+        assert limiter.get_stats()["used"] <= 3
+
+    def test_pacer_estimates_cost_from_sources(self):
+        """Тест что пейсер считает стоимость диапазона по источникам общей квоты и уточняет её по отчёту"""
+
+        from src.services.instrumentation import ETLResult, RunReport, StageMetrics
+
+        database = MagicMock(spec=Database)
+        database.get_watermarks.return_value = []
+        with patch("src.services.scheduler.scheduler_config.ADAPTIVE_SCHEDULING", True):
+            service = SchedulerService(database=database)
+        assert service.pacer is not None
+        assert service.pacer.requests_per_range == 2
+
+        report = RunReport(stages=[StageMetrics("extract", requests=12)])
+        service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        service.etl_service.run.return_value = ETLResult([], report)
+
+        service._run_date_ranges([(date(2025, 6, 1), date(2025, 6, 7))], workers=1, job_timeout=10)
+
+        assert service.pacer.requests_per_range > 2
+
+    def test_run_date_ranges_failure_and_timeout(self, scheduler_service):
+        """Тест учёта ошибок и таймаутов отдельных задач"""
+
+        def fake_run(start_date, end_date, skip_unchanged=False):
+            if start_date.day == 1:
+                raise ValueError("boom")
+            if start_date.day == 3:
+                time.sleep(2)
+            return []
+
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = fake_run
+        ranges = [(date(2025, 6, d), date(2025, 6, d)) for d in (1, 3, 5)]
+
+        stats = scheduler_service._run_date_ranges(ranges, workers=3, job_timeout=0.2)
+        time.sleep(2)
+
+        assert stats["failed"] == 1
+        assert stats["timed_out"] == 1
+        assert stats["succeeded"] == 1
+
+    def test_timed_out_range_stays_in_flight(self, scheduler_service):
+        """Повтор не запускает диапазон, пока поток прошлой (зависшей) попытки не завершился"""
+
+        def fake_run(start_date, end_date, skip_unchanged=False):
+            time.sleep(0.6)
+            return []
+
+        date_range = (date(2025, 6, 3), date(2025, 6, 3))
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = fake_run
+
+        stats = scheduler_service._run_date_ranges([date_range], workers=1, job_timeout=0.2)
+
+        assert stats["timed_out"] == 1
+        assert scheduler_service._inflight_dates() == {date(2025, 6, 3)}
+
+        scheduler_service._run_retry(*date_range, attempt=1)
+
+        assert scheduler_service.etl_service.run.call_count == 1
+        assert scheduler_service.scheduler.get_job("etl_retry_2025-06-03_2025-06-03").args[2] == 1
+
+        time.sleep(0.8)
+        assert scheduler_service._inflight_dates() == set()
+
+    def test_get_dates_to_load_uses_watermarks(self, scheduler_service):
+        """Тест выбора дат по watermarks одним запросом"""
+
+        today = date.today()
+        now = datetime.now(UTC)
+        fresh = [
+            LoadWatermark(
+                date=today - timedelta(days=days_ago),
+                source=source,
+                loaded_at=now,
+                changed_at=now - timedelta(days=3),
+                row_count=1,
+                fingerprint="fp",
+            )
+            for days_ago in range(1, 7)
+            for source in SOURCES
+        ]
+        scheduler_service.database.get_watermarks.return_value = fresh
+
+        result = scheduler_service._get_dates_to_load()
+
+        assert result == [today]
+        scheduler_service.database.get_watermarks.assert_called_once()
+
+    def test_failed_range_scheduled_for_retry(self, scheduler_service):
+        """Упавший диапазон планируется отдельной разовой задачей, остальные не повторяются"""
+
+        def fake_run(start_date, end_date, skip_unchanged=False):
+            if start_date.day == 1:
+                raise ValueError("boom")
+            return []
+
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = fake_run
+        dates = [date(2025, 6, 1), date(2025, 6, 3)]
+
+        with patch.object(scheduler_service, "_get_dates_to_load", return_value=dates):
+            scheduler_service._run_etl_job()
+
+        job = scheduler_service.scheduler.get_job("etl_retry_2025-06-01_2025-06-01")
+        assert job is not None
+        assert job.args == (date(2025, 6, 1), date(2025, 6, 1), 1)
+        assert scheduler_service.scheduler.get_job("etl_retry_2025-06-03_2025-06-03") is None
+
+        stats = scheduler_service.retry_backlog.get_stats()
+        assert stats["pending"] == 1
+        assert stats["entries"][0]["last_error"] == "boom"
+
+    def test_retry_dates_excluded_from_regular_run(self, scheduler_service):
+        """Плановый запуск не загружает даты, ожидающие повтора"""
+
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.return_value = []
+        scheduler_service.retry_backlog.add((date(2025, 6, 1), date(2025, 6, 1)), 1, datetime.now(), "boom")
+
+        with patch.object(scheduler_service, "_get_dates_to_load", return_value=[date(2025, 6, 1), date(2025, 6, 3)]):
+            scheduler_service._run_etl_job()
+
+        scheduler_service.etl_service.run.assert_called_once_with(
+            start_date=date(2025, 6, 3), end_date=date(2025, 6, 3), skip_unchanged=True
+        )
+
+    def test_retry_success_resolves_backlog(self, scheduler_service):
+        """Успешный повтор снимает диапазон c бэклога и списывает один запрос"""
+
+        date_range = (date(2025, 6, 1), date(2025, 6, 1))
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = charging_run(scheduler_service.rate_limiter, [MagicMock()])
+        scheduler_service.retry_backlog.add(date_range, 1, datetime.now(), "boom")
+
+        scheduler_service._run_retry(*date_range, attempt=1)
+
+        assert scheduler_service.retry_backlog.get_stats()["pending"] == 0
+        assert scheduler_service.retry_backlog.succeeded_total == 1
+        assert scheduler_service.rate_limiter.get_stats()["used"] == 1
+
+    def test_retry_failure_backs_off_until_exhausted(self, scheduler_service):
+        """Повторные ошибки увеличивают номер попытки, после MAX_RETRIES диапазон снимается"""
+
+        date_range = (date(2025, 6, 1), date(2025, 6, 1))
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = ValueError("boom")
+        scheduler_service.retry_policy.max_retries = 2
+
+        scheduler_service._run_retry(*date_range, attempt=1)
+        job = scheduler_service.scheduler.get_job("etl_retry_2025-06-01_2025-06-01")
+        assert job.args[2] == 2
+
+        scheduler_service._run_retry(*date_range, attempt=2)
+
+        stats = scheduler_service.retry_backlog.get_stats()
+        assert stats["pending"] == 0
+        assert stats["exhausted_total"] == 1
+
+    def test_retry_without_quota_is_not_charged(self, scheduler_service):
+        """Без квоты повтор переносится без списания запроса и без увеличения попытки"""
+
+        date_range = (date(2025, 6, 1), date(2025, 6, 1))
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        for _ in range(scheduler_service.rate_limiter.max_requests):
+            scheduler_service.rate_limiter.record_request()
+
+        scheduler_service._run_retry(*date_range, attempt=2)
+
+        scheduler_service.etl_service.run.assert_not_called()
+        job = scheduler_service.scheduler.get_job("etl_retry_2025-06-01_2025-06-01")
+        assert job.args[2] == 2
+        assert scheduler_service.rate_limiter.get_stats()["used"] == scheduler_service.rate_limiter.max_requests
+
+    def test_run_metrics(self, scheduler_service):
+        """Метрики запуска: гистограмма длительности, исходы диапазонов, последняя успешная загрузка даты"""
+
+        scheduler_service.etl_service = MagicMock(is_cached=MagicMock(return_value=False))
+        scheduler_service.etl_service.run.side_effect = charging_run(scheduler_service.rate_limiter, [MagicMock()])
+        scheduler_service.database.get_pool_stats.return_value = {"size": 5, "checked_out": 1}
+
+        scheduler_service._run_date_ranges([(date(2025, 6, 1), date(2025, 6, 2))], workers=1, job_timeout=10)
+
+        text = scheduler_service.metrics.render()
+
+        assert "etl_run_duration_seconds_count 1" in text
+        assert 'etl_ranges_total{status="succeeded"} 1' in text
+        assert "etl_rows_total 1" in text
+        assert 'etl_date_last_success_timestamp_seconds{date="2025-06-02"}' in text
+        assert 'rate_limiter_requests{state="used"} 1' in text
+        assert 'db_pool_connections{state="checked_out"} 1' in text
+
+    def test_job_misfire_and_lag_metrics(self, scheduler_service):
+        """Листенер APScheduler считает задержку запуска и misfire"""
+
+        from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED, JobExecutionEvent, JobSubmissionEvent
+
+        scheduled = datetime.now(UTC) - timedelta(seconds=3)
+        scheduler_service._on_job_event(JobSubmissionEvent(EVENT_JOB_SUBMITTED, "etl_job", None, [scheduled]))
+        scheduler_service._on_job_event(
+            JobExecutionEvent(EVENT_JOB_MISSED, "etl_retry_2025-06-01_2025-06-01", None, scheduled)
+        )
+
+        text = scheduler_service.metrics.render()
+
+        assert 'scheduler_job_lag_seconds_count{job="etl_job"} 1' in text
+        assert 'scheduler_job_lag_seconds_bucket{job="etl_job",le="2.5"} 0' in text
+        assert 'scheduler_job_misfires_total{job="etl_retry"} 1' in text
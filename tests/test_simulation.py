@@ -0,0 +1,144 @@
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+
+from src.services.rate_limiter import RateLimiter
+from src.services.scheduler import SchedulerService
+from src.services.simulation import DataChangeModel, InMemoryDatabase, SchedulerSimulator
+from src.settings.scheduler import scheduler_config
+from src.utils.clock import VirtualClock
+
+START = datetime(2025, 6, 10, tzinfo=UTC)
+
+
+class TestVirtualClock:
+    """Тесты для VirtualClock"""
+
+    def test_advance_moves_wall_and_monotonic(self):
+        """Тест что сдвиг меняет и настенное, и монотонное время"""
+
+        clock = VirtualClock(START)
+
+        clock.advance(90)
+
+        assert clock.monotonic() == 90
+        assert clock.now(UTC) == START + timedelta(seconds=90)
+
+    def test_advance_to_and_backwards(self):
+        """Тест сдвига до момента и запрета идти назад"""
+
+        clock = VirtualClock(START)
+
+        clock.advance_to(START + timedelta(hours=2))
+
+        assert clock.monotonic() == 7200
+        with pytest.raises(ValueError):
+            clock.advance_to(START)
+
+    def test_rate_limiter_window_on_virtual_clock(self):
+        """Тест что окно RateLimiter и время следующего слота идут по виртуальным часам"""
+
+        clock = VirtualClock(START)
+        limiter = RateLimiter(max_requests=2, mode="sliding_window", clock=clock.monotonic, now=clock.now)
+        limiter.record_request()
+        clock.advance(3600)
+        limiter.record_request()
+
+        assert not limiter.can_make_request()
+        assert limiter.get_next_available_time() == clock.now() + timedelta(hours=23, seconds=1)
+
+        clock.advance(23 * 3600)
+
+        assert limiter.can_make_request()
+
+
+class TestDataChangeModel:
+    """Тесты для DataChangeModel"""
+
+    def test_version_stops_after_settle(self):
+        """Тест что версия данных растёт до settle_hours и потом замирает"""
+
+        model = DataChangeModel(change_interval_minutes=60, settle_hours=24)
+        record_date = date(2025, 6, 10)
+        day_start = model.day_start(record_date)
+
+        assert model.version(record_date, day_start + timedelta(minutes=150)) == 2
+        assert model.version(record_date, day_start + timedelta(days=5)) == 48
+
+    def test_unseen_since(self):
+        """Тест момента первого незагруженного изменения"""
+
+        model = DataChangeModel(change_interval_minutes=60, settle_hours=0)
+        record_date = date(2025, 6, 10)
+        day_start = model.day_start(record_date)
+        loaded_at = day_start + timedelta(minutes=30)
+
+        assert model.unseen_since(record_date, None, loaded_at) == day_start
+        assert model.unseen_since(record_date, loaded_at, day_start + timedelta(minutes=50)) is None
+        assert model.unseen_since(record_date, loaded_at, day_start + timedelta(hours=3)) == day_start + timedelta(
+            hours=1
+        )
+        assert model.unseen_since(record_date, day_start + timedelta(days=1), day_start + timedelta(days=3)) is None
+
+
+class TestSchedulerClock:
+    """Тесты подмены времени в SchedulerService"""
+
+    def test_dates_to_load_use_injected_clock(self):
+        """Тест что окно дат считается от виртуального «сегодня»"""
+
+        clock = VirtualClock(START + timedelta(hours=12))
+        service = SchedulerService(InMemoryDatabase(), clock=clock)
+
+        dates = service._get_dates_to_load()
+
+        assert dates[-1] == clock.today()
+        assert len(dates) == scheduler_config.LOOKBACK_DAYS
+
+
+class TestSchedulerSimulator:
+    """Тесты для SchedulerSimulator"""
+
+    def test_fixed_interval_run(self):
+        """Тест что фиксированный интервал даёт ожидаемое число запусков и квота не превышена"""
+
+        # Два источника по странице на диапазон: 48 запусков в сутки укладываются в 200 запросов
+        report = SchedulerSimulator(days=2, start=START, adaptive=False, max_requests=200).run()
+        result = report.to_dict()
+
+        assert report.ticks == 2 * 24 * 60 // scheduler_config.UPDATE_INTERVAL_MINUTES
+        assert result["quota"]["max_used"] <= result["quota"]["per_day"]
+        assert report.ranges["succeeded"] > 0
+        assert result["freshness"]["today"]["max_minutes"] <= scheduler_config.WATERMARK_TTL_TODAY_MINUTES + 60
+
+    def test_quota_exhaustion_is_reported(self):
+        """Тест что при маленькой квоте запуски упираются в лимит и он не превышается"""
+
+        report = SchedulerSimulator(days=2, start=START, adaptive=False, max_requests=5).run()
+
+        assert report.quota_blocked_ticks > 0
+        assert max(report.requests_by_day.values()) <= 5
+        assert report.freshness["today"]["stale_share"] > 0
+
+    def test_failures_are_retried(self):
+        """Тест что упавшие диапазоны повторяются на виртуальном времени"""
+
+        report = SchedulerSimulator(days=1, start=START, adaptive=True, failure_rate=0.3).run()
+
+        assert report.ranges["failed"] > 0
+        assert report.retries_run > 0
+        assert report.retry["scheduled_total"] + report.retry["exhausted_total"] >= report.ranges["failed"]
+
+    def test_quota_charged_per_page(self):
+        """Тест что каждый источник тратит слот квоты на страницу, a пейсер учится стоимости диапазона"""
+
+        simulator = SchedulerSimulator(days=1, start=START, adaptive=True)
+        simulator.etl.page_size = 40
+
+        report = simulator.run()
+
+        assert simulator.etl.pages_per_source(1) == 3
+        assert sum(report.requests_by_day.values()) >= 6 * simulator.etl.runs
+        assert max(report.requests_by_day.values()) <= report.quota_per_day
+        assert simulator.service.pacer is not None
+        assert simulator.service.pacer.requests_per_range >= 6
@@ -0,0 +1,153 @@
+import json
+import time
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.schemas import ConversionRecord, SpendRecord
+from src.services.etl_service import ETLService
+from src.services.http_extractor import QuotaExceededError
+from src.services.rate_limiter import RateLimiter
+from src.services.sources import (
+    CONVERSION_KIND,
+    SPEND_KIND,
+    DataSource,
+    FileSource,
+    SourceRegistry,
+    SourceResult,
+)
+from src.services.watermarks import WatermarkTracker
+from src.settings.api import api_config
+
+DAY = date(2025, 6, 4)
+
+
+class SlowSource(DataSource):
+    """Источник c фиксированной задержкой"""
+
+    def __init__(self, name: str, kind: str, records: list, delay: float) -> None:
+        super().__init__(name, kind)
+        self.records = records
+        self.delay = delay
+
+    def extract(self, start_date=None, end_date=None) -> SourceResult:
+        time.sleep(self.delay)
+        return SourceResult(self.name, self.kind, self.records, self.delay)
+
+
+def spend(campaign_id: str, value: str) -> SpendRecord:
+    return SpendRecord(date=DAY, campaign_id=campaign_id, spend=Decimal(value))
+
+
+class TestSourceRegistry:
+    """Тесты для SourceRegistry"""
+
+    def test_default_sources(self):
+        """По умолчанию — fb_spend и network_conv из data/"""
+
+        registry = SourceRegistry.from_config()
+
+        assert registry.names == ["fb_spend", "network_conv"]
+        assert all(isinstance(s, FileSource) for s in registry.sources)
+
+    def test_duplicate_name_rejected(self):
+        """Имя источника уникально"""
+
+        registry = SourceRegistry([SlowSource("a", SPEND_KIND, [], 0)])
+
+        with pytest.raises(ValueError):
+            registry.register(SlowSource("a", CONVERSION_KIND, [], 0))
+
+    def test_select_subset(self):
+        """Подмножество источников по именам через запятую; "all" — весь реестр"""
+
+        registry = SourceRegistry.from_config()
+
+        assert registry.select("all") is registry
+        assert registry.select(" network_conv ").names == ["network_conv"]
+        with pytest.raises(ValueError):
+            registry.select("fb_spend,unknown")
+
+    def test_sources_from_settings_have_own_limiters(self, monkeypatch, tmp_path):
+        """Источники из DATA_SOURCES получают собственные квоты"""
+
+        path = tmp_path / "tiktok.json"
+        path.write_text(json.dumps([{"date": "2025-06-04", "campaign_id": "C1", "spend": 5}]), encoding="utf-8")
+        monkeypatch.setattr(
+            api_config,
+            "DATA_SOURCES",
+            [
+                {"name": "fb_spend", "kind": "spend", "path": str(api_config.fb_spend_path), "max_requests": 5},
+                {"name": "tiktok_spend", "kind": "spend", "path": str(path), "max_requests": 1},
+                {"name": "network_conv", "kind": "conversion", "path": str(api_config.network_conv_path)},
+            ],
+        )
+
+        registry = SourceRegistry.from_config()
+        tiktok = registry.by_kind(SPEND_KIND)[1]
+
+        assert tiktok.rate_limiter is not None
+        assert tiktok.rate_limiter is not registry.by_kind(SPEND_KIND)[0].rate_limiter
+        assert registry.by_kind(CONVERSION_KIND)[0].rate_limiter is None
+        assert len(tiktok.extract().records) == 1
+        with pytest.raises(QuotaExceededError):
+            tiktok.extract()
+
+    def test_file_source_counts_quota(self):
+        """Чтение файла c квотой занимает один слот"""
+
+        limiter = RateLimiter(max_requests=3, mode="sliding_window", backend="memory")
+        source = FileSource("fb_spend", SPEND_KIND, api_config.fb_spend_path, limiter)
+
+        result = source.extract()
+
+        assert result.requests == 1
+        assert limiter.get_stats()["used"] == 1
+
+
+class TestMultiSourceETL:
+    """Тесты ETLService c несколькими источниками"""
+
+    def test_sources_extracted_concurrently_and_aggregated(self):
+        """Время загрузки — время самого медленного источника, расходы сетей суммируются"""
+
+        registry = SourceRegistry(
+            [
+                SlowSource("fb_spend", SPEND_KIND, [spend("C1", "10")], 0.3),
+                SlowSource("tiktok_spend", SPEND_KIND, [spend("C1", "5"), spend("C2", "2")], 0.3),
+                SlowSource(
+                    "network_conv",
+                    CONVERSION_KIND,
+                    [ConversionRecord(date=DAY, campaign_id="C1", conversions=3)],
+                    0.3,
+                ),
+            ]
+        )
+        database = MagicMock(get_watermarks=MagicMock(return_value=[]))
+
+        started_at = time.perf_counter()
+        result = ETLService(database=database, registry=registry).run()
+        elapsed = time.perf_counter() - started_at
+
+        assert elapsed < 0.6
+        by_campaign = {r.campaign_id: r for r in result}
+        assert by_campaign["C1"].spend == Decimal("15")
+        assert by_campaign["C1"].cpa == Decimal("5.00")
+        assert by_campaign["C2"].conversions == 0
+
+        stages = {s.stage: s for s in result.report.stages}
+        assert stages["load_spend"].rows_in == 3
+        assert stages["merge"].rows_out == 2
+        assert stages["merge"].duplicates == 0
+
+        watermark_sources = {w["source"] for w in database.upsert_watermarks.call_args[0][0]}
+        assert watermark_sources == {"fb_spend", "tiktok_spend", "network_conv"}
+
+    def test_is_stale_checks_registered_sources(self):
+        """Дата без watermark нового источника считается устаревшей"""
+
+        loaded = [MagicMock(source="fb_spend"), MagicMock(source="network_conv")]
+
+        assert WatermarkTracker.is_stale(DAY, loaded, DAY, sources=["fb_spend", "tiktok_spend", "network_conv"])
@@ -0,0 +1,66 @@
+import os
+
+from src.settings.base import EnvSettings, load_env_file
+from src.utils.importtime import heavy_imports, measure_imports, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | sqlalchemy
+import time:        50 |         50 |     sqlalchemy.util
+"""
+
+
+class TestImportTime:
+    """Тесты времени старта CLI"""
+
+    def test_parse_importtime(self):
+        """Тест разбора вывода -X importtime"""
+
+        timings = parse_importtime(SAMPLE)
+
+        assert [t.module for t in timings] == ["_io", "sqlalchemy", "sqlalchemy.util"]
+        assert timings[1].cumulative_us == 420
+        assert [t.depth for t in timings] == [1, 0, 2]
+        assert heavy_imports(timings) == ["sqlalchemy"]
+
+    def test_cli_help_skips_heavy_imports(self):
+        """Тест что run.py --help не импортирует SQLAlchemy, APScheduler и настройки"""
+
+        timings = measure_imports(["run.py", "--help"])
+
+        assert timings
+        assert heavy_imports(timings) == []
+
+    def test_services_package_is_lazy(self):
+        """Тест что импорт src.services и ETLService не тянет APScheduler"""
+
+        timings = measure_imports(["-c", "import src.services.etl_service"])
+
+        assert "apscheduler" not in {t.module for t in timings}
+
+
+class TestEnvFile:
+    """Тесты однократного чтения .env"""
+
+    def test_env_file_loaded_with_env_priority(self, tmp_path, monkeypatch):
+        """Тест что .env заполняет конфиги, не перетирает окружение и не меняет os.environ"""
+
+        class SampleConfig(EnvSettings):
+            ETL_TEST_FROM_FILE: str = "default"
+            ETL_TEST_OVERRIDDEN: str = "default"
+
+        (tmp_path / ".env").write_text("ETL_TEST_FROM_FILE=file\nETL_TEST_OVERRIDDEN=file\n", encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("ETL_TEST_OVERRIDDEN", "env")
+        monkeypatch.delenv("ETL_TEST_FROM_FILE", raising=False)
+        load_env_file.cache_clear()
+
+        try:
+            config = SampleConfig()
+            assert load_env_file() is load_env_file()
+        finally:
+            load_env_file.cache_clear()
+
+        assert config.ETL_TEST_FROM_FILE == "file"
+        assert config.ETL_TEST_OVERRIDDEN == "env"
+        assert "ETL_TEST_FROM_FILE" not in os.environ
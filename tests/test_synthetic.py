@@ -0,0 +1,70 @@
+import json
+from datetime import date
+
+from src.services.data_loader import DataLoader
+from src.utils.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class TestSyntheticDataGenerator:
+    """Тесты для SyntheticDataGenerator"""
+
+    def test_deterministic(self, tmp_path):
+        """Одинаковый seed — одинаковые файлы"""
+
+        config = SyntheticConfig(rows=500, days=5, seed=7)
+
+        first = SyntheticDataGenerator(config).generate(tmp_path / "a")
+        second = SyntheticDataGenerator(config).generate(tmp_path / "b")
+
+        assert first.spend_path.read_text() == second.spend_path.read_text()
+        assert first.conversion_path.read_text() == second.conversion_path.read_text()
+
+    def test_files_are_loadable(self, tmp_path):
+        """Файлы в формате data/ и проходят валидацию DataLoader"""
+
+        files = SyntheticDataGenerator(SyntheticConfig(rows=300, days=3, start_date=date(2025, 6, 1))).generate(
+            tmp_path
+        )
+
+        spend = DataLoader.load_spend_data(files.spend_path)
+        conversions = DataLoader.load_conversion_data(files.conversion_path)
+
+        assert len(spend) == files.spend_rows
+        assert len(conversions) == files.conversion_rows
+        assert {r.date for r in spend} == {date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3)}
+        assert files.end_date == date(2025, 6, 3)
+
+    def test_overlap(self, tmp_path):
+        """overlap=1 — все ключи есть в обоих файлах, overlap=0 — ни одного общего"""
+
+        def keys(path):
+            return {(row["date"], row["campaign_id"]) for row in json.loads(path.read_text())}
+
+        full = SyntheticDataGenerator(SyntheticConfig(rows=400, days=4, overlap=1.0)).generate(tmp_path / "full")
+        none = SyntheticDataGenerator(SyntheticConfig(rows=400, days=4, overlap=0.0)).generate(tmp_path / "none")
+
+        assert keys(full.spend_path) == keys(full.conversion_path)
+        assert len(keys(full.spend_path)) == 400
+        assert not keys(none.spend_path) & keys(none.conversion_path)
+
+    def test_duplicates(self, tmp_path):
+        """duplicates добавляет повторные строки c тем же ключом"""
+
+        files = SyntheticDataGenerator(SyntheticConfig(rows=1000, days=5, overlap=1.0, duplicates=0.3)).generate(
+            tmp_path
+        )
+        rows = json.loads(files.spend_path.read_text())
+
+        unique_keys = {(row["date"], row["campaign_id"]) for row in rows}
+        assert len(unique_keys) == 1000
+        assert 1200 < len(rows) < 1400
+
+    def test_skew(self, tmp_path):
+        """При skew > 0 первые кампании тратят больше хвостовых"""
+
+        files = SyntheticDataGenerator(SyntheticConfig(rows=2000, days=10, overlap=1.0, skew=1.5)).generate(tmp_path)
+        rows = json.loads(files.spend_path.read_text())
+
+        head = sum(row["spend"] for row in rows if row["campaign_id"] == "SYN-0000000")
+        tail = sum(row["spend"] for row in rows if row["campaign_id"] == "SYN-0000199")
+        assert head > tail * 10
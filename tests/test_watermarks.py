@@ -0,0 +1,115 @@
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from src.database.models import LoadWatermark
+from src.schemas import ConversionRecord, SpendRecord
+from src.services.watermarks import CONVERSION_SOURCE, EMPTY_FINGERPRINT, SPEND_SOURCE, WatermarkTracker
+
+NOW = datetime(2025, 6, 10, 12, 0, tzinfo=UTC)
+
+
+def make_watermark(record_date, source, loaded_at, changed_at=None, fingerprint="fp"):
+    return LoadWatermark(
+        date=record_date,
+        source=source,
+        loaded_at=loaded_at,
+        changed_at=changed_at or loaded_at - timedelta(days=3),
+        row_count=1,
+        fingerprint=fingerprint,
+    )
+
+
+class TestWatermarkTracker:
+    """Тесты для WatermarkTracker"""
+
+    def test_fingerprint_order_independent(self):
+        """Тест что отпечаток не зависит от порядка строк"""
+
+        records = [
+            SpendRecord(date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("10")),
+            SpendRecord(date=date(2025, 6, 4), campaign_id="C2", spend=Decimal("20")),
+        ]
+
+        first = WatermarkTracker.fingerprint_by_date(records)
+        second = WatermarkTracker.fingerprint_by_date(list(reversed(records)))
+
+        assert first == second
+        assert first[date(2025, 6, 4)][0] == 2
+
+    def test_fingerprint_respects_date_range(self):
+        """Тест фильтрации отпечатков по диапазону дат"""
+
+        records = [
+            ConversionRecord(date=date(2025, 6, 4), campaign_id="C1", conversions=1),
+            ConversionRecord(date=date(2025, 6, 6), campaign_id="C1", conversions=1),
+        ]
+
+        result = WatermarkTracker.fingerprint_by_date(records, date(2025, 6, 5), date(2025, 6, 7))
+
+        assert list(result) == [date(2025, 6, 6)]
+
+    def test_fingerprint_sources_cover_every_date(self):
+        """Тест что каждая дата периода получает отпечаток каждого источника, даже без строк"""
+
+        records = [SpendRecord(date=date(2025, 6, 4), campaign_id="C1", spend=Decimal("10"))]
+
+        result = WatermarkTracker.fingerprint_sources(
+            {SPEND_SOURCE: records, CONVERSION_SOURCE: []}, date(2025, 6, 4), date(2025, 6, 5)
+        )
+
+        assert set(result[SPEND_SOURCE]) == set(result[CONVERSION_SOURCE]) == {date(2025, 6, 4), date(2025, 6, 5)}
+        assert result[CONVERSION_SOURCE][date(2025, 6, 4)] == EMPTY_FINGERPRINT
+        assert result[SPEND_SOURCE][date(2025, 6, 4)][0] == 1
+
+    def test_build_detects_changes(self):
+        """Тест что изменённые и новые даты попадают в changed_dates"""
+
+        existing = [
+            make_watermark(date(2025, 6, 4), SPEND_SOURCE, NOW - timedelta(hours=1), fingerprint="same"),
+            make_watermark(date(2025, 6, 5), SPEND_SOURCE, NOW - timedelta(hours=1), fingerprint="old"),
+        ]
+        fingerprints = {
+            SPEND_SOURCE: {
+                date(2025, 6, 4): (1, "same"),
+                date(2025, 6, 5): (1, "new"),
+                date(2025, 6, 6): (1, "fresh"),
+            }
+        }
+
+        changed, watermarks = WatermarkTracker.build(fingerprints, existing, now=NOW)
+
+        assert changed == {date(2025, 6, 5), date(2025, 6, 6)}
+        unchanged = next(w for w in watermarks if w["date"] == date(2025, 6, 4))
+        assert unchanged["loaded_at"] == NOW
+        assert unchanged["changed_at"] == existing[0].changed_at
+
+    def test_is_stale_missing_source(self):
+        """Тест что дата без watermark одного из источников устарела"""
+
+        watermarks = [make_watermark(date(2025, 6, 5), SPEND_SOURCE, NOW)]
+
+        assert WatermarkTracker.is_stale(date(2025, 6, 5), watermarks, date(2025, 6, 10), now=NOW) is True
+
+    def test_is_stale_by_age(self):
+        """Тест TTL в зависимости от возраста даты"""
+
+        old_date = date(2025, 6, 5)
+        watermarks = [
+            make_watermark(old_date, SPEND_SOURCE, NOW - timedelta(hours=12)),
+            make_watermark(old_date, CONVERSION_SOURCE, NOW - timedelta(hours=12)),
+        ]
+
+        assert WatermarkTracker.is_stale(old_date, watermarks, date(2025, 6, 10), now=NOW) is False
+        assert WatermarkTracker.is_stale(date(2025, 6, 10), watermarks, date(2025, 6, 10), now=NOW) is True
+
+    def test_is_stale_recently_changed(self):
+        """Тест что дата c недавно изменившимся отпечатком проверяется чаще"""
+
+        old_date = date(2025, 6, 5)
+        loaded_at = NOW - timedelta(hours=12)
+        watermarks = [
+            make_watermark(old_date, SPEND_SOURCE, loaded_at, changed_at=loaded_at),
+            make_watermark(old_date, CONVERSION_SOURCE, loaded_at),
+        ]
+
+        assert WatermarkTracker.is_stale(old_date, watermarks, date(2025, 6, 10), now=NOW) is True